@@ -28,15 +28,44 @@ Model Forge - AI-Powered Universal 3D Model Generation
 __version__ = "1.1.0"
 __author__ = "Grid AutoPilot Team"
 
-from .core.pipeline import ModelForgePipeline, PipelineConfig, PipelineResult, PipelineStage
-from .core.prompt_generator import (
-    PromptGenerator,
-    PromptConfig,
-    IndustryDomain,
-    RenderStyle
-)
-from .core.image_generator import ImageGenerator
-from .core.model_generator import ModelGenerator
+import importlib
+from typing import TYPE_CHECKING
+
+# 延迟导入：访问属性时才加载核心模块（google-genai 等依赖较重），
+# 使只用到 API / 任务队列的进程启动更快
+_LAZY_IMPORTS = {
+    "ModelForgePipeline": ".core.pipeline",
+    "PipelineConfig": ".core.pipeline",
+    "PipelineResult": ".core.pipeline",
+    "PipelineStage": ".core.pipeline",
+    "PromptGenerator": ".core.prompt_generator",
+    "PromptConfig": ".core.prompt_generator",
+    "IndustryDomain": ".core.prompt_generator",
+    "RenderStyle": ".core.prompt_generator",
+    "ImageGenerator": ".core.image_generator",
+    "ModelGenerator": ".core.model_generator",
+}
+
+if TYPE_CHECKING:
+    from .core.pipeline import ModelForgePipeline, PipelineConfig, PipelineResult, PipelineStage
+    from .core.prompt_generator import (
+        PromptGenerator,
+        PromptConfig,
+        IndustryDomain,
+        RenderStyle
+    )
+    from .core.image_generator import ImageGenerator
+    from .core.model_generator import ModelGenerator
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     # Pipeline
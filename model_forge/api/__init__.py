@@ -1,5 +1,25 @@
 """Model Forge API"""
-from .routes import router
-from .routes_v2 import router as router_v2
+import importlib
+from typing import TYPE_CHECKING
+
+# 延迟导入：v2 路由依赖全部核心模块，按需加载
+_LAZY_IMPORTS = {
+    "router": (".routes", "router"),
+    "router_v2": (".routes_v2", "router"),
+}
+
+if TYPE_CHECKING:
+    from .routes import router
+    from .routes_v2 import router as router_v2
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attr = _LAZY_IMPORTS[name]
+    value = getattr(importlib.import_module(module, __name__), attr)
+    globals()[name] = value
+    return value
+
 
 __all__ = ["router", "router_v2"]
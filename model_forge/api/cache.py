@@ -0,0 +1,250 @@
+"""
+Prompt 响应缓存 - 对相同输入的 Prompt 生成/优化结果进行复用
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .metrics import cache_hits, cache_misses
+
+
+class PromptResponseCache:
+    """
+    带 TTL 的 LRU 精确匹配缓存
+
+    以请求参数的 SHA-256 作为键，命中时直接返回之前的 LLM 结果，
+    避免对重复描述再次调用大模型。
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 3600, name: str = "prompt"):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._version = 0
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """根据命名空间和请求参数生成缓存键"""
+        raw = json.dumps({"ns": namespace, **params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """读取缓存，未命中或已过期返回 None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self._misses += 1
+                cache_misses.labels(self.name).inc()
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            cache_hits.labels(self.name).inc()
+            return entry[1]
+
+    def set(self, key: str, value: dict) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def version(self) -> int:
+        """缓存版本号，计入缓存键后递增即可使旧条目全部失效"""
+        return self._version
+
+    def bump_version(self) -> None:
+        """递增缓存版本号"""
+        with self._lock:
+            self._version += 1
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息"""
+        with self._lock:
+            return {"size": len(self._data), "hits": self._hits, "misses": self._misses}
+
+
+class RedisResponseCache:
+    """
+    基于 Redis 的共享响应缓存，接口与 PromptResponseCache 一致
+
+    多个 uvicorn worker 共用同一份缓存，只需一个 worker 完成计算。
+    Redis 不可用时读取视为未命中、写入直接跳过，不影响请求本身。
+    """
+
+    KEY_PREFIX = "mf:cache:"
+
+    make_key = staticmethod(PromptResponseCache.make_key)
+
+    def __init__(self, url: str, ttl: float = 3600, name: str = "prompt"):
+        import orjson
+        import redis
+
+        self._orjson = orjson
+        self._errors = redis.RedisError
+        self._redis = redis.Redis.from_url(url)
+        self.name = name
+        self.ttl = ttl
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        """读取缓存，未命中、已过期或 Redis 不可用时返回 None"""
+        try:
+            data = self._redis.get(f"{self.KEY_PREFIX}{self.name}:{key}")
+        except self._errors:
+            data = None
+        if data is None:
+            self._misses += 1
+            cache_misses.labels(self.name).inc()
+            return None
+        self._hits += 1
+        cache_hits.labels(self.name).inc()
+        return self._orjson.loads(data)
+
+    def set(self, key: str, value: dict) -> None:
+        """写入缓存，由 Redis 负责过期"""
+        data = self._orjson.dumps(value, default=str)
+        try:
+            self._redis.set(f"{self.KEY_PREFIX}{self.name}:{key}", data, px=int(self.ttl * 1000))
+        except self._errors:
+            pass
+
+    def version(self) -> int:
+        """缓存版本号，保存在 Redis 中由所有进程共享，Redis 不可用时返回 0"""
+        try:
+            return int(self._redis.get(f"{self.KEY_PREFIX}{self.name}:version") or 0)
+        except self._errors:
+            return 0
+
+    def bump_version(self) -> None:
+        """原子递增缓存版本号（INCR）"""
+        try:
+            self._redis.incr(f"{self.KEY_PREFIX}{self.name}:version")
+        except self._errors:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息（仅本进程的命中情况）"""
+        return {"hits": self._hits, "misses": self._misses}
+
+
+class SQLiteResponseCache:
+    """
+    基于 SQLite 的持久化响应缓存，接口与 PromptResponseCache 一致
+
+    进程重启后仍然有效，重跑同一类别或失败的批量任务时无需再次调用大模型。
+    数据库被其他进程锁定等错误时读取视为未命中、写入直接跳过。
+    """
+
+    make_key = staticmethod(PromptResponseCache.make_key)
+
+    def __init__(self, path: str, ttl: float = 3600, name: str = "prompt"):
+        import orjson
+        import sqlite3
+
+        self._orjson = orjson
+        self._errors = sqlite3.Error
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires REAL, value BLOB)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS version (id INTEGER PRIMARY KEY, value INTEGER)")
+        self._lock = threading.Lock()
+        self.name = name
+        self.ttl = ttl
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        """读取缓存，未命中或已过期返回 None"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM cache WHERE key = ? AND expires > ?", (key, time.time())
+                ).fetchone()
+        except self._errors:
+            row = None
+        if row is None:
+            self._misses += 1
+            cache_misses.labels(self.name).inc()
+            return None
+        self._hits += 1
+        cache_hits.labels(self.name).inc()
+        return self._orjson.loads(row[0])
+
+    def set(self, key: str, value: dict) -> None:
+        """写入缓存，同时清理已过期的条目"""
+        data = self._orjson.dumps(value, default=str)
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                    (key, now + self.ttl, data)
+                )
+                self._conn.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+        except self._errors:
+            pass
+
+    def version(self) -> int:
+        """缓存版本号，保存在数据库中由共用该文件的进程共享"""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM version WHERE id = 0").fetchone()
+        except self._errors:
+            row = None
+        return row[0] if row else 0
+
+    def bump_version(self) -> None:
+        """递增缓存版本号"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO version (id, value) VALUES (0, 1) "
+                    "ON CONFLICT(id) DO UPDATE SET value = value + 1"
+                )
+        except self._errors:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息（仅本进程的命中情况）"""
+        return {"hits": self._hits, "misses": self._misses}
+
+
+def create_response_cache(maxsize: int = 1000, ttl: float = 3600, name: str = "prompt",
+                          persistent: bool = False):
+    """
+    创建响应缓存
+
+    配置了 REDIS_URL 时使用 Redis 共享缓存；persistent=True 且配置了 MF_CACHE_DIR 时
+    使用 SQLite 持久化缓存（<MF_CACHE_DIR>/<name>.sqlite3）；否则使用进程内 LRU 缓存。
+    """
+    url = os.environ.get("REDIS_URL")
+    if url:
+        return RedisResponseCache(url, ttl=ttl, name=name)
+    cache_dir = os.environ.get("MF_CACHE_DIR")
+    if persistent and cache_dir:
+        path = os.path.join(os.path.expanduser(cache_dir), f"{name}.sqlite3")
+        return SQLiteResponseCache(path, ttl=ttl, name=name)
+    return PromptResponseCache(maxsize=maxsize, ttl=ttl, name=name)
+
+
+# 全局 Prompt 响应缓存
+prompt_cache = PromptResponseCache()
+
+# 模型库扫描结果缓存（短 TTL，应对前端轮询）；任务写完结果后递增版本号使其失效
+library_cache = create_response_cache(maxsize=128, ttl=30, name="library")
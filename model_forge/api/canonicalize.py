@@ -0,0 +1,70 @@
+"""
+请求参数规范化 - 统一 Unicode、空白和字段顺序
+
+canonicalize 的结果只用作响应缓存和并发合并的键，近似重复的请求得到相同的键；
+传给大模型、流水线和 metadata.json 的是 request_params（仅做 NFKC 规范化），
+保留用户输入的大小写和换行。
+"""
+
+import unicodedata
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+# 大小写不敏感的字段
+_CASE_INSENSITIVE_FIELDS = frozenset({"equipment_type", "voltage_level"})
+
+# 保留换行等排版的字段（仅做 Unicode 规范化和首尾去空白）
+_MULTILINE_FIELDS = frozenset({"custom_prompt"})
+
+
+def canonicalize_text(text: Optional[str], multiline: bool = False) -> Optional[str]:
+    """NFKC 规范化并折叠空白"""
+    if text is None:
+        return None
+    text = unicodedata.normalize("NFKC", text)
+    return text.strip() if multiline else " ".join(text.split())
+
+
+def request_params(request: BaseModel) -> Dict[str, Any]:
+    """
+    请求参数字典（枚举转换为其值，字符串仅做 NFKC 规范化），用于传给下游
+
+    Args:
+        request: Pydantic 请求模型
+
+    Returns:
+        参数字典
+    """
+    fields = request.model_dump()
+    for key, value in fields.items():
+        if isinstance(value, Enum):
+            fields[key] = value.value
+        elif isinstance(value, str):
+            fields[key] = unicodedata.normalize("NFKC", value)
+    return fields
+
+
+def canonicalize(request: BaseModel) -> Dict[str, Any]:
+    """
+    规范化请求模型，结果仅用作缓存键
+
+    Args:
+        request: Pydantic 请求模型
+
+    Returns:
+        按字段名排序的规范化参数字典（枚举转换为其值）
+    """
+    fields = request.model_dump()
+    result = {}
+    for key in sorted(fields):
+        value = fields[key]
+        if isinstance(value, Enum):
+            value = value.value
+        if isinstance(value, str):
+            value = canonicalize_text(value, multiline=key in _MULTILINE_FIELDS)
+            if key in _CASE_INSENSITIVE_FIELDS:
+                value = value.lower() or None
+        result[key] = value
+    return result
@@ -0,0 +1,118 @@
+"""
+任务状态存储 - 运行中任务的进度读写
+
+默认保存在进程内存中；配置 REDIS_URL（或使用 dramatiq 任务队列）时
+改为 Redis，使多个 uvicorn worker / 独立 worker 进程共享任务状态。
+"""
+
+import os
+import json
+import time
+from typing import Callable, Dict, Optional
+
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+
+# 任务终止阶段
+TERMINAL_STAGES = ("completed", "failed")
+
+
+class JobStore:
+    """进程内任务状态存储"""
+
+    def __init__(self):
+        self._jobs: Dict[str, dict] = {}
+
+    def set(self, job_id: str, progress: dict) -> None:
+        """写入任务进度"""
+        self._jobs[job_id] = progress
+
+    def create(self, job_id: str, progress: dict) -> bool:
+        """仅当任务不存在时写入，返回是否写入成功"""
+        if job_id in self._jobs:
+            return False
+        self._jobs[job_id] = progress
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """读取任务进度"""
+        return self._jobs.get(job_id)
+
+    async def aget(self, job_id: str) -> Optional[dict]:
+        """异步读取任务进度"""
+        return self._jobs.get(job_id)
+
+
+class RedisJobStore(JobStore):
+    """基于 Redis 的任务状态存储，带过期时间"""
+
+    KEY_PREFIX = "mf:job:"
+
+    def __init__(self, url: str, ttl: int = 86400):
+        import redis
+        import redis.asyncio
+
+        self.ttl = ttl
+        # 进度回调在工作线程中执行，使用同步客户端；端点中使用异步客户端
+        self._redis = redis.Redis.from_url(url)
+        self._aredis = redis.asyncio.Redis.from_url(url)
+
+    def set(self, job_id: str, progress: dict) -> None:
+        self._redis.setex(self.KEY_PREFIX + job_id, self.ttl, json.dumps(progress, ensure_ascii=False))
+
+    def create(self, job_id: str, progress: dict) -> bool:
+        data = json.dumps(progress, ensure_ascii=False)
+        return bool(self._redis.set(self.KEY_PREFIX + job_id, data, ex=self.ttl, nx=True))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        data = self._redis.get(self.KEY_PREFIX + job_id)
+        return json.loads(data) if data else None
+
+    async def aget(self, job_id: str) -> Optional[dict]:
+        data = await self._aredis.get(self.KEY_PREFIX + job_id)
+        return json.loads(data) if data else None
+
+
+class ProgressDebouncer:
+    """
+    合并高频进度写入
+
+    阶段变化和终止状态立即写入；同一阶段内最多每 interval 秒写入一次，
+    期间的更新暂存，随下一次写入或 flush() 落盘。
+    使用 Redis 时可将状态存储的写入量降低一到两个数量级。
+    """
+
+    def __init__(self, write: Callable[[dict], None], interval: float = 1.0):
+        self._write = write
+        self.interval = interval
+        self._stage = None
+        self._last = 0.0
+        self._pending: Optional[dict] = None
+
+    def __call__(self, progress: dict) -> None:
+        now = time.monotonic()
+        stage = progress.get("stage")
+        if stage != self._stage or stage in TERMINAL_STAGES or now - self._last >= self.interval:
+            self._stage = stage
+            self._last = now
+            self._pending = None
+            self._write(progress)
+        else:
+            self._pending = progress
+
+    def flush(self) -> None:
+        """写入暂存的最新进度"""
+        if self._pending is not None:
+            self._write(self._pending)
+            self._pending = None
+
+
+def create_job_store() -> JobStore:
+    """根据环境变量创建任务状态存储"""
+    url = os.environ.get("REDIS_URL")
+    if url is None and os.environ.get("MF_TASK_QUEUE") == "dramatiq":
+        url = DEFAULT_REDIS_URL
+    return RedisJobStore(url) if url else JobStore()
+
+
+# 全局任务状态存储
+job_store = create_job_store()
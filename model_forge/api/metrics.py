@@ -0,0 +1,67 @@
+"""
+运行指标 - 基于 Prometheus 的阶段耗时与缓存命中统计
+
+未安装 prometheus_client 时所有指标退化为空操作，/metrics 端点不挂载。
+"""
+
+import time
+from typing import Callable, Optional
+
+try:
+    from prometheus_client import Counter, Histogram, make_asgi_app
+except ImportError:
+    Counter = Histogram = make_asgi_app = None
+
+# 阶段耗时分桶（秒），覆盖从 Prompt 生成到 3D 模型生成的量级
+STAGE_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+
+
+class _NoopMetric:
+    """prometheus_client 不可用时的空指标"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+
+if Histogram is not None:
+    stage_seconds = Histogram(
+        "model_forge_stage_seconds", "流水线各阶段耗时（秒）", ["stage"], buckets=STAGE_BUCKETS
+    )
+    cache_hits = Counter("model_forge_cache_hits_total", "响应缓存命中次数", ["cache"])
+    cache_misses = Counter("model_forge_cache_misses_total", "响应缓存未命中次数", ["cache"])
+else:
+    stage_seconds = cache_hits = cache_misses = _NoopMetric()
+
+
+def metrics_app():
+    """返回 /metrics 的 ASGI 应用，未安装 prometheus_client 时返回 None"""
+    return make_asgi_app() if make_asgi_app is not None else None
+
+
+class StageTimer:
+    """
+    包装进度回调，在阶段切换时记录上一阶段的耗时
+
+    进入 completed / failed 时结束最后一个阶段的计时。
+    """
+
+    def __init__(self, callback: Optional[Callable] = None):
+        self._callback = callback
+        self._stage = None
+        self._started = 0.0
+
+    def __call__(self, progress: dict):
+        stage = progress.get("stage")
+        if stage != self._stage:
+            now = time.perf_counter()
+            if self._stage is not None:
+                stage_seconds.labels(self._stage).observe(now - self._started)
+            self._stage, self._started = stage, now
+        if self._callback:
+            self._callback(progress)
@@ -3,37 +3,66 @@ Model Forge API Routes - FastAPI 路由定义
 """
 
 import os
+import atexit
 import asyncio
+import hashlib
+import secrets
+import time
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Optional, List, Dict
+import orjson
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from enum import Enum
 
-from ..core import (
-    ModelForgePipeline,
-    PipelineConfig,
-    PipelineStage,
-    IndustryDomain,
-    RenderStyle,
-    PromptConfig
-)
+from .cache import library_cache, prompt_cache
+from .canonicalize import canonicalize, request_params
+from .job_store import TERMINAL_STAGES, ProgressDebouncer, job_store
+from .metrics import StageTimer
+from .responses import ORJSONResponse
+
+if TYPE_CHECKING:
+    from ..core import ModelForgePipeline
 
 # 创建路由器
-router = APIRouter(prefix="/api/v1", tags=["model-forge"])
+router = APIRouter(prefix="/api/v1", tags=["model-forge"], default_response_class=ORJSONResponse)
 
 # 全局流水线实例（延迟初始化）
-_pipeline: ModelForgePipeline = None
+_pipeline: "ModelForgePipeline" = None
+
+# 任务执行方式: local (进程内后台任务) / dramatiq (独立 worker 进程)
+_TASK_QUEUE = os.environ.get("MF_TASK_QUEUE", "local")
+
+# 流水线专用线程池，避免占满默认执行器影响其他阻塞调用
+_PIPELINE_WORKERS = int(os.environ.get("MF_PIPELINE_WORKERS", "4"))
+_pipeline_executor = ThreadPoolExecutor(max_workers=_PIPELINE_WORKERS, thread_name_prefix="mf-pipe")
+_pipeline_sema = asyncio.Semaphore(_PIPELINE_WORKERS)
+atexit.register(_pipeline_executor.shutdown, wait=False)
+
+# 任务进度订阅者（SSE 推送）
+_job_subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+# 进行中的生成任务：规范化请求哈希 -> (job_id, 过期时间)，用于合并相同的并发请求
+_inflight_jobs: Dict[str, tuple] = {}
+
+# 合并记录的最长保留时间（秒），与 worker 的任务时限一致；
+# worker 执行的任务若无人查询状态，由它兜底清理
+_INFLIGHT_TTL = 1800
 
-# 任务状态存储
-_running_jobs = {}
+# SSE 无本地事件时回退读取状态存储的间隔（秒），用于其他进程执行的任务
+_SSE_POLL_INTERVAL = 2.0
 
 
-def get_pipeline() -> ModelForgePipeline:
+def get_pipeline() -> "ModelForgePipeline":
     """获取流水线实例"""
     global _pipeline
     if _pipeline is None:
+        # 核心模块较重，首次使用时再导入，缩短 worker 启动时间
+        from ..core import ModelForgePipeline, PipelineConfig
+
         gemini_key = os.environ.get("GEMINI_API_KEY")
         ark_key = os.environ.get("ARK_API_KEY")
 
@@ -53,6 +82,19 @@ def get_pipeline() -> ModelForgePipeline:
     return _pipeline
 
 
+# 枚举值到核心枚举的映射，首次使用时构建，避免每次请求构造枚举
+@functools.lru_cache(maxsize=None)
+def _domain_map() -> dict:
+    from ..core import IndustryDomain
+    return {e.value: e for e in IndustryDomain}
+
+
+@functools.lru_cache(maxsize=None)
+def _style_map() -> dict:
+    from ..core import RenderStyle
+    return {e.value: e for e in RenderStyle}
+
+
 # Enums for API
 class DomainEnum(str, Enum):
     power_grid = "power_grid"
@@ -87,8 +129,8 @@ class GenerateRequest(BaseModel):
     mesh_quality: Optional[str] = Field("medium", description="面数质量：high/medium/low")
     custom_prompt: Optional[str] = Field(None, description="自定义提示词（跳过AI生成）")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "description": "一台220kV的油浸式电力变压器，带散热翅片",
@@ -112,6 +154,7 @@ class GenerateRequest(BaseModel):
                 }
             ]
         }
+    )
 
 
 class GenerateResponse(BaseModel):
@@ -137,6 +180,10 @@ class JobStatusResponse(BaseModel):
     completed_at: Optional[str] = None
 
 
+# 状态端点被前端高频轮询，预构建序列化器直接输出 JSON 字节
+_JOB_STATUS_ADAPTER = TypeAdapter(JobStatusResponse)
+
+
 class PromptGenerateRequest(BaseModel):
     """Prompt生成请求"""
     description: str = Field(..., description="对象描述")
@@ -178,59 +225,133 @@ class DomainInfo(BaseModel):
     colors: List[str]
 
 
-# 后台任务
-async def run_pipeline_task(job_id: str, request: GenerateRequest):
-    """后台运行流水线任务"""
+def execute_pipeline(job_id: str, params: dict, progress_callback):
+    """
+    同步执行流水线
+
+    Args:
+        job_id: 任务ID
+        params: 生成请求参数（见 request_params）
+        progress_callback: 进度回调函数
+    """
     pipeline = get_pipeline()
 
-    # 临时修改配置
-    if request.mesh_quality:
-        pipeline.config.mesh_quality = request.mesh_quality
+    # 按阶段记录耗时
+    progress_callback = StageTimer(progress_callback)
 
-    def progress_callback(progress):
-        _running_jobs[job_id] = progress
+    # 临时修改配置
+    if params["mesh_quality"]:
+        pipeline.config.mesh_quality = params["mesh_quality"]
 
     # 转换领域和风格
-    domain = IndustryDomain(request.domain.value) if request.domain else None
-    style = RenderStyle(request.style.value) if request.style else None
-
-    # 在线程池中运行同步代码
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(
-        None,
-        lambda: pipeline.run(
-            description=request.description,
-            equipment_type=request.equipment_type,
-            voltage_level=request.voltage_level,
+    domain = _domain_map().get(params["domain"])
+    style = _style_map().get(params["style"])
+
+    try:
+        return pipeline.run(
+            description=params["description"],
+            equipment_type=params["equipment_type"],
+            voltage_level=params["voltage_level"],
             domain=domain,
             style=style,
-            custom_prompt=request.custom_prompt,
+            custom_prompt=params["custom_prompt"],
             progress_callback=progress_callback
         )
-    )
+    finally:
+        # result.json 已写入，使模型库缓存失效（版本号保存在缓存后端，worker 进程同样生效）
+        library_cache.bump_version()
+
+
+def _publish_job_event(job_id: str, progress: dict):
+    """将进度推送给该任务的所有 SSE 订阅者"""
+    for queue in _job_subscribers.get(job_id, ()):
+        queue.put_nowait(progress)
+
+
+# 后台任务
+async def run_pipeline_task(job_id: str, params: dict):
+    """后台运行流水线任务"""
+    loop = asyncio.get_running_loop()
+    store_progress = ProgressDebouncer(functools.partial(job_store.set, job_id))
+
+    def progress_callback(progress):
+        store_progress(progress)
+        loop.call_soon_threadsafe(_publish_job_event, job_id, progress)
+
+    # 在专用线程池中运行同步代码，信号量限制同时运行的流水线数量
+    try:
+        async with _pipeline_sema:
+            await loop.run_in_executor(
+                _pipeline_executor,
+                functools.partial(execute_pipeline, job_id, params, progress_callback)
+            )
+    finally:
+        store_progress.flush()
+        _release_inflight(job_id)
+
+
+def _release_inflight(job_id: str):
+    """任务结束后移除合并记录"""
+    for key, (inflight_id, _) in list(_inflight_jobs.items()):
+        if inflight_id == job_id:
+            del _inflight_jobs[key]
+
+
+def _prune_inflight():
+    """移除已过期的合并记录"""
+    now = time.monotonic()
+    for key, (_, expires) in list(_inflight_jobs.items()):
+        if expires <= now:
+            del _inflight_jobs[key]
 
 
 # API 端点
-@router.post("/generate", response_model=GenerateResponse)
-async def generate(request: GenerateRequest, background_tasks: BackgroundTasks):
+@router.post("/generate", response_model=GenerateResponse, status_code=202)
+async def generate(request: GenerateRequest, background_tasks: BackgroundTasks, response: Response):
     """
     启动完整的3D模型生成流水线
 
     流程：需求描述 -> AI生成Prompt -> AI生成图像 -> AI生成3D模型
 
     支持多行业领域，自动检测或手动指定。
+    返回 202，Location 头指向任务状态，可通过 /jobs/{job_id}/stream 订阅实时进度。
     """
-    import uuid
-    job_id = str(uuid.uuid4())[:8]
-
-    _running_jobs[job_id] = {
-        "job_id": job_id,
-        "stage": "init",
-        "message": "任务已创建，等待处理...",
-        "description": request.description
-    }
-
-    background_tasks.add_task(run_pipeline_task, job_id, request)
+    params = request_params(request)
+
+    # 相同请求已在执行时直接复用其任务，避免重复调用生成服务（按规范化参数判断）
+    inflight_key = prompt_cache.make_key("pipeline", canonicalize(request))
+    _prune_inflight()
+    inflight_id, _ = _inflight_jobs.get(inflight_key, (None, None))
+    if inflight_id is not None:
+        progress = await job_store.aget(inflight_id)
+        if progress is not None and progress.get("stage") not in TERMINAL_STAGES:
+            response.headers["Location"] = f"{router.prefix}/jobs/{inflight_id}"
+            return GenerateResponse(
+                job_id=inflight_id,
+                status="deduplicated",
+                message="相同任务正在处理中，已复用该任务"
+            )
+        del _inflight_jobs[inflight_key]
+
+    # 8 字符、48 位随机 ID；极小概率冲突时重新生成
+    while True:
+        job_id = secrets.token_urlsafe(6)
+        if job_store.create(job_id, {
+            "job_id": job_id,
+            "stage": "init",
+            "message": "任务已创建，等待处理...",
+            "description": params["description"]
+        }):
+            break
+    _inflight_jobs[inflight_key] = (job_id, time.monotonic() + _INFLIGHT_TTL)
+
+    if _TASK_QUEUE == "dramatiq":
+        from ..tasks import run_pipeline_actor
+        run_pipeline_actor.send(job_id, params)
+    else:
+        background_tasks.add_task(run_pipeline_task, job_id, params)
+
+    response.headers["Location"] = f"{router.prefix}/jobs/{job_id}"
 
     return GenerateResponse(
         job_id=job_id,
@@ -243,9 +364,12 @@ async def generate(request: GenerateRequest, background_tasks: BackgroundTasks):
 async def get_job_status(job_id: str):
     """获取任务状态"""
     # 先检查运行中的任务
-    if job_id in _running_jobs:
-        progress = _running_jobs[job_id]
-        return JobStatusResponse(
+    progress = await job_store.aget(job_id)
+    if progress:
+        if progress.get("stage") in TERMINAL_STAGES:
+            # worker 进程执行的任务只能在这里（或 SSE 中）观察到结束
+            _release_inflight(job_id)
+        status = JobStatusResponse(
             job_id=job_id,
             stage=progress.get("stage", "unknown"),
             description=progress.get("description", ""),
@@ -254,22 +378,83 @@ async def get_job_status(job_id: str):
             style=progress.get("style"),
             error=progress.get("error")
         )
+        return Response(_JOB_STATUS_ADAPTER.dump_json(status), media_type="application/json")
 
     # 检查已完成的任务
     pipeline = get_pipeline()
     result = pipeline.get_job_status(job_id)
 
     if result:
-        return JobStatusResponse(**result)
+        status = JobStatusResponse(**result)
+        return Response(_JOB_STATUS_ADAPTER.dump_json(status), media_type="application/json")
 
     raise HTTPException(status_code=404, detail=f"任务 {job_id} 不存在")
 
 
+def _sse_event(progress: dict) -> str:
+    """格式化 SSE 进度事件"""
+    return f"event: progress\ndata: {orjson.dumps(progress, default=str).decode()}\n\n"
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job_status(job_id: str):
+    """
+    以 Server-Sent Events 推送任务进度
+
+    每次进度变化推送一个 progress 事件，任务完成或失败后关闭连接。
+    """
+    # 先订阅再读取快照，避免漏掉两者之间的事件
+    queue = asyncio.Queue()
+    _job_subscribers.setdefault(job_id, []).append(queue)
+
+    progress = await job_store.aget(job_id)
+    if progress is None:
+        _unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail=f"任务 {job_id} 不存在")
+
+    async def event_stream():
+        current = progress
+        try:
+            yield _sse_event(current)
+            while current.get("stage") not in TERMINAL_STAGES:
+                try:
+                    current = await asyncio.wait_for(queue.get(), timeout=_SSE_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    # 任务可能在其他进程中执行，没有本地事件，回退为读取状态存储
+                    latest = await job_store.aget(job_id)
+                    if latest is None:
+                        return
+                    if latest == current:
+                        yield ": keep-alive\n\n"
+                        continue
+                    current = latest
+                yield _sse_event(current)
+            _release_inflight(job_id)
+        finally:
+            _unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # 事件流不能被压缩中间件缓冲
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"}
+    )
+
+
+def _unsubscribe(job_id: str, queue: asyncio.Queue):
+    """取消任务进度订阅"""
+    subscribers = _job_subscribers.get(job_id)
+    if subscribers and queue in subscribers:
+        subscribers.remove(queue)
+        if not subscribers:
+            del _job_subscribers[job_id]
+
+
 @router.get("/jobs")
 async def list_jobs():
     """列出所有任务"""
     pipeline = get_pipeline()
-    return pipeline.list_jobs()
+    return await pipeline.alist_jobs()
 
 
 @router.post("/prompt/generate", response_model=PromptGenerateResponse)
@@ -283,17 +468,22 @@ async def generate_prompt(request: PromptGenerateRequest):
     - Self-Verification 自我验证
     """
     pipeline = get_pipeline()
-
-    domain = IndustryDomain(request.domain.value) if request.domain else None
-    style = RenderStyle(request.style.value) if request.style else None
-
-    result = pipeline.prompt_generator.generate(
-        description=request.description,
-        equipment_type=request.equipment_type,
-        voltage_level=request.voltage_level,
-        domain=domain,
-        style=style
-    )
+    params = request_params(request)
+
+    domain = _domain_map().get(params["domain"])
+    style = _style_map().get(params["style"])
+
+    cache_key = prompt_cache.make_key("generate", canonicalize(request))
+    result = prompt_cache.get(cache_key)
+    if result is None:
+        result = pipeline.prompt_generator.generate(
+            description=params["description"],
+            equipment_type=params["equipment_type"],
+            voltage_level=params["voltage_level"],
+            domain=domain,
+            style=style
+        )
+        prompt_cache.set(cache_key, result)
 
     return PromptGenerateResponse(
         prompt=result["prompt"],
@@ -309,70 +499,173 @@ async def generate_prompt(request: PromptGenerateRequest):
 async def optimize_prompt(request: PromptOptimizeRequest):
     """优化已有的提示词"""
     pipeline = get_pipeline()
-    result = pipeline.prompt_generator.optimize_prompt(
-        prompt=request.prompt,
-        feedback=request.feedback
-    )
+
+    cache_key = prompt_cache.make_key("optimize", canonicalize(request))
+    result = prompt_cache.get(cache_key)
+    if result is None:
+        result = pipeline.prompt_generator.optimize_prompt(
+            prompt=request.prompt,
+            feedback=request.feedback
+        )
+        prompt_cache.set(cache_key, result)
     return PromptOptimizeResponse(**result)
 
 
-@router.get("/domains", response_model=List[DomainInfo])
-async def list_domains():
-    """列出所有支持的行业领域"""
+# 静态元数据响应的缓存策略
+_STATIC_CACHE_CONTROL = "public, max-age=3600"
+
+
+def _render_static(content) -> tuple:
+    """预先序列化静态响应，返回 (响应体, ETag)"""
+    body = ORJSONResponse(content).body
+    return body, f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+def _static_response(request: Request, payload: tuple) -> Response:
+    """返回预序列化的静态响应，ETag 匹配时返回 304"""
+    body, etag = payload
+    headers = {"ETag": etag, "Cache-Control": _STATIC_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@functools.lru_cache(maxsize=None)
+def _domains_payload() -> tuple:
+    """领域列表（只构建一次）"""
     from ..core.prompt_generator import PromptGenerator
 
-    domains = []
-    for domain, knowledge in PromptGenerator.DOMAIN_KNOWLEDGE.items():
-        domains.append(DomainInfo(
+    return _render_static([
+        DomainInfo(
             name=domain.name,
             value=domain.value,
             keywords=knowledge["keywords"][:5],
             materials=knowledge["materials"][:5],
             colors=knowledge["colors"][:5]
-        ))
-    return domains
+        ).model_dump()
+        for domain, knowledge in PromptGenerator.DOMAIN_KNOWLEDGE.items()
+    ])
 
 
-@router.get("/styles")
-async def list_styles():
-    """列出所有支持的渲染风格"""
+@functools.lru_cache(maxsize=None)
+def _styles_payload() -> tuple:
+    """风格列表（只构建一次）"""
     from ..core.prompt_generator import PromptGenerator
 
-    return [
+    return _render_static([
         {"name": style.name, "value": style.value, "description": desc}
         for style, desc in PromptGenerator.STYLE_TEMPLATES.items()
-    ]
+    ])
+
+
+@router.get("/domains", response_model=List[DomainInfo])
+async def list_domains(request: Request):
+    """列出所有支持的行业领域"""
+    return _static_response(request, _domains_payload())
+
+
+@router.get("/styles")
+async def list_styles(request: Request):
+    """列出所有支持的渲染风格"""
+    return _static_response(request, _styles_payload())
+
+
+# 大文件读取块大小：超过该大小的产物按 1MiB 分块读取，减少线程切换次数
+_LARGE_ARTIFACT_CHUNK = 1024 * 1024
+
+# 产物文件的缓存策略
+_ARTIFACT_CACHE_CONTROL = "public, max-age=86400, immutable"
+
+
+def _artifact_response(request: Request, path: Path, media_type: str,
+                       stat_result: os.stat_result) -> Response:
+    """构建产物文件响应，ETag 匹配时返回 304"""
+    # 产物按任务目录存放、生成后不再修改，可长期缓存
+    etag = f'W/"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": _ARTIFACT_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    # 图像/GLB 本身已压缩，声明 identity 使 GZip 中间件跳过，保留零拷贝发送
+    response = FileResponse(
+        path,
+        media_type=media_type,
+        stat_result=stat_result,
+        headers={**headers, "Content-Encoding": "identity"}
+    )
+    if stat_result.st_size > _LARGE_ARTIFACT_CHUNK:
+        response.chunk_size = _LARGE_ARTIFACT_CHUNK
+    return response
 
 
 @router.get("/jobs/{job_id}/image")
-async def get_job_image(job_id: str):
+async def get_job_image(job_id: str, request: Request):
     """获取任务生成的图像"""
+    _check_path_segment(job_id)
     pipeline = get_pipeline()
     job_dir = pipeline.config.output_base_dir / job_id
     image_path = job_dir / "image.png"
 
-    if not image_path.exists():
+    try:
+        stat_result = await asyncio.to_thread(image_path.stat)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="图像不存在")
 
-    return FileResponse(image_path, media_type="image/png")
+    return _artifact_response(request, image_path, "image/png", stat_result)
+
+
+def _check_path_segment(value: str):
+    """校验路径参数只包含单级文件名，防止目录穿越"""
+    if not value or value in (".", "..") or "/" in value or "\\" in value or "\0" in value:
+        raise HTTPException(status_code=400, detail=f"非法路径参数: {value}")
+
+
+@functools.lru_cache(maxsize=1024)
+def _job_model_files(job_id: str) -> Dict[str, Path]:
+    """
+    读取任务结果中的模型文件清单（文件名 -> 路径）
+
+    result.json 仅在任务结束后写入且不再变化，可以缓存；
+    任务不存在或未结束时抛出 FileNotFoundError（异常结果不会被缓存）。
+    """
+    pipeline = get_pipeline()
+    result = pipeline.get_job_status(job_id)
+    if result is None:
+        raise FileNotFoundError(job_id)
+
+    job_dir = (pipeline.config.output_base_dir / job_id).resolve()
+    files = {}
+    for item in result.get("model_files") or []:
+        path = Path(item["path"]).resolve()
+        if path.is_relative_to(job_dir):
+            files[Path(item["name"]).name] = path
+    return files
 
 
 @router.get("/jobs/{job_id}/model/{filename}")
-async def get_job_model(job_id: str, filename: str):
+async def get_job_model(job_id: str, filename: str, request: Request):
     """获取任务生成的3D模型文件"""
-    pipeline = get_pipeline()
-    job_dir = pipeline.config.output_base_dir / job_id / "model"
+    _check_path_segment(job_id)
+    _check_path_segment(filename)
 
-    # 查找文件
-    for file_path in job_dir.rglob(filename):
-        if file_path.is_file():
-            media_type = "model/gltf-binary" if filename.endswith(".glb") else "application/octet-stream"
-            return FileResponse(file_path, media_type=media_type)
+    # 按任务结果中记录的文件清单精确查找（读取结果和 stat 均放到线程中执行）
+    try:
+        files = await asyncio.to_thread(_job_model_files, job_id)
+        file_path = files[filename]
+        stat_result = await asyncio.to_thread(file_path.stat)
+    except (FileNotFoundError, KeyError):
+        raise HTTPException(status_code=404, detail="模型文件不存在")
 
-    raise HTTPException(status_code=404, detail="模型文件不存在")
+    media_type = "model/gltf-binary" if filename.endswith(".glb") else "application/octet-stream"
+    return _artifact_response(request, file_path, media_type, stat_result)
 
 
 @router.get("/health")
 async def health_check():
     """健康检查"""
-    return {"status": "healthy", "service": "model-forge", "version": "1.1.0"}
+    return {
+        "status": "healthy",
+        "service": "model-forge",
+        "version": "1.1.0",
+        "prompt_cache": prompt_cache.stats(),
+    }
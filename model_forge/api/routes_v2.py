@@ -10,11 +10,15 @@ Model Forge API V2 Routes - 扩展API路由
 """
 
 import os
+import atexit
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
-from fastapi.responses import FileResponse, JSONResponse
+import orjson
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -34,10 +38,17 @@ from ..core import (
     ModelForgePipeline,
     PipelineConfig,
 )
+from .cache import create_response_cache, library_cache
+from .responses import ORJSONResponse
 
 # 创建路由器
 router = APIRouter(prefix="/api/v2", tags=["model-forge-v2"])
 
+# 请求中的字符串到枚举的映射，避免每次请求经过 EnumMeta.__call__
+_PROVIDER_TYPES = {p.value: p for p in ProviderType}
+_CAPABILITIES = {c.value: c for c in ProviderCapability}
+_ASSOCIATION_MODES = {m.value: m for m in AssociationMode}
+
 # 全局管理器
 _provider_manager: Optional[ProviderManager] = None
 _batch_manager: Optional[BatchJobManager] = None
@@ -61,26 +72,30 @@ def get_batch_manager() -> BatchJobManager:
     return _batch_manager
 
 
+# 环境变量中配置的服务商密钥，导入时读取一次（server.py 在导入路由前已加载 .env）
+_ENV_PROVIDER_KEYS = tuple(
+    (provider_type, os.environ[env_key])
+    for provider_type, env_key in (
+        (ProviderType.DEEPSEEK, "DEEPSEEK_API_KEY"),
+        (ProviderType.DOUBAO, "ARK_API_KEY"),
+        (ProviderType.KIMI, "KIMI_API_KEY"),
+        (ProviderType.MINIMAX, "MINIMAX_API_KEY"),
+        (ProviderType.ZHIPU, "ZHIPU_API_KEY"),
+        (ProviderType.BAICHUAN, "BAICHUAN_API_KEY"),
+        (ProviderType.SPARK, "SPARK_API_KEY"),
+        (ProviderType.QWEN, "QWEN_API_KEY"),
+        (ProviderType.YI, "YI_API_KEY"),
+        (ProviderType.OPENROUTER, "OPENROUTER_API_KEY"),
+        (ProviderType.GEMINI, "GEMINI_API_KEY"),
+    )
+    if os.environ.get(env_key)
+)
+
+
 def _init_providers():
     """从环境变量初始化服务商"""
-    env_mappings = {
-        ProviderType.DEEPSEEK: "DEEPSEEK_API_KEY",
-        ProviderType.DOUBAO: "ARK_API_KEY",
-        ProviderType.KIMI: "KIMI_API_KEY",
-        ProviderType.MINIMAX: "MINIMAX_API_KEY",
-        ProviderType.ZHIPU: "ZHIPU_API_KEY",
-        ProviderType.BAICHUAN: "BAICHUAN_API_KEY",
-        ProviderType.SPARK: "SPARK_API_KEY",
-        ProviderType.QWEN: "QWEN_API_KEY",
-        ProviderType.YI: "YI_API_KEY",
-        ProviderType.OPENROUTER: "OPENROUTER_API_KEY",
-        ProviderType.GEMINI: "GEMINI_API_KEY",
-    }
-
-    for provider_type, env_key in env_mappings.items():
-        api_key = os.environ.get(env_key)
-        if api_key:
-            _provider_manager.configure(provider_type, api_key)
+    for provider_type, api_key in _ENV_PROVIDER_KEYS:
+        _provider_manager.configure(provider_type, api_key)
 
 
 # ==================== 服务商管理API ====================
@@ -105,62 +120,31 @@ class ProviderConfigRequest(BaseModel):
     model: Optional[str] = None
 
 
-@router.get("/providers")
-async def list_providers() -> List[ProviderInfoResponse]:
-    """列出所有支持的AI服务商"""
-    manager = get_provider_manager()
-    providers = ProviderManager.list_providers()
-
-    result = []
-    for p in providers:
-        result.append(ProviderInfoResponse(
-            provider_type=p.provider_type.value,
-            display_name=p.display_name,
-            website=p.website,
-            capabilities=[c.value for c in p.capabilities],
-            description=p.description,
-            api_doc_url=p.api_doc_url,
-            is_configured=p.provider_type in manager._configs,
-            models=[
-                {
-                    "name": m.name,
-                    "display_name": m.display_name,
-                    "description": m.description,
-                    "max_tokens": m.max_tokens,
-                    "context_length": m.context_length,
-                    "price_input": m.price_input,
-                    "price_output": m.price_output,
-                    "supports_vision": m.supports_vision,
-                }
-                for m in p.models
-            ]
-        ))
+# 服务商信息响应缓存：(端点, 参数) -> 序列化后的 JSON
+# 服务商元数据是静态的，只有配置变化会影响 is_configured，配置时清空
+_provider_payload_cache: Dict[tuple, bytes] = {}
 
-    return result
 
+def _provider_payload_response(key: tuple, build) -> Response:
+    """返回缓存的服务商信息响应，未命中时构建并序列化"""
+    body = _provider_payload_cache.get(key)
+    if body is None:
+        body = ORJSONResponse(build()).body
+        _provider_payload_cache[key] = body
+    return Response(body, media_type="application/json")
 
-@router.get("/providers/{provider_type}")
-async def get_provider(provider_type: str) -> ProviderInfoResponse:
-    """获取单个服务商详情"""
-    try:
-        pt = ProviderType(provider_type)
-    except ValueError:
-        raise HTTPException(status_code=404, detail=f"未知的服务商: {provider_type}")
 
-    info = ProviderManager.get_provider_info(pt)
-    if not info:
-        raise HTTPException(status_code=404, detail=f"服务商信息不存在: {provider_type}")
+def _provider_to_dict(info, configured, models_full: bool = True) -> dict:
+    """
+    将服务商信息转换为响应字典
 
-    manager = get_provider_manager()
-    return ProviderInfoResponse(
-        provider_type=info.provider_type.value,
-        display_name=info.display_name,
-        website=info.website,
-        capabilities=[c.value for c in info.capabilities],
-        description=info.description,
-        api_doc_url=info.api_doc_url,
-        is_configured=info.provider_type in manager._configs,
-        models=[
+    Args:
+        info: 服务商信息
+        configured: 已配置的服务商集合
+        models_full: 是否包含模型的完整参数（否则只包含名称）
+    """
+    if models_full:
+        models = [
             {
                 "name": m.name,
                 "display_name": m.display_name,
@@ -173,17 +157,52 @@ async def get_provider(provider_type: str) -> ProviderInfoResponse:
             }
             for m in info.models
         ]
-    )
+    else:
+        models = [{"name": m.name, "display_name": m.display_name} for m in info.models]
+
+    return {
+        "provider_type": info.provider_type.value,
+        "display_name": info.display_name,
+        "website": info.website,
+        "capabilities": [c.value for c in info.capabilities],
+        "description": info.description,
+        "api_doc_url": info.api_doc_url,
+        "is_configured": info.provider_type in configured,
+        "models": models,
+    }
+
+
+@router.get("/providers", response_model=List[ProviderInfoResponse])
+async def list_providers():
+    """列出所有支持的AI服务商"""
+    manager = get_provider_manager()
+
+    # 直接构建字典并用 orjson 输出，跳过 Pydantic 校验和 jsonable_encoder
+    return _provider_payload_response(("list",), lambda: [
+        _provider_to_dict(p, manager._configs) for p in ProviderManager.list_providers()
+    ])
+
+
+@router.get("/providers/{provider_type}", response_model=ProviderInfoResponse)
+async def get_provider(provider_type: str):
+    """获取单个服务商详情"""
+    pt = _PROVIDER_TYPES.get(provider_type)
+    if pt is None:
+        raise HTTPException(status_code=404, detail=f"未知的服务商: {provider_type}")
+    info = ProviderManager.get_provider_info(pt)
+    if not info:
+        raise HTTPException(status_code=404, detail=f"服务商信息不存在: {provider_type}")
+
+    manager = get_provider_manager()
+    return _provider_payload_response(("get", pt), lambda: _provider_to_dict(info, manager._configs))
 
 
 @router.post("/providers/configure")
 async def configure_provider(request: ProviderConfigRequest):
     """配置服务商API密钥"""
-    try:
-        pt = ProviderType(request.provider_type)
-    except ValueError:
+    pt = _PROVIDER_TYPES.get(request.provider_type)
+    if pt is None:
         raise HTTPException(status_code=400, detail=f"未知的服务商: {request.provider_type}")
-
     manager = get_provider_manager()
     manager.configure(
         pt,
@@ -191,62 +210,66 @@ async def configure_provider(request: ProviderConfigRequest):
         base_url=request.base_url,
         model=request.model
     )
+    _provider_payload_cache.clear()
+    _get_association_generator.cache_clear()
 
     return {"status": "success", "message": f"服务商 {request.provider_type} 配置成功"}
 
 
-@router.get("/providers/by-capability/{capability}")
-async def list_providers_by_capability(capability: str) -> List[ProviderInfoResponse]:
+@router.get("/providers/by-capability/{capability}", response_model=List[ProviderInfoResponse])
+async def list_providers_by_capability(capability: str):
     """按能力筛选服务商"""
-    try:
-        cap = ProviderCapability(capability)
-    except ValueError:
+    cap = _CAPABILITIES.get(capability)
+    if cap is None:
         raise HTTPException(status_code=400, detail=f"未知的能力: {capability}")
-
-    providers = ProviderManager.list_providers_by_capability(cap)
     manager = get_provider_manager()
-
-    return [
-        ProviderInfoResponse(
-            provider_type=p.provider_type.value,
-            display_name=p.display_name,
-            website=p.website,
-            capabilities=[c.value for c in p.capabilities],
-            description=p.description,
-            api_doc_url=p.api_doc_url,
-            is_configured=p.provider_type in manager._configs,
-            models=[{"name": m.name, "display_name": m.display_name} for m in p.models]
-        )
-        for p in providers
-    ]
+    return _provider_payload_response(("by-capability", cap), lambda: [
+        _provider_to_dict(p, manager._configs, models_full=False)
+        for p in ProviderManager.list_providers_by_capability(cap)
+    ])
 
 
 # ==================== 豆包3D模型配置API ====================
 
+# 配置内容为静态数据，启动时序列化一次，请求时直接返回字节
+_DOUBAO_3D_CONFIG = DoubaoProvider.get_3d_config()
+_DOUBAO_3D_CONFIG_BODY = orjson.dumps({
+    "model_name": _DOUBAO_3D_CONFIG["model_name"],
+    "subdivision_levels": _DOUBAO_3D_CONFIG["subdivision_levels"],
+    "file_formats": _DOUBAO_3D_CONFIG["file_formats"],
+    "price_per_model": _DOUBAO_3D_CONFIG["price_per_model"],
+    "estimated_time": _DOUBAO_3D_CONFIG["estimated_time"],
+    "description": "豆包Seed3D是基于Diffusion Transformer架构的3D生成模型，"
+                  "能够在几分钟内输出包含多边形面片与PBR材质的高精度资产。"
+                  "生成结果具备边缘锐利清晰、薄面结构稳定不变形的特征。",
+    "features": [
+        "支持30k/100k/200k三种面数精度",
+        "支持GLB/OBJ/USD/USDZ多种格式",
+        "输出包含RGB和PBR两种纹理版本",
+        "6K分辨率下几何细节清晰可见",
+    ]
+})
+
+
 @router.get("/doubao/3d-config")
 async def get_doubao_3d_config():
     """获取豆包3D模型生成的完整配置选项"""
-    config = DoubaoProvider.get_3d_config()
-    return {
-        "model_name": config["model_name"],
-        "subdivision_levels": config["subdivision_levels"],
-        "file_formats": config["file_formats"],
-        "price_per_model": config["price_per_model"],
-        "estimated_time": config["estimated_time"],
-        "description": "豆包Seed3D是基于Diffusion Transformer架构的3D生成模型，"
-                      "能够在几分钟内输出包含多边形面片与PBR材质的高精度资产。"
-                      "生成结果具备边缘锐利清晰、薄面结构稳定不变形的特征。",
-        "features": [
-            "支持30k/100k/200k三种面数精度",
-            "支持GLB/OBJ/USD/USDZ多种格式",
-            "输出包含RGB和PBR两种纹理版本",
-            "6K分辨率下几何细节清晰可见",
-        ]
-    }
+    return Response(content=_DOUBAO_3D_CONFIG_BODY, media_type="application/json")
 
 
 # ==================== 联想生成API ====================
 
+# 联想结果缓存：相同 (服务商, 模型, prompt) 直接复用之前的模型输出；
+# 配置 MF_CACHE_DIR 后持久化到磁盘，重启后仍可复用
+_association_cache = create_response_cache(maxsize=256, ttl=86400, name="association", persistent=True)
+
+
+@functools.lru_cache(maxsize=64)
+def _get_association_generator(provider_type: ProviderType, model: Optional[str]) -> AssociationGenerator:
+    """按 (服务商, 模型) 复用联想生成器，生成器本身无请求级状态"""
+    return AssociationGenerator(provider_type=provider_type, model=model, cache=_association_cache)
+
+
 class AssociationRequest(BaseModel):
     """联想生成请求"""
     category: str = Field(..., description="物品类别，如'椅子'、'变压器'")
@@ -255,6 +278,7 @@ class AssociationRequest(BaseModel):
     custom_requirements: Optional[str] = Field(None, description="自定义要求")
     provider: str = Field("deepseek", description="使用的AI服务商")
     model: Optional[str] = Field(None, description="使用的模型")
+    no_cache: bool = Field(False, description="忽略缓存的联想结果，重新生成")
 
 
 class AssociationResponse(BaseModel):
@@ -277,33 +301,23 @@ async def generate_association(request: AssociationRequest):
     """
     manager = get_provider_manager()
 
-    try:
-        provider_type = ProviderType(request.provider)
-    except ValueError:
+    provider_type = _PROVIDER_TYPES.get(request.provider)
+    if provider_type is None:
         raise HTTPException(status_code=400, detail=f"未知的服务商: {request.provider}")
-
     if provider_type not in manager._configs:
         raise HTTPException(status_code=400, detail=f"服务商 {request.provider} 未配置API密钥")
 
-    try:
-        mode = AssociationMode(request.mode)
-    except ValueError:
-        mode = AssociationMode.COMPREHENSIVE
+    mode = _ASSOCIATION_MODES.get(request.mode, AssociationMode.COMPREHENSIVE)
 
-    generator = AssociationGenerator(
-        provider_type=provider_type,
-        model=request.model
-    )
+    generator = _get_association_generator(provider_type, request.model)
 
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(
-        None,
-        lambda: generator.generate(
-            category=request.category,
-            count=request.count,
-            mode=mode,
-            custom_requirements=request.custom_requirements
-        )
+    result = await asyncio.to_thread(
+        generator.generate,
+        category=request.category,
+        count=request.count,
+        mode=mode,
+        custom_requirements=request.custom_requirements,
+        no_cache=request.no_cache
     )
 
     return AssociationResponse(
@@ -369,6 +383,14 @@ class BatchStatusResponse(BaseModel):
     current_items: List[Dict]
 
 
+async def _run_batch_job(job, category: str):
+    """后台运行批量任务，结束（已写入索引）后使模型库缓存失效"""
+    try:
+        await job.arun(category)
+    finally:
+        await asyncio.to_thread(library_cache.bump_version)
+
+
 @router.post("/batch/create")
 async def create_batch(request: BatchCreateRequest, background_tasks: BackgroundTasks):
     """创建批量生成任务"""
@@ -397,7 +419,7 @@ async def create_batch(request: BatchCreateRequest, background_tasks: Background
         job.set_pipeline(pipeline)
 
     # 后台运行
-    background_tasks.add_task(job.run, request.category)
+    background_tasks.add_task(_run_batch_job, job, request.category)
 
     return {
         "batch_id": job.batch_id,
@@ -424,30 +446,23 @@ async def create_batch_from_association(
     manager = get_provider_manager()
     assoc_req = request.association_request
 
-    try:
-        provider_type = ProviderType(assoc_req.provider)
-    except ValueError:
+    provider_type = _PROVIDER_TYPES.get(assoc_req.provider)
+    if provider_type is None:
         raise HTTPException(status_code=400, detail=f"未知的服务商: {assoc_req.provider}")
-
     if provider_type not in manager._configs:
         raise HTTPException(status_code=400, detail=f"服务商 {assoc_req.provider} 未配置")
 
-    try:
-        mode = AssociationMode(assoc_req.mode)
-    except ValueError:
-        mode = AssociationMode.COMPREHENSIVE
-
-    generator = AssociationGenerator(provider_type=provider_type, model=assoc_req.model)
-
-    loop = asyncio.get_event_loop()
-    assoc_result = await loop.run_in_executor(
-        None,
-        lambda: generator.generate(
-            category=assoc_req.category,
-            count=assoc_req.count,
-            mode=mode,
-            custom_requirements=assoc_req.custom_requirements
-        )
+    mode = _ASSOCIATION_MODES.get(assoc_req.mode, AssociationMode.COMPREHENSIVE)
+
+    generator = _get_association_generator(provider_type, assoc_req.model)
+
+    assoc_result = await asyncio.to_thread(
+        generator.generate,
+        category=assoc_req.category,
+        count=assoc_req.count,
+        mode=mode,
+        custom_requirements=assoc_req.custom_requirements,
+        no_cache=assoc_req.no_cache
     )
 
     # 创建批量任务
@@ -475,7 +490,7 @@ async def create_batch_from_association(
         job.set_pipeline(pipeline)
 
     # 后台运行
-    background_tasks.add_task(job.run, assoc_req.category)
+    background_tasks.add_task(_run_batch_job, job, assoc_req.category)
 
     return {
         "batch_id": job.batch_id,
@@ -499,17 +514,18 @@ async def get_batch_status(batch_id: str):
     if not job:
         raise HTTPException(status_code=404, detail=f"批量任务 {batch_id} 不存在")
 
+    # 状态端点被高频轮询，直接输出字典，跳过 Pydantic 模型构建
     progress = job.get_progress()
-    return BatchStatusResponse(
-        batch_id=progress.batch_id,
-        total=progress.total,
-        completed=progress.completed,
-        failed=progress.failed,
-        running=progress.running,
-        pending=progress.pending,
-        progress_percent=progress.progress_percent,
-        current_items=progress.current_items
-    )
+    return ORJSONResponse({
+        "batch_id": progress.batch_id,
+        "total": progress.total,
+        "completed": progress.completed,
+        "failed": progress.failed,
+        "running": progress.running,
+        "pending": progress.pending,
+        "progress_percent": progress.progress_percent,
+        "current_items": progress.current_items,
+    })
 
 
 @router.get("/batch")
@@ -532,6 +548,83 @@ async def get_batch_models(batch_id: str):
 
 # ==================== 模型库API ====================
 
+# 模型库扫描线程池：并发提交大量小文件读取，由内核并行完成 I/O
+_scan_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="mf-scan")
+atexit.register(_scan_executor.shutdown, wait=False)
+
+
+def _scan_job_dir(job_dir: Path) -> Optional[tuple]:
+    """读取任务目录的 result.json，返回 (结果, 是否有图像)，不存在时返回 None"""
+    try:
+        result = orjson.loads((job_dir / "result.json").read_bytes())
+    except FileNotFoundError:
+        return None
+    return result, (job_dir / "image.png").exists()
+
+
+def _list_job_dirs(output_dir: Path) -> List[Path]:
+    """列出输出目录下的任务目录（scandir 的目录项自带类型信息，无需逐个 stat）"""
+    with os.scandir(output_dir) as it:
+        return [Path(entry.path) for entry in it if entry.name != "batch" and entry.is_dir()]
+
+
+def _job_dir_size(job_dir: Path) -> Optional[int]:
+    """计算已完成任务目录的总大小，未完成（无 result.json）时返回 None"""
+    if not os.path.exists(os.path.join(job_dir, "result.json")):
+        return None
+
+    # 单次遍历只累加文件大小；扫描期间被删除或重命名（流水线会重命名临时目录）的条目直接跳过
+    total = 0
+    stack = [job_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        try:
+                            total += entry.stat().st_size
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+    return total
+
+
+def _library_cache_key(output_dir: Path, namespace: str, **params) -> str:
+    """
+    模型库缓存键
+
+    包含输出目录的 mtime（新增/重命名任务目录时变化）和模型库版本号
+    （任务或批量任务写完结果后递增，保存在缓存后端中由所有进程共享），其余变化由 TTL 兜底。
+    """
+    try:
+        mtime_ns = output_dir.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = 0
+    return library_cache.make_key(namespace, {
+        "output_dir": str(output_dir),
+        "mtime_ns": mtime_ns,
+        "version": library_cache.version(),
+        **params
+    })
+
+
+def _cached_library(output_dir: Path, namespace: str, compute, **params):
+    """
+    读取模型库缓存，未命中时计算并写入
+
+    在工作线程中调用：计算缓存键、访问缓存（可能是 Redis）和目录扫描都是阻塞操作。
+    """
+    cache_key = _library_cache_key(output_dir, namespace, **params)
+    result = library_cache.get(cache_key)
+    if result is None:
+        result = compute()
+        library_cache.set(cache_key, result)
+    return result
+
+
 @router.get("/library/browse")
 async def browse_model_library(
     category: Optional[str] = None,
@@ -544,55 +637,85 @@ async def browse_model_library(
     支持分页和按类别筛选
     """
     output_dir = Path(os.environ.get("OUTPUT_DIR", "./output"))
-    models = []
 
-    # 扫描单个生成的模型
-    for job_dir in output_dir.iterdir():
-        if job_dir.is_dir() and job_dir.name != "batch":
-            result_file = job_dir / "result.json"
-            if result_file.exists():
-                import json
-                with open(result_file, "r", encoding="utf-8") as f:
-                    result = json.load(f)
-                    models.append({
-                        "id": job_dir.name,
-                        "type": "single",
-                        "description": result.get("description", ""),
-                        "created_at": result.get("created_at"),
-                        "model_files": result.get("model_files", []),
-                        "image_path": f"/api/v1/jobs/{job_dir.name}/image" if (job_dir / "image.png").exists() else None
-                    })
-
-    # 扫描批量生成的模型
-    batch_dir = output_dir / "batch"
-    if batch_dir.exists():
-        manager = get_batch_manager()
-        for batch in manager.list_completed_batches():
-            batch_models = manager.get_batch_models(batch["batch_id"])
-            for m in batch_models:
-                if category is None or category.lower() in batch.get("category", "").lower():
-                    models.append({
-                        "id": m["id"],
-                        "type": "batch",
-                        "batch_id": batch["batch_id"],
-                        "name": m["name"],
-                        "description": m["description"],
-                        "created_at": batch.get("created_at"),
-                        "model_files": m.get("model_files", []),
-                    })
-
-    # 分页
-    total = len(models)
     start = (page - 1) * page_size
     end = start + page_size
 
-    return {
+    # 目录扫描和缓存访问均为阻塞 I/O，放到线程中执行，避免阻塞事件循环
+    result = await asyncio.to_thread(
+        _cached_library, output_dir, "browse",
+        functools.partial(_browse_library, output_dir, category, start, end),
+        category=category, start=start, end=end
+    )
+
+    total = result["total"]
+    header = {
         "total": total,
         "page": page,
         "page_size": page_size,
         "total_pages": (total + page_size - 1) // page_size,
-        "models": models[start:end]
     }
+    return StreamingResponse(_stream_library_page(header, result["models"]), media_type="application/json")
+
+
+async def _stream_library_page(header: dict, models: List[dict]):
+    """逐个序列化模型并分段输出，序列化与网络发送交替进行"""
+    # header 为 {...}，去掉结尾的 } 后接 models 数组
+    yield orjson.dumps(header)[:-1] + b',"models":['
+    for i, model in enumerate(models):
+        yield (b"," if i else b"") + orjson.dumps(model, default=str)
+    yield b"]}"
+
+
+def _browse_library(output_dir: Path, category: Optional[str], start: int, end: int) -> dict:
+    """
+    扫描输出目录并返回 [start, end) 范围内的模型
+
+    单个生成的模型只按 result.json 是否存在计数，仅读取当前页内的结果文件。
+    """
+    models = []
+
+    # 单个生成的模型（当前页内的 result.json 并发读取）
+    single_dirs = [d for d in _list_job_dirs(output_dir) if (d / "result.json").exists()]
+    page_dirs = single_dirs[start:end]
+    for job_dir, scanned in zip(page_dirs, _scan_executor.map(_scan_job_dir, page_dirs)):
+        if scanned is None:
+            continue
+        result, has_image = scanned
+        models.append({
+            "id": job_dir.name,
+            "type": "single",
+            "description": result.get("description", ""),
+            "created_at": result.get("created_at"),
+            "model_files": result.get("model_files", []),
+            "image_path": f"/api/v1/jobs/{job_dir.name}/image" if has_image else None
+        })
+
+    # 批量生成的模型排在单个模型之后
+    batch_models = _collect_batch_models(output_dir, category)
+    batch_start = max(start - len(single_dirs), 0)
+    batch_end = max(end - len(single_dirs), 0)
+    models.extend(batch_models[batch_start:batch_end])
+
+    return {"total": len(single_dirs) + len(batch_models), "models": models}
+
+
+def _collect_batch_models(output_dir: Path, category: Optional[str]) -> List[dict]:
+    """收集已完成批量任务中的模型"""
+    if not (output_dir / "batch").exists():
+        return []
+    return [
+        {
+            "id": m["id"],
+            "type": "batch",
+            "batch_id": m["batch_id"],
+            "name": m["name"],
+            "description": m["description"],
+            "created_at": m["created_at"],
+            "model_files": m["model_files"],
+        }
+        for m in get_batch_manager().list_completed_models(category)
+    ]
 
 
 @router.get("/library/stats")
@@ -600,26 +723,28 @@ async def get_library_stats():
     """获取模型库统计信息"""
     output_dir = Path(os.environ.get("OUTPUT_DIR", "./output"))
 
+    return await asyncio.to_thread(
+        _cached_library, output_dir, "stats",
+        functools.partial(_compute_library_stats, output_dir)
+    )
+
+
+def _compute_library_stats(output_dir: Path) -> dict:
+    """统计模型库数量和占用空间"""
     single_count = 0
     batch_count = 0
     total_size = 0
 
-    # 统计单个模型
-    for job_dir in output_dir.iterdir():
-        if job_dir.is_dir() and job_dir.name != "batch":
-            if (job_dir / "result.json").exists():
-                single_count += 1
-                for f in job_dir.rglob("*"):
-                    if f.is_file():
-                        total_size += f.stat().st_size
+    # 统计单个模型（各任务目录的遍历和 stat 在扫描线程池中并行执行）
+    job_dirs = _list_job_dirs(output_dir)
+    for size in _scan_executor.map(_job_dir_size, job_dirs):
+        if size is not None:
+            single_count += 1
+            total_size += size
 
     # 统计批量模型
-    batch_dir = output_dir / "batch"
-    if batch_dir.exists():
-        manager = get_batch_manager()
-        for batch in manager.list_completed_batches():
-            batch_models = manager.get_batch_models(batch["batch_id"])
-            batch_count += len(batch_models)
+    if (output_dir / "batch").exists():
+        batch_count = len(get_batch_manager().list_completed_models())
 
     return {
         "single_models": single_count,
@@ -7,14 +7,70 @@
 - 为每个物品生成详细的3D模型描述prompt
 """
 
-import json
-from typing import List, Dict, Any, Optional
+import re
+import asyncio
+import functools
+from typing import List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
-from ..providers.base import ChatMessage, ProviderType
+import orjson
+
+from ..providers.base import ChatMessage, ChatResponse, ProviderType
 from ..providers.manager import get_provider_manager, ProviderManager
 
+# 兜底：从首个 [ 到最后一个 ] 的贪婪匹配
+_JSON_ARRAY_RE = re.compile(r'\[[\s\S]*\]')
+
+# 括号扫描关心的 token：转义序列（含被转义的字符）、引号和括号
+_JSON_TOKEN_RE = re.compile(r'\\.|["\[\]{}]', re.DOTALL)
+
+
+def _find_json_array(content: str) -> Optional[str]:
+    """
+    单次扫描定位第一个 JSON 数组
+
+    从第一个 [ 开始记录括号深度，忽略字符串字面量中的括号，
+    返回与之匹配的 ] 为止的片段；没有完整数组时返回 None。
+    普通字符由正则在 C 层跳过，Python 循环只处理括号、引号和转义序列。
+    """
+    start = content.find("[")
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    for match in _JSON_TOKEN_RE.finditer(content, start):
+        token = match.group()
+        if in_string:
+            # 转义序列整体匹配为一个 token，直接跳过
+            if token == '"':
+                in_string = False
+        elif token == '"':
+            in_string = True
+        elif token == "[" or token == "{":
+            depth += 1
+        elif token == "]" or token == "}":
+            depth -= 1
+            if depth == 0:
+                return content[start:match.end()]
+    return None
+
+
+def _extract_json_array(content: str) -> Optional[Any]:
+    """从混有其他文本的响应中提取 JSON 数组：先括号扫描，失败再用贪婪正则"""
+    candidates = (_find_json_array(content), _JSON_ARRAY_RE.search(content))
+    for candidate in candidates:
+        if candidate is None:
+            continue
+        if not isinstance(candidate, str):
+            candidate = candidate.group()
+        try:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            continue
+    return None
+
 
 class AssociationMode(str, Enum):
     """联想模式"""
@@ -99,6 +155,15 @@ class AssociationGenerator:
 
 请直接输出JSON数组，不要包含其他内容。"""
 
+    # 模板按占位符预先切分（{category} / {count} / {mode_description}），
+    # 生成时只需拼接字符串，无需每次重新解析约 800 字的模板
+    _PROMPT_PARTS = tuple(
+        ASSOCIATION_PROMPT_TEMPLATE.format(category="\0", count="\0", mode_description="\0").split("\0")
+    )
+
+    # 使用较高温度增加多样性
+    TEMPERATURE = 0.8
+
     MODE_DESCRIPTIONS = {
         AssociationMode.STYLE: "按不同设计风格联想：现代、古典、工业、简约、复古、未来、民族等",
         AssociationMode.SPECIFICATION: "按不同规格参数联想：尺寸大小、功率等级、容量、精度等",
@@ -113,6 +178,7 @@ class AssociationGenerator:
         self,
         provider_type: ProviderType = ProviderType.DEEPSEEK,
         model: Optional[str] = None,
+        cache: Optional[Any] = None,
     ):
         """
         初始化联想生成器
@@ -120,9 +186,12 @@ class AssociationGenerator:
         Args:
             provider_type: 使用的AI服务商
             model: 使用的模型名称
+            cache: 可选的响应缓存（提供 make_key/get/set，如 PromptResponseCache），
+                   相同 prompt 命中时直接复用之前的模型输出，不再调用大模型
         """
         self.provider_type = provider_type
         self.model = model
+        self.cache = cache
         self.manager = get_provider_manager()
 
     def generate(
@@ -131,6 +200,7 @@ class AssociationGenerator:
         count: int = 20,
         mode: AssociationMode = AssociationMode.COMPREHENSIVE,
         custom_requirements: Optional[str] = None,
+        no_cache: bool = False,
     ) -> AssociationResult:
         """
         为指定类别生成联想物品列表
@@ -140,45 +210,27 @@ class AssociationGenerator:
             count: 生成数量（建议10-50）
             mode: 联想模式
             custom_requirements: 自定义要求
+            no_cache: 忽略已缓存的结果，重新调用大模型（新结果仍会写入缓存）
 
         Returns:
             联想生成结果
         """
-        # 构建prompt
-        mode_description = self.MODE_DESCRIPTIONS.get(mode, self.MODE_DESCRIPTIONS[AssociationMode.COMPREHENSIVE])
-        if custom_requirements:
-            mode_description += f"\n\n额外要求：{custom_requirements}"
-
-        prompt = self.ASSOCIATION_PROMPT_TEMPLATE.format(
-            category=category,
-            count=count,
-            mode_description=mode_description,
-        )
-
-        # 调用AI
-        messages = [ChatMessage(role="user", content=prompt)]
-        response = self.manager.chat(
-            self.provider_type,
-            messages,
-            model=self.model,
-            temperature=0.8,  # 使用较高温度增加多样性
-            max_tokens=8000,
-        )
+        # 调用AI（相同 prompt 优先读取缓存）
+        messages = self._build_messages(category, count, mode, custom_requirements)
+        cache_key, cached = self._cache_lookup(messages, no_cache)
+        if cached is None:
+            response = self.manager.chat(
+                self.provider_type,
+                messages,
+                model=self.model,
+                temperature=self.TEMPERATURE,
+                max_tokens=8000,
+            )
+            cached = self._cache_store(cache_key, response)
 
         # 解析响应
-        items = self._parse_response(response.content, category)
-
-        return AssociationResult(
-            category=category,
-            mode=mode,
-            items=items,
-            total_count=len(items),
-            metadata={
-                "provider": self.provider_type.value,
-                "model": response.model,
-                "requested_count": count,
-            }
-        )
+        items = self._parse_response(cached["content"], category)
+        return self._build_result(category, mode, items, cached["model"], count)
 
     async def agenerate(
         self,
@@ -186,29 +238,104 @@ class AssociationGenerator:
         count: int = 20,
         mode: AssociationMode = AssociationMode.COMPREHENSIVE,
         custom_requirements: Optional[str] = None,
+        no_cache: bool = False,
     ) -> AssociationResult:
         """异步生成联想物品列表"""
+        messages = self._build_messages(category, count, mode, custom_requirements)
+        cache_key, cached = self._cache_lookup(messages, no_cache)
+        if cached is None:
+            response = await self.manager.achat(
+                self.provider_type,
+                messages,
+                model=self.model,
+                temperature=self.TEMPERATURE,
+                max_tokens=8000,
+            )
+            cached = self._cache_store(cache_key, response)
+
+        # 解析放到线程中，与其他进行中的请求重叠
+        items = await asyncio.to_thread(self._parse_response, cached["content"], category)
+        return self._build_result(category, mode, items, cached["model"], count)
+
+    async def agenerate_many(
+        self,
+        requests: List[Dict[str, Any]],
+        concurrency: int = 5,
+    ) -> List[Union[AssociationResult, BaseException]]:
+        """
+        并发为多个类别生成联想物品列表
+
+        Args:
+            requests: 请求参数列表，每项为 agenerate 的关键字参数
+                      （如 {"category": "椅子", "count": 20}）
+            concurrency: 同时进行的请求数上限，避免超出服务商的 QPM 限制
+
+        Returns:
+            与 requests 顺序一致的结果列表，单个请求失败时对应位置为异常对象
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def run_one(params: Dict[str, Any]) -> AssociationResult:
+            async with sem:
+                return await self.agenerate(**params)
+
+        # 所有请求共用服务商的连接池，全部完成后关闭
+        async with self.manager.async_session(self.provider_type):
+            return await asyncio.gather(
+                *(run_one(params) for params in requests),
+                return_exceptions=True,
+            )
+
+    def _build_messages(
+        self,
+        category: str,
+        count: int,
+        mode: AssociationMode,
+        custom_requirements: Optional[str],
+    ) -> List[ChatMessage]:
+        """构建联想请求消息"""
         mode_description = self.MODE_DESCRIPTIONS.get(mode, self.MODE_DESCRIPTIONS[AssociationMode.COMPREHENSIVE])
         if custom_requirements:
             mode_description += f"\n\n额外要求：{custom_requirements}"
 
-        prompt = self.ASSOCIATION_PROMPT_TEMPLATE.format(
-            category=category,
-            count=count,
-            mode_description=mode_description,
-        )
-
-        messages = [ChatMessage(role="user", content=prompt)]
-        response = await self.manager.achat(
-            self.provider_type,
-            messages,
-            model=self.model,
-            temperature=0.8,
-            max_tokens=8000,
-        )
-
-        items = self._parse_response(response.content, category)
+        head, after_category, after_count, tail = self._PROMPT_PARTS
+        prompt = "".join((head, category, after_category, str(count), after_count, mode_description, tail))
+        return [ChatMessage(role="user", content=prompt)]
 
+    def _cache_lookup(
+        self,
+        messages: List[ChatMessage],
+        no_cache: bool = False,
+    ) -> Tuple[Optional[str], Optional[dict]]:
+        """查询响应缓存，返回 (缓存键, 缓存的响应)；未配置缓存时均为 None"""
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.make_key("association", {
+            "provider": self.provider_type.value,
+            "model": self.model,
+            "temperature": self.TEMPERATURE,
+            "prompt": messages[0].content,
+        })
+        if no_cache:
+            return cache_key, None
+        return cache_key, self.cache.get(cache_key)
+
+    def _cache_store(self, cache_key: Optional[str], response: ChatResponse) -> dict:
+        """缓存模型的原始输出（解析开销很小，命中后重新解析即可）"""
+        cached = {"content": response.content, "model": response.model}
+        if cache_key is not None:
+            self.cache.set(cache_key, cached)
+        return cached
+
+    def _build_result(
+        self,
+        category: str,
+        mode: AssociationMode,
+        items: List[AssociatedItem],
+        model: str,
+        count: int,
+    ) -> AssociationResult:
+        """组装联想生成结果"""
         return AssociationResult(
             category=category,
             mode=mode,
@@ -216,7 +343,7 @@ class AssociationGenerator:
             total_count=len(items),
             metadata={
                 "provider": self.provider_type.value,
-                "model": response.model,
+                "model": model,
                 "requested_count": count,
             }
         )
@@ -228,17 +355,11 @@ class AssociationGenerator:
         # 提取JSON
         try:
             # 尝试直接解析
-            data = json.loads(content)
-        except json.JSONDecodeError:
+            data = orjson.loads(content)
+        except orjson.JSONDecodeError:
             # 尝试提取JSON部分
-            import re
-            json_match = re.search(r'\[[\s\S]*\]', content)
-            if json_match:
-                try:
-                    data = json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    return items
-            else:
+            data = _extract_json_array(content)
+            if data is None:
                 return items
 
         if not isinstance(data, list):
@@ -351,11 +472,52 @@ class CategorySuggester:
     @classmethod
     def search_category(cls, keyword: str) -> List[str]:
         """搜索相关类别"""
-        results = []
         keyword = keyword.lower()
+        industries, positions, grams = cls._search_index()
+
+        # 行业名称匹配时返回该行业下的全部类别
+        results = {}
+        for industry, categories in industries:
+            if keyword in industry:
+                results.update(dict.fromkeys(categories))
+
+        # 类别名称匹配：先用单字/双字索引取候选集，再做子串校验
+        if not keyword:
+            candidates = positions.keys()
+        elif len(keyword) == 1:
+            candidates = grams.get(keyword, ())
+        else:
+            candidates = None
+            for i in range(len(keyword) - 1):
+                matched = grams.get(keyword[i:i + 2])
+                if not matched:
+                    candidates = ()
+                    break
+                candidates = matched if candidates is None else candidates & matched
+        for name in sorted(candidates, key=positions.__getitem__):
+            if keyword in name.lower():
+                results[name] = None
+
+        return list(results)
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _search_index(cls):
+        """
+        构建类别搜索索引（首次搜索时构建一次）
+
+        Returns:
+            (小写行业名与其类别列表, 类别在类别库中的顺序, 单字/双字 -> 包含它的类别集合)
+        """
+        industries = []
+        positions: Dict[str, int] = {}
+        grams: Dict[str, set] = {}
         for industry, categories in cls.CATEGORY_LIBRARY.items():
-            if keyword in industry.lower():
-                results.extend(categories)
-            else:
-                results.extend([c for c in categories if keyword in c.lower()])
-        return list(set(results))
+            industries.append((industry.lower(), categories))
+            for name in categories:
+                positions.setdefault(name, len(positions))
+                lowered = name.lower()
+                for n in (1, 2):
+                    for i in range(len(lowered) - n + 1):
+                        grams.setdefault(lowered[i:i + n], set()).add(name)
+        return industries, positions, grams
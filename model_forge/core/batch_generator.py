@@ -9,9 +9,13 @@
 """
 
 import os
+import re
+import time
+import random
 import asyncio
+import contextlib
 import uuid
-import json
+import functools
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Callable, Union
@@ -19,6 +23,25 @@ from dataclasses import dataclass, field
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from collections import Counter
+
+import orjson
+
+# 文件名中需替换的字符：只保留字母数字（\w 与 str.isalnum() 一致）、_ 和 -
+_UNSAFE_NAME_RE = re.compile(r"[^\w-]")
+
+# 可重试的临时错误：超时、连接失败、限流 (429) 和服务端错误 (5xx)
+_TRANSIENT_ERROR_RE = re.compile(
+    r"time(?:d ?)?out|connection|rate.?limit|resource.?exhausted|unavailable|\b(?:429|5\d\d)\b|超时|限流",
+    re.IGNORECASE,
+)
+
+
+def _is_transient(error: Exception) -> bool:
+    """判断错误是否值得重试（流水线把异常转成了错误信息，因此同时按类型和信息判断）"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return bool(_TRANSIENT_ERROR_RE.search(str(error)))
 
 
 @dataclass
@@ -98,7 +121,12 @@ class BatchGenerator:
     def __init__(self, config: BatchConfig):
         self.config = config
         self.batch_id = str(uuid.uuid4())[:8]
+        self._batch_dir = Path(config.output_base_dir) / self.batch_id
+        self._date_tag = datetime.now().strftime("%Y%m%d")
         self._items: List[BatchItem] = []
+        # 各状态的项目数和运行中的项目，随状态变化增量维护，查询进度时无需遍历全部项目
+        self._status_counts: Counter = Counter()
+        self._running: Dict[str, BatchItem] = {}
         self._lock = threading.Lock()
         self._progress_callback: Optional[Callable] = None
         self._pipeline = None
@@ -124,64 +152,78 @@ class BatchGenerator:
         Returns:
             添加的BatchItem列表
         """
-        batch_items = []
-        for item in items:
-            batch_item = BatchItem(
+        return self._append_items([
+            BatchItem(
                 name=item.get("name", ""),
                 description=item.get("description", ""),
                 prompt=item.get("prompt"),
             )
-            batch_items.append(batch_item)
-            self._items.append(batch_item)
-        return batch_items
+            for item in items
+        ])
 
     def add_from_association(self, association_result) -> List[BatchItem]:
         """从联想结果添加项目"""
-        items = []
-        for assoc_item in association_result.items:
-            items.append({
-                "name": assoc_item.name,
-                "description": assoc_item.description,
-                "prompt": assoc_item.prompt,
-            })
-        return self.add_items(items)
+        return self._append_items([
+            BatchItem(
+                name=assoc_item.name,
+                description=assoc_item.description,
+                prompt=assoc_item.prompt,
+            )
+            for assoc_item in association_result.items
+        ])
+
+    def _append_items(self, batch_items: List[BatchItem]) -> List[BatchItem]:
+        """登记新项目并更新状态计数"""
+        with self._lock:
+            self._items.extend(batch_items)
+            self._status_counts.update(item.status for item in batch_items)
+        return batch_items
 
     def get_progress(self) -> BatchProgress:
         """获取当前进度"""
+        # 锁内只复制计数和运行中项目的引用，构建响应放到锁外，不阻塞工作线程更新状态
         with self._lock:
-            completed = sum(1 for item in self._items if item.status == "completed")
-            failed = sum(1 for item in self._items if item.status == "failed")
-            running = sum(1 for item in self._items if item.status == "running")
-            pending = sum(1 for item in self._items if item.status == "pending")
+            counts = self._status_counts.copy()
+            running_items = list(self._running.values())
             total = len(self._items)
 
-            progress_percent = (completed + failed) / total * 100 if total > 0 else 0
+        completed = counts["completed"]
+        failed = counts["failed"]
+        progress_percent = (completed + failed) / total * 100 if total > 0 else 0
 
-            current_items = [
-                {
-                    "id": item.id,
-                    "name": item.name,
-                    "status": item.status,
-                    "stage": item.stage,
-                    "progress": item.progress,
-                }
-                for item in self._items if item.status == "running"
-            ]
-
-            return BatchProgress(
-                batch_id=self.batch_id,
-                total=total,
-                completed=completed,
-                failed=failed,
-                running=running,
-                pending=pending,
-                progress_percent=progress_percent,
-                current_items=current_items,
-            )
+        current_items = [
+            {
+                "id": item.id,
+                "name": item.name,
+                "status": item.status,
+                "stage": item.stage,
+                "progress": item.progress,
+            }
+            for item in running_items
+        ]
+
+        return BatchProgress(
+            batch_id=self.batch_id,
+            total=total,
+            completed=completed,
+            failed=failed,
+            running=counts["running"],
+            pending=counts["pending"],
+            progress_percent=progress_percent,
+            current_items=current_items,
+        )
 
     def _update_item(self, item: BatchItem, **kwargs):
         """更新项目状态"""
         with self._lock:
+            status = kwargs.get("status", item.status)
+            if status != item.status:
+                self._status_counts[item.status] -= 1
+                self._status_counts[status] += 1
+                if status == "running":
+                    self._running[item.id] = item
+                else:
+                    self._running.pop(item.id, None)
             for key, value in kwargs.items():
                 setattr(item, key, value)
 
@@ -191,69 +233,148 @@ class BatchGenerator:
     def _generate_output_path(self, item: BatchItem, category: str) -> Path:
         """生成输出路径"""
         # 清理名称
-        safe_name = "".join(c if c.isalnum() or c in "_-" else "_" for c in item.name)
+        safe_name = _UNSAFE_NAME_RE.sub("_", item.name)
 
         # 应用命名模式
         dir_name = self.config.naming_pattern.format(
             category=category,
             name=safe_name[:30],
             id=item.id,
-            date=datetime.now().strftime("%Y%m%d"),
+            date=self._date_tag,
         )
 
-        return Path(self.config.output_base_dir) / self.batch_id / dir_name
+        return self._batch_dir / dir_name
 
     def _generate_single(self, item: BatchItem, category: str) -> BatchItem:
         """生成单个3D模型"""
+        output_dir, progress_callback = self._start_item(item, category)
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            # 运行流水线（临时错误按配置重试）
+            result = self._run_pipeline(item, output_dir, progress_callback)
+        except Exception as e:
+            self._fail_item(item, e)
+        else:
+            self._complete_item(item, result)
+        return item
+
+    async def _agenerate_single(self, item: BatchItem, category: str) -> BatchItem:
+        """异步版本的 _generate_single"""
+        output_dir, progress_callback = self._start_item(item, category)
+        try:
+            await asyncio.to_thread(output_dir.mkdir, parents=True, exist_ok=True)
+            result = await self._arun_pipeline(item, output_dir, progress_callback)
+        except Exception as e:
+            self._fail_item(item, e)
+        else:
+            self._complete_item(item, result)
+        return item
+
+    def _start_item(self, item: BatchItem, category: str):
+        """标记项目开始运行，返回 (输出目录, 进度回调)"""
         if not self._pipeline:
             raise ValueError("Pipeline not set. Call set_pipeline() first.")
 
-        try:
-            self._update_item(
-                item,
-                status="running",
-                started_at=datetime.now().isoformat(),
-            )
+        output_dir = self._generate_output_path(item, category)
+        self._update_item(
+            item,
+            status="running",
+            started_at=datetime.now().isoformat(),
+            output_dir=str(output_dir),
+        )
 
-            output_dir = self._generate_output_path(item, category)
-            output_dir.mkdir(parents=True, exist_ok=True)
-            item.output_dir = str(output_dir)
-
-            # 进度回调
-            def progress_callback(info):
-                stage = info.get("stage", "")
-                if "prompt" in stage:
-                    self._update_item(item, stage="prompt_generation", progress=20)
-                elif "image" in stage:
-                    self._update_item(item, stage="image_generation", progress=50)
-                elif "model" in stage or "processing" in stage:
-                    self._update_item(item, stage="model_generation", progress=80)
-
-            # 运行流水线
-            result = self._pipeline.run(
-                description=item.description,
-                custom_prompt=item.prompt,
-                output_dir=output_dir,
-                progress_callback=progress_callback,
-            )
+        # 进度回调
+        def progress_callback(info):
+            stage = info.get("stage", "")
+            if "prompt" in stage:
+                self._update_item(item, stage="prompt_generation", progress=20)
+            elif "image" in stage:
+                self._update_item(item, stage="image_generation", progress=50)
+            elif "model" in stage or "processing" in stage:
+                self._update_item(item, stage="model_generation", progress=80)
+
+        return output_dir, progress_callback
+
+    def _complete_item(self, item: BatchItem, result):
+        """标记项目完成"""
+        self._update_item(
+            item,
+            status="completed",
+            progress=100,
+            result=result.__dict__ if hasattr(result, "__dict__") else result,
+            completed_at=datetime.now().isoformat(),
+        )
 
-            self._update_item(
-                item,
-                status="completed",
-                progress=100,
-                result=result.__dict__ if hasattr(result, "__dict__") else result,
-                completed_at=datetime.now().isoformat(),
-            )
+    def _fail_item(self, item: BatchItem, error: Exception):
+        """标记项目失败"""
+        self._update_item(
+            item,
+            status="failed",
+            error=str(error),
+            completed_at=datetime.now().isoformat(),
+        )
 
-        except Exception as e:
-            self._update_item(
-                item,
-                status="failed",
-                error=str(e),
-                completed_at=datetime.now().isoformat(),
-            )
+    def _run_pipeline(self, item: BatchItem, output_dir: Path, progress_callback: Callable):
+        """
+        运行流水线，网络超时、限流、服务端错误等临时错误按 retry_count 重试
 
-        return item
+        重试间隔为 retry_delay 的指数退避加随机抖动；参数错误等永久性错误直接抛出。
+        流水线返回失败结果（而非抛出异常）时同样视为失败。
+        """
+        for attempt in range(self.config.retry_count + 1):
+            try:
+                result = self._pipeline.run(
+                    description=item.description,
+                    custom_prompt=item.prompt,
+                    output_dir=output_dir,
+                    progress_callback=progress_callback,
+                )
+            except Exception as e:
+                error = e
+            else:
+                error = self._result_error(result)
+                if error is None:
+                    return result
+
+            self._check_retry(item, attempt, error)
+            time.sleep(self._retry_delay(attempt))
+
+    async def _arun_pipeline(self, item: BatchItem, output_dir: Path, progress_callback: Callable):
+        """异步版本的 _run_pipeline，使用 pipeline.run_async，重试等待不占用线程"""
+        for attempt in range(self.config.retry_count + 1):
+            try:
+                result = await self._pipeline.run_async(
+                    description=item.description,
+                    custom_prompt=item.prompt,
+                    output_dir=output_dir,
+                    progress_callback=progress_callback,
+                )
+            except Exception as e:
+                error = e
+            else:
+                error = self._result_error(result)
+                if error is None:
+                    return result
+
+            self._check_retry(item, attempt, error)
+            await asyncio.sleep(self._retry_delay(attempt))
+
+    @staticmethod
+    def _result_error(result) -> Optional[Exception]:
+        """流水线返回失败结果时转换为异常，成功时返回 None"""
+        if getattr(result, "stage", None) != "failed":
+            return None
+        return RuntimeError(getattr(result, "error", None) or "流水线失败")
+
+    def _check_retry(self, item: BatchItem, attempt: int, error: Exception):
+        """已用完重试次数或为永久性错误时抛出，否则记录重试阶段"""
+        if attempt == self.config.retry_count or not _is_transient(error):
+            raise error
+        self._update_item(item, stage=f"retry_{attempt + 1}")
+
+    def _retry_delay(self, attempt: int) -> float:
+        """第 attempt 次失败后的重试间隔：指数退避加随机抖动"""
+        return self.config.retry_delay * (2 ** attempt) + random.random()
 
     def run(self, category: str = "batch") -> BatchResult:
         """
@@ -266,9 +387,10 @@ class BatchGenerator:
             批量生成结果
         """
         start_time = datetime.now()
+        self._date_tag = start_time.strftime("%Y%m%d")
 
         # 创建输出目录
-        batch_dir = Path(self.config.output_base_dir) / self.batch_id
+        batch_dir = self._batch_dir
         batch_dir.mkdir(parents=True, exist_ok=True)
 
         # 并行执行
@@ -285,6 +407,43 @@ class BatchGenerator:
                 except Exception as e:
                     self._update_item(item, status="failed", error=str(e))
 
+        return self._finish(batch_dir, category, start_time)
+
+    async def arun(self, category: str = "batch") -> BatchResult:
+        """
+        异步运行批量生成
+
+        各项目通过 pipeline.run_async 在事件循环中并发执行，asyncio.Semaphore 把同时运行的
+        项目数限制为 max_parallel；等待远端任务和重试期间不占用线程。
+        """
+        start_time = datetime.now()
+        self._date_tag = start_time.strftime("%Y%m%d")
+
+        batch_dir = self._batch_dir
+        await asyncio.to_thread(batch_dir.mkdir, parents=True, exist_ok=True)
+
+        semaphore = asyncio.Semaphore(self.config.max_parallel)
+
+        async def generate_one(item: BatchItem) -> BatchItem:
+            async with semaphore:
+                return await self._agenerate_single(item, category)
+
+        # 所有项目共用流水线的连接池，全部完成后关闭
+        session = self._pipeline.async_session() if self._pipeline else contextlib.nullcontext()
+        async with session:
+            results = await asyncio.gather(
+                *(generate_one(item) for item in self._items),
+                return_exceptions=True,
+            )
+
+        for item, result in zip(self._items, results):
+            if isinstance(result, Exception):
+                self._update_item(item, status="failed", error=str(result))
+
+        return await asyncio.to_thread(self._finish, batch_dir, category, start_time)
+
+    def _finish(self, batch_dir: Path, category: str, start_time: datetime) -> BatchResult:
+        """写入索引并汇总批量生成结果"""
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
 
@@ -294,8 +453,8 @@ class BatchGenerator:
             index_file = self._create_index(batch_dir, category)
 
         # 统计结果
-        completed = sum(1 for item in self._items if item.status == "completed")
-        failed = sum(1 for item in self._items if item.status == "failed")
+        completed = self._status_counts["completed"]
+        failed = self._status_counts["failed"]
 
         return BatchResult(
             batch_id=self.batch_id,
@@ -312,15 +471,14 @@ class BatchGenerator:
             index_file=index_file,
         )
 
-    async def arun(self, category: str = "batch") -> BatchResult:
-        """异步运行批量生成"""
-        # 使用asyncio在线程池中运行
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.run, category)
-
     def _create_index(self, batch_dir: Path, category: str) -> str:
-        """创建索引文件"""
-        index_data = {
+        """
+        创建索引文件
+
+        逐项序列化写入（每行一个项目），不在内存中构建完整的索引结构；
+        先写临时文件再原子替换，扫描模型库时不会读到写了一半的索引。
+        """
+        header = {
             "batch_id": self.batch_id,
             "category": category,
             "created_at": datetime.now().isoformat(),
@@ -329,31 +487,61 @@ class BatchGenerator:
                 "file_format": self.config.file_format,
                 "max_parallel": self.config.max_parallel,
             },
-            "items": []
         }
 
-        for item in self._items:
-            item_info = {
-                "id": item.id,
-                "name": item.name,
-                "description": item.description,
-                "status": item.status,
-                "output_dir": item.output_dir,
-            }
-            if item.status == "completed" and item.result:
-                # 添加模型文件路径
-                result = item.result
-                if isinstance(result, dict):
-                    item_info["model_files"] = result.get("model_files", [])
-                    item_info["image_path"] = result.get("image_path")
-            index_data["items"].append(item_info)
-
         index_file = batch_dir / "index.json"
-        with open(index_file, "w", encoding="utf-8") as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
+        tmp_file = batch_dir / "index.json.tmp"
+        with open(tmp_file, "wb") as f:
+            # 去掉头部对象的结尾 }，接着写 items 数组
+            f.write(orjson.dumps(header)[:-1])
+            f.write(b',"items":[\n')
+            for i, item in enumerate(self._items):
+                if i:
+                    f.write(b",\n")
+                f.write(orjson.dumps(self._index_entry(item)))
+            f.write(b"\n]}\n")
+        os.replace(tmp_file, index_file)
 
         return str(index_file)
 
+    @staticmethod
+    def _index_entry(item: BatchItem) -> Dict:
+        """索引中单个项目的信息"""
+        item_info = {
+            "id": item.id,
+            "name": item.name,
+            "description": item.description,
+            "status": item.status,
+            "output_dir": item.output_dir,
+        }
+        if item.status == "completed" and item.result:
+            # 添加模型文件路径
+            result = item.result
+            if isinstance(result, dict):
+                item_info["model_files"] = result.get("model_files", [])
+                item_info["image_path"] = result.get("image_path")
+        return item_info
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_index(path: str, mtime_ns: int, size: int) -> Dict:
+    """解析批次索引文件，以 (路径, mtime, 大小) 为键缓存，未变化的索引不会重复解析"""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _load_index(index_file: Path) -> Optional[Dict]:
+    """
+    读取批次索引，不存在时返回 None
+
+    返回的字典在多次调用间共享，调用方不应修改。
+    """
+    try:
+        st = index_file.stat()
+    except OSError:
+        return None
+    return _parse_index(str(index_file), st.st_mtime_ns, st.st_size)
+
 
 class BatchJobManager:
     """批量任务管理器 - 管理多个批量生成任务"""
@@ -399,32 +587,24 @@ class BatchJobManager:
             return batches
 
         for batch_dir in self.storage_dir.iterdir():
-            if batch_dir.is_dir():
-                index_file = batch_dir / "index.json"
-                if index_file.exists():
-                    with open(index_file, "r", encoding="utf-8") as f:
-                        index_data = json.load(f)
-                        batches.append({
-                            "batch_id": index_data.get("batch_id"),
-                            "category": index_data.get("category"),
-                            "created_at": index_data.get("created_at"),
-                            "item_count": len(index_data.get("items", [])),
-                            "path": str(batch_dir),
-                        })
+            index_data = _load_index(batch_dir / "index.json")
+            if index_data is not None:
+                batches.append({
+                    "batch_id": index_data.get("batch_id"),
+                    "category": index_data.get("category"),
+                    "created_at": index_data.get("created_at"),
+                    "item_count": len(index_data.get("items", [])),
+                    "path": str(batch_dir),
+                })
 
         return sorted(batches, key=lambda x: x.get("created_at", ""), reverse=True)
 
     def get_batch_models(self, batch_id: str) -> List[Dict]:
         """获取批次中的所有模型"""
-        batch_dir = self.storage_dir / batch_id
-        index_file = batch_dir / "index.json"
-
-        if not index_file.exists():
+        index_data = _load_index(self.storage_dir / batch_id / "index.json")
+        if index_data is None:
             return []
 
-        with open(index_file, "r", encoding="utf-8") as f:
-            index_data = json.load(f)
-
         models = []
         for item in index_data.get("items", []):
             if item.get("status") == "completed":
@@ -439,3 +619,50 @@ class BatchJobManager:
                 models.append(model_info)
 
         return models
+
+    def list_completed_models(self, category: Optional[str] = None) -> List[Dict]:
+        """
+        一次遍历列出所有批次中已完成的模型
+
+        每个批次的 index.json 只读取一次，等价于 list_completed_batches()
+        加逐批 get_batch_models()，但避免了重复读取和解析。
+
+        Args:
+            category: 按批次类别过滤（不区分大小写的子串匹配），None 表示不过滤
+
+        Returns:
+            模型列表，按批次创建时间倒序，每项附带 batch_id / category / created_at
+        """
+        if not self.storage_dir.exists():
+            return []
+
+        needle = category.lower() if category else None
+        batches = []
+        for batch_dir in self.storage_dir.iterdir():
+            index_data = _load_index(batch_dir / "index.json")
+            if index_data is None:
+                continue
+            batch_category = index_data.get("category") or ""
+            if needle is not None and needle not in batch_category.lower():
+                continue
+            batches.append(index_data)
+
+        batches.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+
+        models = []
+        for index_data in batches:
+            for item in index_data.get("items", []):
+                if item.get("status") == "completed":
+                    models.append({
+                        "id": item.get("id"),
+                        "name": item.get("name"),
+                        "description": item.get("description"),
+                        "output_dir": item.get("output_dir"),
+                        "model_files": item.get("model_files", []),
+                        "image_path": item.get("image_path"),
+                        "batch_id": index_data.get("batch_id"),
+                        "category": index_data.get("category"),
+                        "created_at": index_data.get("created_at"),
+                    })
+
+        return models
@@ -2,21 +2,66 @@
 Image Generator - 使用 Gemini API 生成设备图像
 """
 
+import os
 import base64
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from google import genai
-from google.genai import types
+
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    """
+    写入文件；目录通常已由流水线创建，仅在不存在时才 mkdir
+
+    图像数据一次性写出，直接使用文件描述符，不经过缓冲 IO 对象。
+    """
+    try:
+        fd = os.open(path, _WRITE_FLAGS, 0o644)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=None)
+def _generate_config():
+    """图像生成请求配置（首次使用时创建，所有实例共享）"""
+    from google.genai import types
+
+    return types.GenerateContentConfig(
+        response_modalities=["IMAGE", "TEXT"],
+    )
 
 
 class ImageGenerator:
     """使用 Gemini 生成高质量设备图像"""
 
+    # 多视角生成使用的相机角度
+    VIEWS = [
+        {"name": "front", "suffix": "front view, straight on, symmetrical"},
+        {"name": "quarter_left", "suffix": "three-quarter front-left view, 45 degrees"},
+        {"name": "left", "suffix": "left side view, 90 degrees"},
+        {"name": "quarter_right", "suffix": "three-quarter front-right view, 45 degrees"},
+    ]
+
     def __init__(self, api_key: str):
+        # google-genai 导入较慢（约 0.6 秒），创建实例时才加载
+        from google import genai
+
         self.client = genai.Client(api_key=api_key)
         self.model = "gemini-2.0-flash-exp-image-generation"
 
     def generate(self, prompt: str, negative_prompt: str = None,
-                 output_path: Path = None) -> dict:
+                 output_path: Path = None, include_base64: bool = True) -> dict:
         """
         根据提示词生成图像
 
@@ -24,24 +69,40 @@ class ImageGenerator:
             prompt: 图像生成提示词
             negative_prompt: 负面提示词
             output_path: 输出路径（可选）
+            include_base64: 是否返回 image_base64；只需要字节或文件时传 False，跳过编码（值为 None）
 
         Returns:
             包含图像数据和路径的字典
         """
-        # 构建完整提示词
-        full_prompt = prompt
-        if negative_prompt:
-            full_prompt += f"\n\nNegative: {negative_prompt}"
-
         # 调用 Gemini API
         response = self.client.models.generate_content(
             model=self.model,
-            contents=full_prompt,
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE", "TEXT"],
-            )
+            contents=self._build_prompt(prompt, negative_prompt),
+            config=_generate_config()
+        )
+        return self._build_result(response, output_path, include_base64)
+
+    async def agenerate(self, prompt: str, negative_prompt: str = None,
+                        output_path: Path = None, include_base64: bool = True) -> dict:
+        """异步生成图像，参数与返回值同 generate"""
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=self._build_prompt(prompt, negative_prompt),
+            config=_generate_config()
         )
+        # 保存文件等为阻塞操作，放到线程中执行
+        return await asyncio.to_thread(self._build_result, response, output_path, include_base64)
+
+    @staticmethod
+    def _build_prompt(prompt: str, negative_prompt: str = None) -> str:
+        """构建完整提示词"""
+        if negative_prompt:
+            return f"{prompt}\n\nNegative: {negative_prompt}"
+        return prompt
 
+    @staticmethod
+    def _build_result(response, output_path: Path = None, include_base64: bool = True) -> dict:
+        """从 Gemini 响应中提取图像数据，并按需保存"""
         # 提取图像数据
         image_data = None
         text_response = None
@@ -61,60 +122,79 @@ class ImageGenerator:
         # 保存图像
         saved_path = None
         if output_path:
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, "wb") as f:
-                f.write(image_data)
+            if not isinstance(output_path, Path):
+                output_path = Path(output_path)
+            _write_bytes(output_path, image_data)
             saved_path = str(output_path)
 
         return {
             "image_data": image_data,
-            "image_base64": base64.b64encode(image_data).decode("utf-8"),
+            "image_base64": base64.b64encode(image_data).decode("utf-8") if include_base64 else None,
             "saved_path": saved_path,
             "text_response": text_response,
             "size_bytes": len(image_data)
         }
 
     def generate_multiview(self, prompt: str, negative_prompt: str = None,
-                           output_dir: Path = None) -> list:
+                           output_dir: Path = None, include_base64: bool = True) -> list:
         """
         生成多视角图像（用于3D重建）
 
+        各视角的请求并行发出，总耗时约为最慢的单个视角。
+
         Args:
             prompt: 基础提示词
             negative_prompt: 负面提示词
             output_dir: 输出目录
+            include_base64: 是否返回各视角的 image_base64；只保存文件时传 False
 
         Returns:
             多个视角的图像结果列表
         """
-        views = [
-            {"name": "front", "suffix": "front view, straight on, symmetrical"},
-            {"name": "quarter_left", "suffix": "three-quarter front-left view, 45 degrees"},
-            {"name": "left", "suffix": "left side view, 90 degrees"},
-            {"name": "quarter_right", "suffix": "three-quarter front-right view, 45 degrees"},
-        ]
-
-        results = []
-        for view in views:
-            view_prompt = f"{prompt}\n\nCamera angle: {view['suffix']}"
-
-            output_path = None
-            if output_dir:
-                output_path = Path(output_dir) / f"{view['name']}.png"
-
-            try:
-                result = self.generate(
-                    prompt=view_prompt,
-                    negative_prompt=negative_prompt,
-                    output_path=output_path
+        with ThreadPoolExecutor(max_workers=len(self.VIEWS)) as executor:
+            futures = [
+                executor.submit(
+                    self.generate,
+                    **self._view_kwargs(view, prompt, negative_prompt, output_dir),
+                    include_base64=include_base64
                 )
-                result["view_name"] = view["name"]
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    "view_name": view["name"],
-                    "error": str(e)
-                })
-
-        return results
+                for view in self.VIEWS
+            ]
+            return [
+                self._view_result(view, future.exception() or future.result())
+                for view, future in zip(self.VIEWS, futures)
+            ]
+
+    async def agenerate_multiview(self, prompt: str, negative_prompt: str = None,
+                                  output_dir: Path = None, include_base64: bool = True) -> list:
+        """异步生成多视角图像，参数与返回值同 generate_multiview"""
+        results = await asyncio.gather(
+            *(self.agenerate(**self._view_kwargs(view, prompt, negative_prompt, output_dir),
+                             include_base64=include_base64)
+              for view in self.VIEWS),
+            return_exceptions=True,
+        )
+        return [self._view_result(view, result) for view, result in zip(self.VIEWS, results)]
+
+    @staticmethod
+    def _view_kwargs(view: dict, prompt: str, negative_prompt: str, output_dir: Path) -> dict:
+        """单个视角的生成参数"""
+        output_path = None
+        if output_dir:
+            output_path = Path(output_dir) / f"{view['name']}.png"
+        return {
+            "prompt": f"{prompt}\n\nCamera angle: {view['suffix']}",
+            "negative_prompt": negative_prompt,
+            "output_path": output_path,
+        }
+
+    @staticmethod
+    def _view_result(view: dict, result) -> dict:
+        """单个视角的结果，失败时只记录错误信息"""
+        if isinstance(result, BaseException):
+            return {
+                "view_name": view["name"],
+                "error": str(result)
+            }
+        result["view_name"] = view["name"]
+        return result
@@ -4,12 +4,31 @@ Model Generator - 使用火山引擎 Ark API 将图像转换为3D模型
 
 import os
 import time
+import warnings
+import io
 import base64
+import hashlib
+import asyncio
+import random
+import shutil
 import zipfile
 import tempfile
+import httpx
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import Callable, Union
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Final, List, Mapping, Optional, Tuple, Union
+
+from ..providers.base import HTTP2_AVAILABLE, LoopAsyncClient
+
+_DATA_URL_PREFIX = b"data:image/png;base64,"
+
+# 直接作为图像URL传给 API 的字符串前缀
+_URL_PREFIXES = ("http://", "https://", "data:")
 
 
 class ModelGenerator:
@@ -18,31 +37,88 @@ class ModelGenerator:
     API_BASE = "https://ark.cn-beijing.volces.com/api/v3"
     MODEL_NAME = "doubao-seed3d-1-0-250928"
 
-    # 面数质量说明
-    MESH_QUALITY_INFO = {
+    # 面数质量说明（只读，所有实例共享）
+    MESH_QUALITY_INFO: Final[Mapping[str, str]] = MappingProxyType({
         "high": "高质量 (~50k面) - 适用于近景展示、大型复杂设备",
         "medium": "中等质量 (~30k面) - 适用于标准展示、一般设备",
         "low": "低质量 (~10k面) - 适用于远景、简单设备、批量渲染"
-    }
+    })
+
+    # 任务轮询：状态不变时的间隔增长倍数和每次附加的最大随机抖动(秒)
+    POLL_BACKOFF = 1.5
+    POLL_JITTER = 0.5
+
+    # 下载模型 ZIP 时内存缓冲的上限，超过后转存到临时文件
+    ZIP_SPOOL_SIZE = 64 * 1024 * 1024
+
+    # 分段并行下载：服务端支持 Range 且文件大小在此区间内时分 RANGE_PARTS 段同时下载
+    RANGE_PARTS = 4
+    RANGE_MIN_SIZE = 8 * 1024 * 1024
+    RANGE_MAX_SIZE = 256 * 1024 * 1024
+
+    # 任务缓存：记录的有效期(秒)和条目上限，超过上限时按写入时间淘汰最旧的记录
+    TASK_CACHE_TTL = 7 * 86400
+    TASK_CACHE_MAX_ENTRIES = 10000
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_dir: Union[str, Path] = None):
         self.api_key = api_key
+        # 任务缓存目录：设置后相同图像和参数的成功任务会被复用，不再重复上传生成
+        self.cache_dir = Path(cache_dir) if cache_dir else None
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}"
         }
 
-    def _image_to_base64_url(self, image_path: Path) -> str:
+        # 复用连接（keep-alive），轮询任务状态时无需每次重新建立 TLS 连接；
+        # GET 请求遇到网关错误自动重试（创建任务的 POST 不重试，避免重复提交）。
+        # 认证头按请求传入，不挂在会话上，避免下载模型时发送给文件存储服务。
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+
+        # 异步客户端按事件循环懒加载（httpx 连接池绑定创建它的事件循环）；
+        # 安装了 h2 时启用 HTTP/2：批量轮询任务状态时多个请求复用同一条连接
+        self._async_client = LoopAsyncClient(
+            timeout=60,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=30),
+        )
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """获取当前事件循环的异步 HTTP 客户端"""
+        return self._async_client.get()
+
+    def async_session(self):
+        """异步客户端的使用范围，最后一个使用者退出时关闭客户端（见 LoopAsyncClient.session）"""
+        return self._async_client.session()
+
+    def close(self):
+        """关闭 HTTP 会话"""
+        self.session.close()
+
+    async def aclose(self):
+        """关闭同步会话和异步客户端"""
+        self.session.close()
+        await self._async_client.aclose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _image_to_base64_url(self, image_path: Path) -> bytes:
         """将图像文件转换为 base64 data URL"""
         with open(image_path, "rb") as f:
-            image_data = f.read()
-        base64_data = base64.b64encode(image_data).decode("utf-8")
-        return f"data:image/png;base64,{base64_data}"
+            return self._image_bytes_to_base64_url(f.read())
 
-    def _image_bytes_to_base64_url(self, image_data: bytes) -> str:
-        """将图像字节数据转换为 base64 data URL"""
-        base64_data = base64.b64encode(image_data).decode("utf-8")
-        return f"data:image/png;base64,{base64_data}"
+    def _image_bytes_to_base64_url(self, image_data: bytes) -> bytes:
+        """将图像字节数据转换为 base64 data URL（保持为 ASCII 字节，可直接嵌入 JSON 请求体）"""
+        return _DATA_URL_PREFIX + base64.b64encode(image_data)
 
     def create_task(self, image_source: Union[str, bytes, Path],
                     mesh_quality: str = "medium",
@@ -58,57 +134,99 @@ class ModelGenerator:
         Returns:
             任务创建结果
         """
+        url = f"{self.API_BASE}/contents/generations/tasks"
+        body = self._build_body(image_source, mesh_quality, file_format)
+        response = self.session.post(url, headers=self.headers, data=body, timeout=60)
+        response.raise_for_status()
+        return response.json()
+
+    async def acreate_task(self, image_source: Union[str, bytes, Path],
+                           mesh_quality: str = "medium",
+                           file_format: str = "glb") -> dict:
+        """异步创建图生3D任务，参数同 create_task"""
+        url = f"{self.API_BASE}/contents/generations/tasks"
+        body = self._build_body(image_source, mesh_quality, file_format)
+        response = await self._get_async_client().post(url, headers=self.headers, content=body)
+        response.raise_for_status()
+        return response.json()
+
+    def _build_body(self, image_source: Union[str, bytes, Path],
+                    mesh_quality: str, file_format: str) -> bytes:
+        """
+        构建创建任务的 JSON 请求体
+
+        请求体结构固定，按模板拼接：base64 data URL 只含 JSON 安全的 ASCII 字符，
+        以字节形式直接嵌入，不解码为字符串，也不经过通用 JSON 序列化器遍历；
+        其余字段（以及外部图像URL）仍由 orjson 转义。
+        """
         # 处理图像源
         if isinstance(image_source, bytes):
             image_url = self._image_bytes_to_base64_url(image_source)
-        elif isinstance(image_source, Path) or (isinstance(image_source, str) and os.path.exists(image_source)):
+        elif isinstance(image_source, Path):
+            image_url = self._image_to_base64_url(image_source)
+        elif not image_source.startswith(_URL_PREFIXES) and os.path.exists(image_source):
+            # 明显是 URL 的字符串不检查本地文件，省去一次 stat
             image_url = self._image_to_base64_url(Path(image_source))
         else:
-            image_url = image_source  # 假设是URL
+            image_url = orjson.dumps(image_source)[1:-1]  # 假设是URL，转义为 JSON 字符串内容
 
-        url = f"{self.API_BASE}/contents/generations/tasks"
-        payload = {
-            "model": self.MODEL_NAME,
-            "content": [
-                {
-                    "type": "text",
-                    "text": f"--meshquality {mesh_quality} --fileformat {file_format}"
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {"url": image_url}
-                }
-            ]
-        }
+        text = f"--meshquality {mesh_quality} --fileformat {file_format}"
+        return b"".join((
+            b'{"model":', orjson.dumps(self.MODEL_NAME),
+            b',"content":[{"type":"text","text":', orjson.dumps(text),
+            b'},{"type":"image_url","image_url":{"url":"', image_url,
+            b'"}}]}',
+        ))
 
-        response = requests.post(url, headers=self.headers, json=payload, timeout=60)
+    def get_task_status(self, task_id: str) -> dict:
+        """获取任务状态"""
+        url = f"{self.API_BASE}/contents/generations/tasks/{task_id}"
+        response = self.session.get(url, headers=self.headers, timeout=30)
         response.raise_for_status()
         return response.json()
 
-    def get_task_status(self, task_id: str) -> dict:
-        """获取任务状态"""
+    async def aget_task_status(self, task_id: str) -> dict:
+        """异步获取任务状态"""
         url = f"{self.API_BASE}/contents/generations/tasks/{task_id}"
-        response = requests.get(url, headers=self.headers, timeout=30)
+        response = await self._get_async_client().get(url, headers=self.headers, timeout=30)
         response.raise_for_status()
         return response.json()
 
+    @staticmethod
+    def _initial_interval(initial_interval: float, interval: Optional[float]) -> float:
+        """兼容已弃用的 interval 参数"""
+        if interval is None:
+            return initial_interval
+        warnings.warn("interval 参数已弃用，请改用 initial_interval", DeprecationWarning, stacklevel=3)
+        return interval
+
     def wait_for_task(self, task_id: str, timeout: int = 900,
-                      interval: int = 15,
-                      progress_callback: Callable = None) -> dict:
+                      interval: float = None,
+                      progress_callback: Callable = None,
+                      *,
+                      initial_interval: float = 2.0,
+                      max_interval: float = 30.0) -> dict:
         """
         等待任务完成
 
+        轮询间隔从 initial_interval 开始，状态不变时每次乘以 1.5（不超过 max_interval），
+        状态变化时重置为 initial_interval；每次等待附加少量随机抖动。
+
         Args:
             task_id: 任务ID
             timeout: 超时时间(秒)
-            interval: 轮询间隔(秒)
+            interval: 已弃用，等同于 initial_interval（保留位置以兼容旧的位置参数调用）
             progress_callback: 进度回调函数
+            initial_interval: 初始轮询间隔(秒)，仅限关键字参数
+            max_interval: 最大轮询间隔(秒)，仅限关键字参数
 
         Returns:
             最终任务状态
         """
+        initial_interval = self._initial_interval(initial_interval, interval)
         start_time = time.time()
         last_status = None
+        interval = initial_interval
 
         while True:
             elapsed = time.time() - start_time
@@ -120,6 +238,7 @@ class ModelGenerator:
 
             if status != last_status:
                 last_status = status
+                interval = initial_interval
                 if progress_callback:
                     progress_callback({
                         "task_id": task_id,
@@ -133,7 +252,48 @@ class ModelGenerator:
             elif status in ["failed", "cancelled"]:
                 raise Exception(f"任务失败: {result}")
 
-            time.sleep(interval)
+            time.sleep(interval + random.uniform(0, self.POLL_JITTER))
+            interval = min(interval * self.POLL_BACKOFF, max_interval)
+
+    async def await_for_task(self, task_id: str, timeout: int = 900,
+                             interval: float = None,
+                             progress_callback: Callable = None,
+                             *,
+                             initial_interval: float = 2.0,
+                             max_interval: float = 30.0) -> dict:
+        """异步等待任务完成，参数同 wait_for_task；轮询间隔期间不占用线程"""
+        initial_interval = self._initial_interval(initial_interval, interval)
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        last_status = None
+        interval = initial_interval
+
+        while True:
+            elapsed = loop.time() - start_time
+            if elapsed > timeout:
+                raise TimeoutError(f"任务 {task_id} 超时 ({timeout}秒)")
+
+            result = await self.aget_task_status(task_id)
+            status = result.get("status", "unknown")
+
+            if status != last_status:
+                last_status = status
+                interval = initial_interval
+                if progress_callback:
+                    progress_callback({
+                        "task_id": task_id,
+                        "status": status,
+                        "elapsed": elapsed,
+                        "remaining": timeout - elapsed
+                    })
+
+            if status == "succeeded":
+                return result
+            elif status in ["failed", "cancelled"]:
+                raise Exception(f"任务失败: {result}")
+
+            await asyncio.sleep(interval + random.uniform(0, self.POLL_JITTER))
+            interval = min(interval * self.POLL_BACKOFF, max_interval)
 
     def download_model(self, task_result: dict, output_dir: Path) -> dict:
         """
@@ -146,40 +306,137 @@ class ModelGenerator:
         Returns:
             下载结果
         """
-        # 获取文件URL
+        file_url = self._file_url(task_result)
+
+        # 文件较大且服务端支持 Range 时分段并行下载
+        ranges = self._plan_ranges(self._probe_size(file_url))
+        if ranges:
+            buffer = bytearray(ranges[-1][1] + 1)
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                list(executor.map(lambda r: self._download_range(file_url, r, buffer), ranges))
+            return self._extract_zip(io.BytesIO(buffer), output_dir)
+
+        # 下载到内存缓冲（超过 ZIP_SPOOL_SIZE 才落盘），直接交给 ZipFile 解压
+        with self.session.get(file_url, stream=True, timeout=120) as response, \
+                tempfile.SpooledTemporaryFile(max_size=self.ZIP_SPOOL_SIZE) as buffer:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            shutil.copyfileobj(response.raw, buffer, length=1 << 20)
+            buffer.seek(0)
+            return self._extract_zip(buffer, output_dir)
+
+    async def adownload_model(self, task_result: dict, output_dir: Path) -> dict:
+        """异步下载3D模型文件，参数同 download_model；解压在线程中执行"""
+        file_url = self._file_url(task_result)
+        client = self._get_async_client()
+
+        ranges = self._plan_ranges(await self._aprobe_size(file_url))
+        if ranges:
+            buffer = bytearray(ranges[-1][1] + 1)
+            await asyncio.gather(*(self._adownload_range(file_url, r, buffer) for r in ranges))
+            return await asyncio.to_thread(self._extract_zip, io.BytesIO(buffer), output_dir)
+
+        # 缓冲超过 ZIP_SPOOL_SIZE 后会转存到磁盘，写入放到线程中执行，避免阻塞事件循环
+        with tempfile.SpooledTemporaryFile(max_size=self.ZIP_SPOOL_SIZE) as buffer:
+            async with client.stream("GET", file_url, timeout=120) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size=1 << 20):
+                    await asyncio.to_thread(buffer.write, chunk)
+
+            buffer.seek(0)
+            return await asyncio.to_thread(self._extract_zip, buffer, output_dir)
+
+    def _probe_size(self, file_url: str):
+        """请求首字节探测服务端是否支持 Range，支持时返回文件大小，否则返回 None"""
+        try:
+            with self.session.get(file_url, headers={"Range": "bytes=0-0"}, stream=True, timeout=30) as response:
+                return self._range_total(response.status_code, response.headers)
+        except requests.RequestException:
+            return None
+
+    async def _aprobe_size(self, file_url: str):
+        """异步版本的 _probe_size"""
+        try:
+            async with self._get_async_client().stream(
+                "GET", file_url, headers={"Range": "bytes=0-0"}, timeout=30
+            ) as response:
+                return self._range_total(response.status_code, response.headers)
+        except httpx.HTTPError:
+            return None
+
+    @staticmethod
+    def _range_total(status_code: int, headers) -> Optional[int]:
+        """从 206 响应的 Content-Range（bytes 0-0/总大小）中取出文件大小"""
+        if status_code != 206:
+            return None
+        total = headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+
+    def _plan_ranges(self, size: Optional[int]) -> List[Tuple[int, int]]:
+        """将文件切分为闭区间字节范围；不适合分段下载时返回空列表"""
+        if size is None or not self.RANGE_MIN_SIZE <= size <= self.RANGE_MAX_SIZE:
+            return []
+        part = -(-size // self.RANGE_PARTS)
+        return [(start, min(start + part, size) - 1) for start in range(0, size, part)]
+
+    def _download_range(self, file_url: str, byte_range: Tuple[int, int], buffer: bytearray):
+        """下载一个字节范围并写入缓冲区对应位置"""
+        start, end = byte_range
+        with self.session.get(file_url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=120) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise Exception(f"服务端未按 Range 返回分段: bytes={start}-{end}")
+            offset = start
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                buffer[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+        if offset != end + 1:
+            raise Exception(f"分段下载不完整: bytes={start}-{end}")
+
+    async def _adownload_range(self, file_url: str, byte_range: Tuple[int, int], buffer: bytearray):
+        """异步版本的 _download_range"""
+        start, end = byte_range
+        async with self._get_async_client().stream(
+            "GET", file_url, headers={"Range": f"bytes={start}-{end}"}, timeout=120
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise Exception(f"服务端未按 Range 返回分段: bytes={start}-{end}")
+            offset = start
+            async for chunk in response.aiter_bytes(chunk_size=1 << 20):
+                buffer[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+        if offset != end + 1:
+            raise Exception(f"分段下载不完整: bytes={start}-{end}")
+
+    @staticmethod
+    def _file_url(task_result: dict) -> str:
+        """从任务结果中获取文件URL"""
         file_url = task_result.get("content", {}).get("file_url")
         if not file_url:
             raise Exception("任务结果中没有文件URL")
+        return file_url
 
+    @staticmethod
+    def _extract_zip(zip_source, output_dir: Path) -> dict:
+        """解压模型 ZIP（文件路径或文件对象）到输出目录"""
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # 下载文件
-        response = requests.get(file_url, stream=True, timeout=120)
-        response.raise_for_status()
-
-        # 保存并解压
-        with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                tmp_file.write(chunk)
-            tmp_path = tmp_file.name
-
-        # 解压
-        extracted_files = []
-        with zipfile.ZipFile(tmp_path, 'r') as zip_ref:
-            file_list = zip_ref.namelist()
+        with zipfile.ZipFile(zip_source, 'r') as zip_ref:
+            infos = zip_ref.infolist()
             zip_ref.extractall(output_dir)
 
-            for file_name in file_list:
-                extracted_path = output_dir / file_name
-                if extracted_path.exists():
-                    extracted_files.append({
-                        "path": str(extracted_path),
-                        "name": file_name,
-                        "size_bytes": extracted_path.stat().st_size
-                    })
-
-        os.unlink(tmp_path)
+        # 文件大小直接取自 ZIP 目录（解压后的大小），无需逐个 stat；extractall 失败会直接抛出
+        file_list = [info.filename for info in infos]
+        extracted_files = [
+            {
+                "path": str(output_dir / info.filename),
+                "name": info.filename,
+                "size_bytes": info.file_size
+            }
+            for info in infos if not info.is_dir()
+        ]
 
         return {
             "output_dir": str(output_dir),
@@ -205,6 +462,32 @@ class ModelGenerator:
         Returns:
             生成结果
         """
+        # 同一图像和参数已有成功的任务时直接复用，跳过上传和等待
+        cache_key = self._task_cache_key(image_source, mesh_quality, file_format)
+        task_id, task_result = self._reuse_task(cache_key, progress_callback)
+        if task_result is None:
+            task_id, task_result = self._create_and_wait(image_source, mesh_quality, file_format, progress_callback)
+            self._remember_task(cache_key, task_id)
+
+        # 下载模型
+        if progress_callback:
+            progress_callback({"stage": "downloading", "message": "正在下载3D模型..."})
+
+        download_result = self.download_model(task_result, output_dir)
+
+        if progress_callback:
+            progress_callback({"stage": "completed", "message": "3D模型生成完成!"})
+
+        return {
+            "task_id": task_id,
+            "mesh_quality": mesh_quality,
+            "file_format": file_format,
+            **download_result
+        }
+
+    def _create_and_wait(self, image_source: Union[str, bytes, Path], mesh_quality: str,
+                         file_format: str, progress_callback: Optional[Callable]) -> Tuple[str, dict]:
+        """创建任务并等待完成，返回 (任务ID, 任务结果)"""
         # 创建任务
         if progress_callback:
             progress_callback({"stage": "creating_task", "message": "正在创建3D生成任务..."})
@@ -229,12 +512,26 @@ class ModelGenerator:
                 **p
             }) if progress_callback else None
         )
+        return task_id, task_result
+
+    async def agenerate(self, image_source: Union[str, bytes, Path],
+                        output_dir: Path,
+                        mesh_quality: str = "medium",
+                        file_format: str = "glb",
+                        progress_callback: Callable = None) -> dict:
+        """异步完整的3D模型生成流程，参数与返回值同 generate"""
+        cache_key = self._task_cache_key(image_source, mesh_quality, file_format)
+        task_id, task_result = await self._areuse_task(cache_key, progress_callback)
+        if task_result is None:
+            task_id, task_result = await self._acreate_and_wait(
+                image_source, mesh_quality, file_format, progress_callback
+            )
+            await asyncio.to_thread(self._remember_task, cache_key, task_id)
 
-        # 下载模型
         if progress_callback:
             progress_callback({"stage": "downloading", "message": "正在下载3D模型..."})
 
-        download_result = self.download_model(task_result, output_dir)
+        download_result = await self.adownload_model(task_result, output_dir)
 
         if progress_callback:
             progress_callback({"stage": "completed", "message": "3D模型生成完成!"})
@@ -245,3 +542,124 @@ class ModelGenerator:
             "file_format": file_format,
             **download_result
         }
+
+    async def _acreate_and_wait(self, image_source: Union[str, bytes, Path], mesh_quality: str,
+                                file_format: str, progress_callback: Optional[Callable]) -> Tuple[str, dict]:
+        """异步版本的 _create_and_wait"""
+        if progress_callback:
+            progress_callback({"stage": "creating_task", "message": "正在创建3D生成任务..."})
+
+        create_result = await self.acreate_task(image_source, mesh_quality, file_format)
+        task_id = create_result.get("id")
+
+        if not task_id:
+            raise Exception(f"创建任务失败: {create_result}")
+
+        if progress_callback:
+            progress_callback({"stage": "task_created", "task_id": task_id, "message": f"任务已创建: {task_id}"})
+            progress_callback({"stage": "waiting", "message": "等待3D模型生成..."})
+
+        task_result = await self.await_for_task(
+            task_id,
+            progress_callback=lambda p: progress_callback({
+                "stage": "processing",
+                **p
+            }) if progress_callback else None
+        )
+        return task_id, task_result
+
+    def _task_cache_key(self, image_source: Union[str, bytes, Path],
+                        mesh_quality: str, file_format: str) -> Optional[str]:
+        """图像内容与生成参数的哈希；未启用缓存或图像源不是字节数据时返回 None"""
+        if self.cache_dir is None or not isinstance(image_source, bytes):
+            return None
+        digest = hashlib.blake2b(image_source, digest_size=20)
+        digest.update(f"\0{mesh_quality}\0{file_format}".encode())
+        return digest.hexdigest()
+
+    def _cached_task_id(self, cache_key: Optional[str]) -> Optional[str]:
+        """读取缓存的任务ID"""
+        if cache_key is None:
+            return None
+        cache_file = self.cache_dir / cache_key
+        try:
+            if cache_file.stat().st_mtime < time.time() - self.TASK_CACHE_TTL:
+                cache_file.unlink()
+                return None
+            return cache_file.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+
+    def _remember_task(self, cache_key: Optional[str], task_id: str):
+        """记录成功任务的ID（先写临时文件再替换，并发写入不会留下半个文件）"""
+        if cache_key is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_dir / f"{cache_key}.{os.getpid()}.tmp"
+            tmp_file.write_text(task_id, encoding="utf-8")
+            os.replace(tmp_file, self.cache_dir / cache_key)
+            self._prune_task_cache()
+        except OSError:
+            pass
+
+    def _prune_task_cache(self):
+        """删除过期的缓存记录，条目仍超过上限时删除最旧的记录"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+        entries.sort()
+        expired = time.time() - self.TASK_CACHE_TTL
+        excess = len(entries) - self.TASK_CACHE_MAX_ENTRIES
+        for i, (mtime, path) in enumerate(entries):
+            if mtime >= expired and i >= excess:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _forget_task(self, cache_key: str):
+        """删除失效的缓存记录"""
+        try:
+            (self.cache_dir / cache_key).unlink()
+        except OSError:
+            pass
+
+    def _reused_result(self, cache_key: str, task_id: str, task_result: dict,
+                       progress_callback: Optional[Callable]) -> Tuple[Optional[str], Optional[dict]]:
+        """检查缓存任务的最新状态，仍为成功且有文件地址时复用"""
+        if task_result.get("status") != "succeeded" or not task_result.get("content", {}).get("file_url"):
+            self._forget_task(cache_key)
+            return None, None
+        if progress_callback:
+            progress_callback({"stage": "task_reused", "task_id": task_id, "message": f"复用已完成的任务: {task_id}"})
+        return task_id, task_result
+
+    def _reuse_task(self, cache_key: Optional[str],
+                    progress_callback: Optional[Callable]) -> Tuple[Optional[str], Optional[dict]]:
+        """查找可复用的已完成任务，返回 (任务ID, 最新任务结果)，没有时返回 (None, None)"""
+        task_id = self._cached_task_id(cache_key)
+        if task_id is None:
+            return None, None
+        try:
+            task_result = self.get_task_status(task_id)
+        except requests.RequestException:
+            return None, None
+        return self._reused_result(cache_key, task_id, task_result, progress_callback)
+
+    async def _areuse_task(self, cache_key: Optional[str],
+                           progress_callback: Optional[Callable]) -> Tuple[Optional[str], Optional[dict]]:
+        """异步版本的 _reuse_task"""
+        task_id = await asyncio.to_thread(self._cached_task_id, cache_key)
+        if task_id is None:
+            return None, None
+        try:
+            task_result = await self.aget_task_status(task_id)
+        except httpx.HTTPError:
+            return None, None
+        return await asyncio.to_thread(self._reused_result, cache_key, task_id, task_result, progress_callback)
@@ -4,18 +4,49 @@ Model Forge Pipeline - 完整的需求->Prompt->图像->3D模型流水线
 支持多行业领域的通用3D模型生成
 """
 
+import os
+import time
 import uuid
-import json
+import logging
+import queue
+import asyncio
+import functools
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Callable, Optional, Any
-from dataclasses import dataclass, asdict, field
+from typing import Callable, Optional, Any, List, Union, Final
+from dataclasses import dataclass, field, fields
 from enum import Enum
 
+import orjson
+
 from .prompt_generator import PromptGenerator, PromptConfig, IndustryDomain, RenderStyle
-from .image_generator import ImageGenerator
+from .image_generator import ImageGenerator, _write_bytes
 from .model_generator import ModelGenerator
 
+logger = logging.getLogger(__name__)
+
+# 使用自定义提示词时的默认负面提示词
+DEFAULT_NEGATIVE_PROMPT: Final[str] = "cartoon, anime, stylized, fantasy, damaged, rusty, low quality, blurry"
+
+# 列出任务时读取 result.json 的线程数
+_LIST_JOBS_WORKERS = 8
+
+# 写入 image.png 的后台线程（与3D任务提交同时进行）
+_image_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mf-image")
+
+# 待分发进度事件的队列上限，超过后丢弃新的中间进度（终止事件始终保留）
+_PROGRESS_QUEUE_SIZE = 1000
+
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def _write_json(path: Path, data: Any):
+    """以 UTF-8、2 空格缩进写入 JSON 文件（Path 等非原生类型转为字符串）"""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, default=str, option=_JSON_OPTIONS))
+
 
 class PipelineStage(str, Enum):
     """流水线阶段"""
@@ -36,17 +67,25 @@ class PipelineConfig:
     mesh_quality: str = "medium"
     file_format: str = "glb"
     generate_multiview: bool = False
+    # 是否在结果（及 result.json）中保留图像的 base64；图像已保存为 image.png，设为 False 可跳过编码
+    include_image_base64: bool = True
     # Prompt 工程配置
     use_few_shot: bool = True
     use_chain_of_thought: bool = True
     use_self_verification: bool = True
     optimize_iterations: int = 1
+    # 3D任务复用记录的目录，默认 <MF_CACHE_DIR>/image_tasks；均未设置时不复用任务
+    task_cache_dir: Optional[Path] = None
 
     def __post_init__(self):
         if self.output_base_dir is None:
             self.output_base_dir = Path("./output")
         elif isinstance(self.output_base_dir, str):
             self.output_base_dir = Path(self.output_base_dir)
+        if self.task_cache_dir is None and os.environ.get("MF_CACHE_DIR"):
+            self.task_cache_dir = Path(os.environ["MF_CACHE_DIR"]).expanduser() / "image_tasks"
+        elif isinstance(self.task_cache_dir, str):
+            self.task_cache_dir = Path(self.task_cache_dir)
 
 
 @dataclass
@@ -72,11 +111,68 @@ class PipelineResult:
     completed_at: str = None
 
     def to_dict(self):
-        result = asdict(self)
+        # 浅拷贝字段即可：结果只用于立即序列化，asdict 会递归深拷贝 model_files 等列表
+        result = {name: getattr(self, name) for name in _RESULT_FIELDS}
         result["stage"] = self.stage.value if isinstance(self.stage, PipelineStage) else self.stage
         return result
 
 
+_RESULT_FIELDS = tuple(f.name for f in fields(PipelineResult))
+
+
+class ProgressDispatcher:
+    """
+    进度事件分发器
+
+    流水线只把事件放入队列，由一个后台线程按顺序调用进度回调，
+    回调较慢（界面刷新、网络日志等）时不会阻塞流水线本身。
+    """
+
+    _TERMINAL_STAGES = (PipelineStage.COMPLETED.value, PipelineStage.FAILED.value)
+
+    def __init__(self, maxsize: int = _PROGRESS_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def emit(self, callback: Callable, event: dict):
+        """放入一个进度事件；队列已满时丢弃中间进度，终止事件等待入队"""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((callback, event))
+        except queue.Full:
+            if event.get("stage") in self._TERMINAL_STAGES:
+                self._queue.put((callback, event))
+
+    def flush(self, timeout: float = None) -> bool:
+        """等待此前放入的事件全部分发完成"""
+        self._ensure_worker()
+        done = threading.Event()
+        self._queue.put((None, done))
+        return done.wait(timeout)
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._drain, name="mf-progress", daemon=True
+                )
+                self._thread.start()
+
+    def _drain(self):
+        while True:
+            callback, event = self._queue.get()
+            if callback is None:
+                event.set()
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logger.exception("进度回调出错: %s", e)
+
+
 class ModelForgePipeline:
     """
     Model Forge 完整流水线
@@ -89,21 +185,42 @@ class ModelForgePipeline:
     def __init__(self, config: PipelineConfig):
         self.config = config
 
-        # 创建 Prompt 配置
+        # 确保输出目录存在
+        self.config.output_base_dir = Path(config.output_base_dir)
+        self.config.output_base_dir.mkdir(parents=True, exist_ok=True)
+
+        # 进度回调在后台线程中执行
+        self._progress = ProgressDispatcher()
+
+        # list_jobs 快照 (扫描完成时间ms, 输出目录 mtime_ns, 任务列表)
+        self._list_cache = None
+        # 任务结果缓存 result.json 路径 -> (mtime_ns, 解析结果)，文件未修改时不重新解析
+        self._result_cache = {}
+
+    # 各生成器在首次使用时才创建（客户端初始化较重；使用自定义提示词时不需要 Prompt 生成器）
+    @functools.cached_property
+    def prompt_generator(self) -> PromptGenerator:
         prompt_config = PromptConfig(
-            use_few_shot=config.use_few_shot,
-            use_chain_of_thought=config.use_chain_of_thought,
-            use_self_verification=config.use_self_verification,
-            optimize_iterations=config.optimize_iterations
+            use_few_shot=self.config.use_few_shot,
+            use_chain_of_thought=self.config.use_chain_of_thought,
+            use_self_verification=self.config.use_self_verification,
+            optimize_iterations=self.config.optimize_iterations
         )
+        return PromptGenerator(self.config.gemini_api_key, prompt_config)
 
-        self.prompt_generator = PromptGenerator(config.gemini_api_key, prompt_config)
-        self.image_generator = ImageGenerator(config.gemini_api_key)
-        self.model_generator = ModelGenerator(config.ark_api_key)
+    @functools.cached_property
+    def image_generator(self) -> ImageGenerator:
+        return ImageGenerator(self.config.gemini_api_key)
 
-        # 确保输出目录存在
-        self.config.output_base_dir = Path(config.output_base_dir)
-        self.config.output_base_dir.mkdir(parents=True, exist_ok=True)
+    @functools.cached_property
+    def model_generator(self) -> ModelGenerator:
+        # 相同图像的3D任务记录在输出目录之外的缓存目录中，重跑时复用
+        return ModelGenerator(self.config.ark_api_key, cache_dir=self.config.task_cache_dir)
+
+    def preload(self):
+        """提前创建所有生成器（服务启动时调用，避免首个请求承担初始化开销）"""
+        for name in ("prompt_generator", "image_generator", "model_generator"):
+            getattr(self, name)
 
     def run(self, description: str,
             equipment_type: str = None,
@@ -111,7 +228,8 @@ class ModelForgePipeline:
             domain: IndustryDomain = None,
             style: RenderStyle = None,
             custom_prompt: str = None,
-            progress_callback: Callable = None) -> PipelineResult:
+            progress_callback: Callable = None,
+            output_dir: Union[str, Path] = None) -> PipelineResult:
         """
         运行完整流水线
 
@@ -123,44 +241,18 @@ class ModelForgePipeline:
             style: 渲染风格（可选）
             custom_prompt: 自定义提示词（跳过prompt生成阶段）
             progress_callback: 进度回调函数
+            output_dir: 任务目录（可选，如批量生成时由调用方指定；指定时不按 folder_name 重命名）
 
         Returns:
             流水线结果
         """
-        # 初始化（使用临时 UUID，后续根据 LLM 生成的 folder_name 重命名）
-        temp_job_id = str(uuid.uuid4())[:8]
-        job_dir = self.config.output_base_dir / temp_job_id
-        job_dir.mkdir(parents=True, exist_ok=True)
-
-        result = PipelineResult(
-            job_id=temp_job_id,
-            stage=PipelineStage.INIT,
-            description=description,
-            display_name=description[:50],  # 截取前50字符作为显示名
-            created_at=datetime.now().isoformat()
-        )
-
-        def update_progress(stage: PipelineStage, message: str, **kwargs):
-            result.stage = stage
-            if progress_callback:
-                progress_callback({
-                    "job_id": job_id,
-                    "stage": stage.value,
-                    "message": message,
-                    "description": description,
-                    "detected_domain": result.detected_domain,
-                    "style": result.style,
-                    **kwargs
-                })
+        result, job_dir = self._init_job(description, output_dir)
+        update_progress = self._progress_reporter(result, description, progress_callback)
 
         try:
             # 阶段1: 生成Prompt
             if custom_prompt:
-                result.prompt = custom_prompt
-                result.negative_prompt = "cartoon, anime, stylized, fantasy, damaged, rusty, low quality, blurry"
-                result.detected_domain = domain.value if domain else "general"
-                result.style = style.value if style else "photorealistic"
-                update_progress(PipelineStage.PROMPT_GENERATION, "使用自定义提示词")
+                self._use_custom_prompt(result, custom_prompt, domain, style, update_progress)
             else:
                 update_progress(PipelineStage.PROMPT_GENERATION, "正在使用高级Prompt工程生成提示词...")
                 prompt_result = self.prompt_generator.generate(
@@ -170,61 +262,11 @@ class ModelForgePipeline:
                     domain=domain,
                     style=style
                 )
-                result.prompt = prompt_result["prompt"]
-                result.negative_prompt = prompt_result["negative_prompt"]
-                result.analysis = prompt_result.get("analysis")
-                result.confidence = prompt_result.get("confidence")
-                result.detected_domain = prompt_result["detected_domain"]
-                result.style = prompt_result["style"]
-
-                # 获取 LLM 生成的 folder_name
-                llm_folder_name = prompt_result.get("folder_name", "")
-                if llm_folder_name:
-                    result.folder_name = llm_folder_name
-                    # 检查是否存在冲突，如有则添加短 UUID 后缀
-                    target_dir = self.config.output_base_dir / llm_folder_name
-                    if target_dir.exists():
-                        llm_folder_name = f"{llm_folder_name}_{temp_job_id[:4]}"
-                        target_dir = self.config.output_base_dir / llm_folder_name
-                    result.folder_name = llm_folder_name
-
-                    # 重命名目录
-                    job_dir.rename(target_dir)
-                    job_dir = target_dir
-                    result.job_id = llm_folder_name
-
-                update_progress(
-                    PipelineStage.PROMPT_GENERATION,
-                    f"提示词生成完成 (领域: {result.detected_domain}, 置信度: {result.confidence})",
-                    prompt=result.prompt
+                job_dir = self._apply_prompt_result(
+                    result, prompt_result, job_dir, update_progress, rename=output_dir is None
                 )
 
-            # 保存prompt
-            prompt_file = job_dir / "prompt.json"
-            with open(prompt_file, "w", encoding="utf-8") as f:
-                json.dump({
-                    "description": description,
-                    "prompt": result.prompt,
-                    "negative_prompt": result.negative_prompt,
-                    "analysis": result.analysis,
-                    "confidence": result.confidence,
-                    "detected_domain": result.detected_domain,
-                    "style": result.style
-                }, f, ensure_ascii=False, indent=2)
-
-            # 保存 metadata.json
-            metadata_file = job_dir / "metadata.json"
-            with open(metadata_file, "w", encoding="utf-8") as f:
-                json.dump({
-                    "display_name": result.display_name,
-                    "folder_name": result.folder_name or result.job_id,
-                    "description": description,
-                    "equipment_type": equipment_type,
-                    "voltage_level": voltage_level,
-                    "domain": result.detected_domain,
-                    "style": result.style,
-                    "created_at": result.created_at
-                }, f, ensure_ascii=False, indent=2)
+            self._save_job_files(result, job_dir, equipment_type, voltage_level)
 
             # 阶段2: 生成图像
             update_progress(PipelineStage.IMAGE_GENERATION, "正在生成图像...")
@@ -232,70 +274,423 @@ class ModelForgePipeline:
             image_result = self.image_generator.generate(
                 prompt=result.prompt,
                 negative_prompt=result.negative_prompt,
-                output_path=image_path
+                include_base64=self.config.include_image_base64
             )
             result.image_path = str(image_path)
             result.image_base64 = image_result["image_base64"]
             update_progress(PipelineStage.IMAGE_GENERATION, "图像生成完成", image_size=image_result["size_bytes"])
 
-            # 阶段3: 生成3D模型
+            # 阶段3: 生成3D模型（3D任务只需要图像字节，image.png 在后台线程中同时写入）
             update_progress(PipelineStage.MODEL_GENERATION, "正在生成3D模型...")
             model_dir = job_dir / "model"
-            model_result = self.model_generator.generate(
-                image_source=image_result["image_data"],
-                output_dir=model_dir,
-                mesh_quality=self.config.mesh_quality,
-                file_format=self.config.file_format,
-                progress_callback=lambda p: update_progress(
-                    PipelineStage.MODEL_GENERATION,
-                    p.get("message", "处理中..."),
-                    **p
+            image_write = _image_writer.submit(_write_bytes, image_path, image_result["image_data"])
+            try:
+                model_result = self.model_generator.generate(
+                    image_source=image_result["image_data"],
+                    output_dir=model_dir,
+                    mesh_quality=self.config.mesh_quality,
+                    file_format=self.config.file_format,
+                    progress_callback=self._model_progress(update_progress)
                 )
-            )
+            finally:
+                image_write.result()
             result.model_dir = str(model_dir)
             result.model_files = model_result["files"]
 
-            # 完成
-            result.stage = PipelineStage.COMPLETED
-            result.completed_at = datetime.now().isoformat()
-            update_progress(PipelineStage.COMPLETED, "流水线完成!")
-
-            # 保存结果
-            result_file = job_dir / "result.json"
-            with open(result_file, "w", encoding="utf-8") as f:
-                json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+            self._complete_job(result, job_dir, update_progress)
 
         except Exception as e:
-            result.stage = PipelineStage.FAILED
-            result.error = str(e)
-            result.completed_at = datetime.now().isoformat()
-            update_progress(PipelineStage.FAILED, f"流水线失败: {e}", error=str(e))
+            self._fail_job(result, job_dir, e, update_progress)
+
+        # 返回前确保本次运行的进度事件都已送达回调
+        if progress_callback:
+            self._progress.flush()
+        return result
+
+    async def run_async(self, description: str,
+                        equipment_type: str = None,
+                        voltage_level: str = None,
+                        domain: IndustryDomain = None,
+                        style: RenderStyle = None,
+                        custom_prompt: str = None,
+                        progress_callback: Callable = None,
+                        output_dir: Union[str, Path] = None) -> PipelineResult:
+        """
+        异步运行完整流水线，参数与返回值同 run
+
+        图像生成和3D模型任务的创建/轮询/下载使用异步客户端，等待远端任务期间不占用线程，
+        多个流水线可以在同一个事件循环中并发执行；Prompt 生成和文件读写放到线程中执行。
+        """
+        async with self.async_session():
+            return await self._run_async(
+                description, equipment_type, voltage_level, domain, style,
+                custom_prompt, progress_callback, output_dir
+            )
+
+    async def _run_async(self, description: str, equipment_type: str, voltage_level: str,
+                         domain: IndustryDomain, style: RenderStyle, custom_prompt: str,
+                         progress_callback: Callable, output_dir: Union[str, Path]) -> PipelineResult:
+        """run_async 的实现"""
+        result, job_dir = await asyncio.to_thread(self._init_job, description, output_dir)
+        update_progress = self._progress_reporter(result, description, progress_callback)
+
+        try:
+            # 阶段1: 生成Prompt
+            if custom_prompt:
+                self._use_custom_prompt(result, custom_prompt, domain, style, update_progress)
+            else:
+                update_progress(PipelineStage.PROMPT_GENERATION, "正在使用高级Prompt工程生成提示词...")
+                prompt_result = await asyncio.to_thread(
+                    self.prompt_generator.generate,
+                    description=description,
+                    equipment_type=equipment_type,
+                    voltage_level=voltage_level,
+                    domain=domain,
+                    style=style
+                )
+                job_dir = await asyncio.to_thread(
+                    self._apply_prompt_result, result, prompt_result, job_dir, update_progress,
+                    rename=output_dir is None
+                )
+
+            await asyncio.to_thread(self._save_job_files, result, job_dir, equipment_type, voltage_level)
+
+            # 阶段2: 生成图像
+            update_progress(PipelineStage.IMAGE_GENERATION, "正在生成图像...")
+            image_path = job_dir / "image.png"
+            image_result = await self.image_generator.agenerate(
+                prompt=result.prompt,
+                negative_prompt=result.negative_prompt,
+                include_base64=self.config.include_image_base64
+            )
+            result.image_path = str(image_path)
+            result.image_base64 = image_result["image_base64"]
+            update_progress(PipelineStage.IMAGE_GENERATION, "图像生成完成", image_size=image_result["size_bytes"])
 
-            # 保存错误结果
-            result_file = job_dir / "result.json"
-            with open(result_file, "w", encoding="utf-8") as f:
-                json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+            # 阶段3: 生成3D模型（与 image.png 的写入同时进行）
+            update_progress(PipelineStage.MODEL_GENERATION, "正在生成3D模型...")
+            model_dir = job_dir / "model"
+            image_write = asyncio.create_task(
+                asyncio.to_thread(_write_bytes, image_path, image_result["image_data"])
+            )
+            try:
+                model_result = await self.model_generator.agenerate(
+                    image_source=image_result["image_data"],
+                    output_dir=model_dir,
+                    mesh_quality=self.config.mesh_quality,
+                    file_format=self.config.file_format,
+                    progress_callback=self._model_progress(update_progress)
+                )
+            finally:
+                await image_write
+            result.model_dir = str(model_dir)
+            result.model_files = model_result["files"]
+
+            await asyncio.to_thread(self._complete_job, result, job_dir, update_progress)
 
+        except Exception as e:
+            await asyncio.to_thread(self._fail_job, result, job_dir, e, update_progress)
+
+        if progress_callback:
+            await asyncio.to_thread(self._progress.flush)
         return result
 
+    async def run_batch(self, descriptions: List[str], concurrency: int = 4,
+                        **kwargs) -> List[Union[PipelineResult, BaseException]]:
+        """
+        批量运行流水线，最多同时运行 concurrency 个（避免超出服务商的速率限制）
+
+        Args:
+            descriptions: 对象描述列表
+            concurrency: 最大并发数
+            **kwargs: 传给 run_async 的其他参数（对所有描述相同）
+
+        Returns:
+            与 descriptions 顺序一致的结果列表；单个任务抛出的异常作为结果返回，不影响其他任务
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(description: str) -> PipelineResult:
+            async with semaphore:
+                return await self.run_async(description, **kwargs)
+
+        # 整批共用一个连接池，全部完成后关闭
+        async with self.async_session():
+            return await asyncio.gather(
+                *(run_one(description) for description in descriptions),
+                return_exceptions=True
+            )
+
+    def async_session(self):
+        """
+        异步 HTTP 客户端的使用范围
+
+        run_async/run_batch 在其中运行，最后一个使用者退出时在当前事件循环上关闭客户端；
+        在同一事件循环中运行多个流水线的调用方（如批量任务）可在外层进入，整体共用连接池。
+        """
+        return self.model_generator.async_session()
+
+    async def run_many(self, descriptions: List[str], concurrency: int = 4,
+                       **kwargs) -> List[Union[PipelineResult, BaseException]]:
+        """run_batch 的别名（同样受 concurrency 限制）"""
+        return await self.run_batch(descriptions, concurrency=concurrency, **kwargs)
+
+    def _init_job(self, description: str, output_dir: Union[str, Path] = None):
+        """
+        创建任务目录和初始结果
+
+        未指定 output_dir 时使用临时 UUID 目录，后续根据 LLM 生成的 folder_name 重命名；
+        指定时直接使用该目录，任务 ID 为目录名。
+        """
+        if output_dir is not None:
+            job_dir = Path(output_dir)
+            temp_job_id = job_dir.name
+        else:
+            temp_job_id = str(uuid.uuid4())[:8]
+            job_dir = self.config.output_base_dir / temp_job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        result = PipelineResult(
+            job_id=temp_job_id,
+            stage=PipelineStage.INIT,
+            description=description,
+            display_name=description[:50],  # 截取前50字符作为显示名
+            created_at=datetime.now().isoformat()
+        )
+        return result, job_dir
+
+    def _progress_reporter(self, result: PipelineResult, description: str,
+                           progress_callback: Optional[Callable]) -> Callable:
+        """构建进度上报函数：更新结果阶段，并把事件交给后台线程调用进度回调（seq 为本次运行内的事件序号）"""
+        seq = 0
+
+        def update_progress(stage: PipelineStage, message: str, **kwargs):
+            nonlocal seq
+            result.stage = stage
+            if progress_callback:
+                seq += 1
+                self._progress.emit(progress_callback, {
+                    "job_id": result.job_id,
+                    "stage": stage.value,
+                    "message": message,
+                    "description": description,
+                    "detected_domain": result.detected_domain,
+                    "style": result.style,
+                    "seq": seq,
+                    **kwargs
+                })
+
+        return update_progress
+
+    @staticmethod
+    def _model_progress(update_progress: Callable) -> Callable:
+        """将3D模型生成器的进度转发为流水线进度（子阶段记为 model_stage）"""
+        def forward(info: dict):
+            detail = {k: v for k, v in info.items() if k not in ("stage", "message")}
+            update_progress(
+                PipelineStage.MODEL_GENERATION,
+                info.get("message", "处理中..."),
+                model_stage=info.get("stage"),
+                **detail
+            )
+
+        return forward
+
+    @staticmethod
+    def _use_custom_prompt(result: PipelineResult, custom_prompt: str,
+                           domain: Optional[IndustryDomain], style: Optional[RenderStyle],
+                           update_progress: Callable):
+        """使用自定义提示词（跳过prompt生成阶段）"""
+        result.prompt = custom_prompt
+        result.negative_prompt = DEFAULT_NEGATIVE_PROMPT
+        result.detected_domain = domain.value if domain else "general"
+        result.style = style.value if style else "photorealistic"
+        update_progress(PipelineStage.PROMPT_GENERATION, "使用自定义提示词")
+
+    def _apply_prompt_result(self, result: PipelineResult, prompt_result: dict,
+                             job_dir: Path, update_progress: Callable, rename: bool = True) -> Path:
+        """记录 Prompt 生成结果，并按 LLM 生成的 folder_name 重命名任务目录（rename=False 时保留原目录）"""
+        result.prompt = prompt_result["prompt"]
+        result.negative_prompt = prompt_result["negative_prompt"]
+        result.analysis = prompt_result.get("analysis")
+        result.confidence = prompt_result.get("confidence")
+        result.detected_domain = prompt_result["detected_domain"]
+        result.style = prompt_result["style"]
+
+        # 获取 LLM 生成的 folder_name
+        llm_folder_name = prompt_result.get("folder_name", "")
+        if llm_folder_name:
+            result.folder_name = llm_folder_name
+        if llm_folder_name and rename:
+            # 检查是否存在冲突，如有则添加短 UUID 后缀
+            target_dir = self.config.output_base_dir / llm_folder_name
+            if target_dir.exists():
+                llm_folder_name = f"{llm_folder_name}_{result.job_id[:4]}"
+                target_dir = self.config.output_base_dir / llm_folder_name
+            result.folder_name = llm_folder_name
+
+            # 重命名目录
+            job_dir.rename(target_dir)
+            job_dir = target_dir
+            result.job_id = llm_folder_name
+
+        update_progress(
+            PipelineStage.PROMPT_GENERATION,
+            f"提示词生成完成 (领域: {result.detected_domain}, 置信度: {result.confidence})",
+            prompt=result.prompt
+        )
+        return job_dir
+
+    @staticmethod
+    def _save_job_files(result: PipelineResult, job_dir: Path,
+                        equipment_type: Optional[str], voltage_level: Optional[str]):
+        """保存 prompt.json 和 metadata.json"""
+        prompt_file = job_dir / "prompt.json"
+        _write_json(prompt_file, {
+            "description": result.description,
+            "prompt": result.prompt,
+            "negative_prompt": result.negative_prompt,
+            "analysis": result.analysis,
+            "confidence": result.confidence,
+            "detected_domain": result.detected_domain,
+            "style": result.style
+        })
+
+        metadata_file = job_dir / "metadata.json"
+        _write_json(metadata_file, {
+            "display_name": result.display_name,
+            "folder_name": result.folder_name or result.job_id,
+            "description": result.description,
+            "equipment_type": equipment_type,
+            "voltage_level": voltage_level,
+            "domain": result.detected_domain,
+            "style": result.style,
+            "created_at": result.created_at
+        })
+
+    @staticmethod
+    def _complete_job(result: PipelineResult, job_dir: Path, update_progress: Callable):
+        """标记完成并保存结果"""
+        result.stage = PipelineStage.COMPLETED
+        result.completed_at = datetime.now().isoformat()
+        update_progress(PipelineStage.COMPLETED, "流水线完成!")
+
+        result_file = job_dir / "result.json"
+        _write_json(result_file, result.to_dict())
+
+    @staticmethod
+    def _fail_job(result: PipelineResult, job_dir: Path, error: Exception, update_progress: Callable):
+        """标记失败并保存错误结果"""
+        result.stage = PipelineStage.FAILED
+        result.error = str(error)
+        result.completed_at = datetime.now().isoformat()
+        update_progress(PipelineStage.FAILED, f"流水线失败: {error}", error=str(error))
+
+        result_file = job_dir / "result.json"
+        _write_json(result_file, result.to_dict())
+
     def get_job_status(self, job_id: str) -> dict:
         """获取任务状态"""
-        job_dir = self.config.output_base_dir / job_id
-        result_file = job_dir / "result.json"
+        result_file = self.config.output_base_dir / job_id / "result.json"
+        return self._read_job_result(result_file)
+
+    def list_jobs(self, ttl_ms: int = 1000) -> list:
+        """
+        列出所有任务（并行读取各任务的 result.json）
+
+        Args:
+            ttl_ms: 快照有效期(毫秒)；有效期内且输出目录未变化时直接返回上次结果，0 表示不使用快照
+        """
+        jobs = self._cached_job_list(ttl_ms)
+        if jobs is not None:
+            return jobs
+
+        dir_mtime_ns = self._output_dir_mtime_ns()
+        result_files = self._job_result_files()
+        if result_files:
+            with ThreadPoolExecutor(max_workers=min(_LIST_JOBS_WORKERS, len(result_files))) as executor:
+                jobs = list(executor.map(self._read_job_result, result_files))
+        else:
+            jobs = []
+        return self._store_job_list(result_files, jobs, dir_mtime_ns)
+
+    async def alist_jobs(self, ttl_ms: int = 1000) -> list:
+        """异步列出所有任务，读取文件时不阻塞事件循环；参数同 list_jobs"""
+        jobs = await asyncio.to_thread(self._cached_job_list, ttl_ms)
+        if jobs is not None:
+            return jobs
+
+        dir_mtime_ns = await asyncio.to_thread(self._output_dir_mtime_ns)
+        result_files = await asyncio.to_thread(self._job_result_files)
+        jobs = await asyncio.gather(
+            *(asyncio.to_thread(self._read_job_result, path) for path in result_files)
+        )
+        return self._store_job_list(result_files, jobs, dir_mtime_ns)
+
+    def _output_dir_mtime_ns(self) -> Optional[int]:
+        """输出目录的 mtime（任务目录增删时变化）"""
+        try:
+            return self.config.output_base_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _cached_job_list(self, ttl_ms: int) -> Optional[list]:
+        """快照仍有效时返回缓存的任务列表"""
+        cached = self._list_cache
+        if not ttl_ms or cached is None:
+            return None
+        fetched_at, dir_mtime_ns, jobs = cached
+        if time.monotonic() * 1000 - fetched_at >= ttl_ms:
+            return None
+        if self._output_dir_mtime_ns() != dir_mtime_ns:
+            return None
+        return jobs
+
+    def _store_job_list(self, result_files: List[Path], jobs, dir_mtime_ns: Optional[int]) -> list:
+        """排序并保存快照；同时清理已不存在任务的结果缓存"""
+        jobs = self._sort_jobs(jobs)
+        live = set(result_files)
+        for path in [p for p in self._result_cache if p not in live]:
+            self._result_cache.pop(path, None)
+        # 在扫描完成后记录时间，避免扫描耗时吞掉快照有效期
+        self._list_cache = (time.monotonic() * 1000, dir_mtime_ns, jobs)
+        return jobs
+
+    def _job_result_files(self) -> List[Path]:
+        """
+        收集所有任务目录下的 result.json 路径
 
-        if result_file.exists():
-            with open(result_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return None
-
-    def list_jobs(self) -> list:
-        """列出所有任务"""
-        jobs = []
-        if self.config.output_base_dir.exists():
-            for job_dir in self.config.output_base_dir.iterdir():
-                if job_dir.is_dir():
-                    result_file = job_dir / "result.json"
-                    if result_file.exists():
-                        with open(result_file, "r", encoding="utf-8") as f:
-                            jobs.append(json.load(f))
-        return sorted(jobs, key=lambda x: x.get("created_at", ""), reverse=True)
+        scandir 的目录项自带类型信息，判断目录无需额外 stat；result.json 是否存在
+        由读取时处理（不存在的返回 None 并被过滤），不再单独检查。
+        """
+        try:
+            with os.scandir(self.config.output_base_dir) as it:
+                return [
+                    Path(entry.path, "result.json")
+                    for entry in it if entry.is_dir(follow_symlinks=False)
+                ]
+        except FileNotFoundError:
+            return []
+
+    def _read_job_result(self, result_file: Path) -> Optional[dict]:
+        """读取单个任务结果（mtime 未变化时复用上次解析结果），文件不存在时返回 None"""
+        try:
+            mtime_ns = result_file.stat().st_mtime_ns
+            cached = self._result_cache.get(result_file)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
+            with open(result_file, "rb") as f:
+                data = orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
+        self._result_cache[result_file] = (mtime_ns, data)
+        return data
+
+    @staticmethod
+    def _sort_jobs(jobs) -> list:
+        """按创建时间倒序排列任务"""
+        return sorted(
+            (job for job in jobs if job is not None),
+            key=lambda x: x.get("created_at", ""),
+            reverse=True
+        )
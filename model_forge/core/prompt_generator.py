@@ -9,11 +9,26 @@ Enhanced Prompt Generator - 使用高级Prompt工程技术生成高质量3D模
 - Progressive Disclosure (渐进式细节)
 """
 
-import json
-from typing import Optional, List, Dict, Any
+import re
+import asyncio
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
-from google import genai
+
+import orjson
+
+# 单条响应的段落标记，如 "PROMPT:"
+_SECTION_RE = re.compile(r"^[ \t*#]*(ANALYSIS|FOLDER_NAME|PROMPT|NEGATIVE|CONFIDENCE|FINAL_PROMPT):\**", re.M)
+# 批量响应的段落标记，如 "PROMPT[2]:"
+_BATCH_SECTION_RE = re.compile(r"^[ \t*#]*(ANALYSIS|FOLDER_NAME|PROMPT|NEGATIVE|CONFIDENCE|FINAL_PROMPT)\[(\d+)\]:\**", re.M)
+# 验证结果中 "IMPROVED ..." 所在行之后的内容
+_IMPROVED_RE = re.compile(r"improved[^\n]*\n(.+)", re.S | re.I)
+# 清理提示词中的 Markdown 反引号
+_BACKTICKS = str.maketrans("", "", "`")
 
 
 class IndustryDomain(str, Enum):
@@ -50,6 +65,8 @@ class PromptConfig:
     use_self_verification: bool = True
     optimize_iterations: int = 1
     language: str = "en"  # 输出语言: en/zh
+    max_concurrency: int = 5  # agenerate_many 同时进行的最大请求数
+    cache_size: int = 0  # 缓存的 LLM 响应条数，相同的完整提示词直接复用；默认 0 不缓存（API 层已有响应缓存）
 
 
 class PromptGenerator:
@@ -194,6 +211,22 @@ Style: Technical industrial photography, sharp details, accurate proportions"""
         },
     ]
 
+    # 领域检测用的中文关键词
+    CN_DOMAIN_KEYWORDS = {
+        IndustryDomain.POWER_GRID: ["变压器", "断路器", "绝缘子", "母线", "开关", "电力", "电网", "kv"],
+        IndustryDomain.MANUFACTURING: ["机床", "数控", "生产线", "流水线", "冲压"],
+        IndustryDomain.ARCHITECTURE: ["建筑", "房屋", "室内", "装修", "设计"],
+        IndustryDomain.AUTOMOTIVE: ["汽车", "车辆", "发动机", "底盘", "轮胎"],
+        IndustryDomain.AEROSPACE: ["飞机", "卫星", "火箭", "无人机", "航空"],
+        IndustryDomain.MEDICAL: ["医疗", "手术", "诊断", "植入", "假肢"],
+        IndustryDomain.ROBOTICS: ["机器人", "机械臂", "自动化", "伺服"],
+        IndustryDomain.FURNITURE: ["椅子", "桌子", "沙发", "柜子", "家具"],
+        IndustryDomain.ELECTRONICS: ["电子", "电路", "显示器", "手机", "设备"],
+    }
+
+    # LLM 未给出负面提示词时的默认值
+    DEFAULT_NEGATIVE_PROMPT = "cartoon, anime, stylized, low quality, blurry, deformed, unrealistic proportions, bad anatomy"
+
     # 风格提示词模板
     STYLE_TEMPLATES = {
         RenderStyle.PHOTOREALISTIC: "photorealistic 3D render, physically accurate materials, realistic lighting and shadows",
@@ -204,8 +237,8 @@ Style: Technical industrial photography, sharp details, accurate proportions"""
         RenderStyle.MINIMAL: "minimalist 3D render, clean lines, simple materials, soft shadows, elegant composition",
     }
 
-    # 元提示：用于生成提示词的提示词
-    META_PROMPT_TEMPLATE = """You are an expert prompt engineer specializing in generating prompts for AI image generation systems, particularly for 3D model visualization.
+    # 元提示：用于生成提示词的提示词（单条与批量模板共用开头的角色和思维链说明）
+    META_PROMPT_HEADER = """You are an expert prompt engineer specializing in generating prompts for AI image generation systems, particularly for 3D model visualization.
 
 ## Your Task
 Analyze the user's description and generate a highly detailed, structured prompt that will produce an accurate, high-quality 3D model image.
@@ -239,16 +272,17 @@ Follow this reasoning process step by step:
 ### Step 6: Lighting & Style
 - What lighting setup creates the best result?
 - What rendering style is most appropriate?
+"""
+
+    # 前缀与查询的分隔符：分隔符之前（角色、思维链、领域知识、示例、输出格式）对同一领域固定不变，
+    # 之后才是每次请求不同的描述和附加上下文，使请求共享相同前缀以命中 Gemini 的隐式上下文缓存
+    QUERY_SEPARATOR = "\n---\nQUERY:\n"
 
+    META_PROMPT_TEMPLATE = META_PROMPT_HEADER + """
 {domain_context}
 
 {few_shot_section}
 
-## User Description
-{description}
-
-{additional_context}
-
 ## Output Format
 Generate your response in exactly this format:
 
@@ -256,7 +290,7 @@ ANALYSIS:
 [Your step-by-step reasoning following the chain of thought above]
 
 FOLDER_NAME:
-[A concise folder name in format: {type}_{spec}, use lowercase English with underscores, no spaces.
+[A concise folder name in format: {{type}}_{{spec}}, use lowercase English with underscores, no spaces.
  Examples: transformer_220kv, circuit_breaker_sf6, office_chair_mesh, robot_arm_6axis, gis_220kv]
 
 PROMPT:
@@ -266,14 +300,43 @@ NEGATIVE:
 [A list of things to avoid in the image]
 
 CONFIDENCE:
-[Your confidence level: HIGH/MEDIUM/LOW and brief explanation]"""
+[Your confidence level: HIGH/MEDIUM/LOW and brief explanation]
+{self_verify_block}""" + QUERY_SEPARATOR + """## User Description
+{description}
 
-    VERIFICATION_PROMPT = """Review this image generation prompt and verify it meets quality standards:
+{additional_context}"""
 
-PROMPT TO VERIFY:
-{prompt}
+    # 批量元提示：多条描述共用一次调用，领域知识和示例只出现一次，按编号 [i] 分别输出
+    META_PROMPT_BATCH_TEMPLATE = META_PROMPT_HEADER + """
+{domain_context}
+
+{few_shot_section}
+
+## Output Format
+Several descriptions are given below as Q[1], Q[2], ... Apply the process above to EACH description independently.
+For EACH description i, output one block in exactly this format, with i replaced by the description number:
+
+ANALYSIS[i]:
+[Your step-by-step reasoning for description i]
+
+FOLDER_NAME[i]:
+[A concise folder name in format: {{type}}_{{spec}}, use lowercase English with underscores, no spaces.
+ Examples: transformer_220kv, circuit_breaker_sf6, office_chair_mesh, robot_arm_6axis, gis_220kv]
+
+PROMPT[i]:
+[The complete, detailed image generation prompt in English for description i]
+
+NEGATIVE[i]:
+[A list of things to avoid in the image]
 
-VERIFICATION CHECKLIST:
+CONFIDENCE[i]:
+[Your confidence level: HIGH/MEDIUM/LOW and brief explanation]
+{self_verify_block}""" + QUERY_SEPARATOR + """## User Descriptions ({count} in total)
+{questions}
+
+{additional_context}"""
+
+    VERIFICATION_CHECKLIST = """VERIFICATION CHECKLIST:
 1. ✓ Clear subject identification
 2. ✓ Detailed component descriptions
 3. ✓ Specific materials and colors
@@ -281,7 +344,27 @@ VERIFICATION CHECKLIST:
 5. ✓ Camera angle specified
 6. ✓ Lighting described
 7. ✓ Style/mood indicated
-8. ✓ No conflicting instructions
+8. ✓ No conflicting instructions"""
+
+    # 启用自我验证时附加在输出格式末尾，让模型在同一次调用中自检并给出最终提示词
+    SELF_VERIFY_BLOCK = """
+FINAL_PROMPT:
+[Your PROMPT after checking it against the checklist below, with any issues fixed. Repeat the PROMPT unchanged if it already passes every item. Output the prompt only, not the checklist.]
+
+""" + VERIFICATION_CHECKLIST + "\n"
+
+    SELF_VERIFY_BATCH_BLOCK = """
+FINAL_PROMPT[i]:
+[Your PROMPT[i] after checking it against the checklist below, with any issues fixed. Repeat PROMPT[i] unchanged if it already passes every item. Output the prompt only, not the checklist.]
+
+""" + VERIFICATION_CHECKLIST + "\n"
+
+    VERIFICATION_PROMPT = """Review this image generation prompt and verify it meets quality standards:
+
+PROMPT TO VERIFY:
+{prompt}
+
+""" + VERIFICATION_CHECKLIST + """
 
 If any issues are found, provide an IMPROVED version.
 If the prompt is good, respond with "VERIFIED: PASS" and the original prompt.
@@ -289,41 +372,46 @@ If the prompt is good, respond with "VERIFIED: PASS" and the original prompt.
 VERIFICATION RESULT:"""
 
     def __init__(self, api_key: str, config: PromptConfig = None):
+        # google-genai 导入较慢（约 0.6 秒），创建实例时才加载
+        from google import genai
+
         self.client = genai.Client(api_key=api_key)
         self.model = "gemini-2.5-flash"
         self.config = config or PromptConfig()
+        # 已渲染的元提示前缀，键为 (模板, 领域, 是否使用示例)
+        self._prefix_cache: Dict[tuple, str] = {}
+        # LLM 响应缓存，键为模型名与完整提示词的哈希
+        self._response_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._response_lock = threading.Lock()
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _domain_keyword_table(cls) -> tuple:
+        """展平后的关键词表 ((小写关键词, (所属领域, ...)), ...)，只构建一次"""
+        table: Dict[str, List[IndustryDomain]] = {}
+        for domain, knowledge in cls.DOMAIN_KNOWLEDGE.items():
+            if domain == IndustryDomain.GENERAL:
+                continue
+            for kw in knowledge["keywords"] + cls.CN_DOMAIN_KEYWORDS.get(domain, []):
+                domains = table.setdefault(kw.lower(), [])
+                if domain not in domains:
+                    domains.append(domain)
+        return tuple((kw, tuple(domains)) for kw, domains in table.items())
 
     def _detect_domain(self, description: str) -> IndustryDomain:
         """自动检测描述所属的行业领域"""
         description_lower = description.lower()
 
-        # 检测关键词匹配
-        domain_scores = {}
-        for domain, knowledge in self.DOMAIN_KNOWLEDGE.items():
-            if domain == IndustryDomain.GENERAL:
-                continue
-            score = sum(1 for kw in knowledge["keywords"] if kw in description_lower)
-            # 也检查中文关键词
-            cn_keywords = {
-                IndustryDomain.POWER_GRID: ["变压器", "断路器", "绝缘子", "母线", "开关", "电力", "电网", "kv", "kV"],
-                IndustryDomain.MANUFACTURING: ["机床", "数控", "生产线", "流水线", "冲压"],
-                IndustryDomain.ARCHITECTURE: ["建筑", "房屋", "室内", "装修", "设计"],
-                IndustryDomain.AUTOMOTIVE: ["汽车", "车辆", "发动机", "底盘", "轮胎"],
-                IndustryDomain.AEROSPACE: ["飞机", "卫星", "火箭", "无人机", "航空"],
-                IndustryDomain.MEDICAL: ["医疗", "手术", "诊断", "植入", "假肢"],
-                IndustryDomain.ROBOTICS: ["机器人", "机械臂", "自动化", "伺服"],
-                IndustryDomain.FURNITURE: ["椅子", "桌子", "沙发", "柜子", "家具"],
-                IndustryDomain.ELECTRONICS: ["电子", "电路", "显示器", "手机", "设备"],
-            }
-            if domain in cn_keywords:
-                score += sum(1 for kw in cn_keywords[domain] if kw in description)
-            domain_scores[domain] = score
-
-        # 返回得分最高的领域
+        # 每个关键词只检查一次，命中时给其所属的所有领域加分
+        domain_scores: Dict[IndustryDomain, int] = {}
+        for kw, domains in self._domain_keyword_table():
+            if kw in description_lower:
+                for domain in domains:
+                    domain_scores[domain] = domain_scores.get(domain, 0) + 1
+
+        # 返回得分最高的领域（同分时按 DOMAIN_KNOWLEDGE 中的顺序）
         if domain_scores:
-            best_domain = max(domain_scores, key=domain_scores.get)
-            if domain_scores[best_domain] > 0:
-                return best_domain
+            return max(self.DOMAIN_KNOWLEDGE, key=lambda domain: domain_scores.get(domain, 0))
 
         return IndustryDomain.GENERAL
 
@@ -331,11 +419,20 @@ VERIFICATION RESULT:"""
         """获取Few-shot示例部分"""
         if not self.config.use_few_shot:
             return ""
+        return self._render_few_shot_section(domain)
+
+    def _get_domain_context(self, domain: IndustryDomain) -> str:
+        """获取领域特定的上下文"""
+        return self._render_domain_context(domain)
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _render_few_shot_section(cls, domain: IndustryDomain) -> str:
+        """渲染领域的 Few-shot 示例文本（只依赖类常量，每个领域只渲染一次）"""
         # 选择相关示例
-        relevant_examples = [ex for ex in self.FEW_SHOT_EXAMPLES if ex["domain"] == domain]
+        relevant_examples = [ex for ex in cls.FEW_SHOT_EXAMPLES if ex["domain"] == domain]
         if not relevant_examples:
-            relevant_examples = self.FEW_SHOT_EXAMPLES[:2]  # 使用通用示例
+            relevant_examples = cls.FEW_SHOT_EXAMPLES[:2]  # 使用通用示例
 
         examples_text = "\n\n## Reference Examples\nHere are examples of well-structured prompts:\n\n"
         for i, ex in enumerate(relevant_examples[:2], 1):
@@ -343,9 +440,11 @@ VERIFICATION RESULT:"""
 
         return examples_text
 
-    def _get_domain_context(self, domain: IndustryDomain) -> str:
-        """获取领域特定的上下文"""
-        knowledge = self.DOMAIN_KNOWLEDGE.get(domain, self.DOMAIN_KNOWLEDGE[IndustryDomain.GENERAL])
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _render_domain_context(cls, domain: IndustryDomain) -> str:
+        """渲染领域知识文本（只依赖类常量，每个领域只渲染一次）"""
+        knowledge = cls.DOMAIN_KNOWLEDGE.get(domain, cls.DOMAIN_KNOWLEDGE[IndustryDomain.GENERAL])
 
         return f"""## Domain Knowledge ({domain.value})
 - Common keywords: {', '.join(knowledge['keywords'][:5])}
@@ -353,63 +452,142 @@ VERIFICATION RESULT:"""
 - Standard colors: {', '.join(knowledge['colors'][:5])}
 - Key components: {', '.join(knowledge['components'][:5])}"""
 
+    def _meta_prompt_prefix(self, template: str, self_verify_block: str, domain: IndustryDomain) -> str:
+        """获取模板分隔符之前的固定前缀（按领域缓存），启用内联验证时附加 self_verify_block"""
+        inline_verification = self._inline_verification()
+        key = (template, domain, self.config.use_few_shot, inline_verification)
+        prefix = self._prefix_cache.get(key)
+        if prefix is None:
+            prefix = template.partition(self.QUERY_SEPARATOR)[0].format(
+                domain_context=self._get_domain_context(domain),
+                few_shot_section=self._get_few_shot_section(domain),
+                self_verify_block=self_verify_block if inline_verification else ""
+            ) + self.QUERY_SEPARATOR
+            self._prefix_cache[key] = prefix
+        return prefix
+
     def _build_meta_prompt(self, description: str, domain: IndustryDomain,
                            equipment_type: str = None, additional_params: dict = None) -> str:
         """构建元提示词"""
-        domain_context = self._get_domain_context(domain)
-        few_shot_section = self._get_few_shot_section(domain)
+        tail = self.META_PROMPT_TEMPLATE.partition(self.QUERY_SEPARATOR)[2]
+        return self._meta_prompt_prefix(self.META_PROMPT_TEMPLATE, self.SELF_VERIFY_BLOCK, domain) + tail.format(
+            description=description,
+            additional_context=self._build_additional_context(equipment_type, additional_params)
+        )
+
+    def _build_additional_context(self, equipment_type: str = None, additional_params: dict = None) -> str:
+        """构建附加上下文（设备类型、额外参数、目标风格）"""
         style_hint = self.STYLE_TEMPLATES.get(self.config.style, self.STYLE_TEMPLATES[RenderStyle.PHOTOREALISTIC])
 
         additional_context = ""
         if equipment_type:
             additional_context += f"\n- Equipment Type: {equipment_type}"
         if additional_params:
-            additional_context += f"\n- Additional Parameters: {json.dumps(additional_params, ensure_ascii=False)}"
+            additional_context += f"\n- Additional Parameters: {orjson.dumps(additional_params, default=str).decode()}"
         additional_context += f"\n- Target Style: {style_hint}"
 
-        if additional_context:
-            additional_context = "## Additional Context" + additional_context
-
-        return self.META_PROMPT_TEMPLATE.format(
-            domain_context=domain_context,
-            few_shot_section=few_shot_section,
-            description=description,
-            additional_context=additional_context
-        )
+        return "## Additional Context" + additional_context
+
+    def _llm_call(self, contents: str) -> str:
+        """调用 LLM 并返回响应文本，相同的提示词复用缓存的响应"""
+        key = self._response_key(contents)
+        text = self._cached_response(key)
+        if text is None:
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=contents
+            )
+            text = response.text
+            self._store_response(key, text)
+        return text
+
+    async def _allm_call(self, contents: str) -> str:
+        """异步版本的 _llm_call"""
+        key = self._response_key(contents)
+        text = self._cached_response(key)
+        if text is None:
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=contents
+            )
+            text = response.text
+            self._store_response(key, text)
+        return text
+
+    def _response_key(self, contents: str) -> Optional[str]:
+        """响应缓存键，未启用缓存时返回 None"""
+        if self.config.cache_size <= 0:
+            return None
+        return hashlib.blake2b(f"{self.model}\0{contents}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _cached_response(self, key: Optional[str]) -> Optional[str]:
+        """读取缓存的响应文本，未命中返回 None"""
+        if key is None:
+            return None
+        with self._response_lock:
+            text = self._response_cache.get(key)
+            if text is not None:
+                self._response_cache.move_to_end(key)
+            return text
+
+    def _store_response(self, key: Optional[str], text: Optional[str]) -> None:
+        """写入响应缓存，超出 cache_size 时淘汰最久未使用的条目"""
+        if key is None or not text:
+            return
+        with self._response_lock:
+            self._response_cache[key] = text
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self.config.cache_size:
+                self._response_cache.popitem(last=False)
 
     def _verify_prompt(self, prompt: str) -> str:
         """使用自我验证改进提示词"""
         if not self.config.use_self_verification:
             return prompt
 
-        verification_prompt = self.VERIFICATION_PROMPT.format(prompt=prompt)
+        response_text = self._llm_call(self.VERIFICATION_PROMPT.format(prompt=prompt))
+        return self._apply_verification(prompt, response_text)
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=verification_prompt
-        )
+    async def _averify_prompt(self, prompt: str) -> str:
+        """异步版本的 _verify_prompt"""
+        if not self.config.use_self_verification:
+            return prompt
 
-        result = response.text
+        response_text = await self._allm_call(self.VERIFICATION_PROMPT.format(prompt=prompt))
+        return self._apply_verification(prompt, response_text)
 
+    @staticmethod
+    def _apply_verification(prompt: str, result: str) -> str:
+        """根据验证结果返回原提示词或改进版本"""
         # 如果验证通过，返回原始提示词
         if "VERIFIED: PASS" in result:
             return prompt
 
         # 否则提取改进版本
-        if "IMPROVED" in result or "improved" in result.lower():
-            # 尝试提取改进的提示词
-            lines = result.split('\n')
-            improved_start = False
-            improved_prompt = []
-            for line in lines:
-                if 'improved' in line.lower() or improved_start:
-                    improved_start = True
-                    improved_prompt.append(line)
-            if improved_prompt:
-                return '\n'.join(improved_prompt[1:]).strip()
+        match = _IMPROVED_RE.search(result)
+        if match and match.group(1).strip():
+            return match.group(1).strip()
 
         return prompt
 
+    def _inline_verification(self) -> bool:
+        """是否在生成调用中同时完成第一轮自我验证"""
+        return self.config.use_self_verification and self.config.optimize_iterations > 0
+
+    def _verify_result(self, result: dict, rounds_done: int = 0) -> dict:
+        """按配置的迭代次数自我验证和改进结果中的提示词，rounds_done 为生成时已完成的轮数"""
+        if self.config.use_self_verification and self.config.optimize_iterations > 0:
+            for _ in range(self.config.optimize_iterations - rounds_done):
+                result["prompt"] = self._verify_prompt(result["prompt"])
+        return result
+
+    async def _averify_result(self, result: dict, rounds_done: int = 0) -> dict:
+        """异步版本的 _verify_result（每轮依赖上一轮结果，按顺序执行）"""
+        if self.config.use_self_verification and self.config.optimize_iterations > 0:
+            for _ in range(self.config.optimize_iterations - rounds_done):
+                result["prompt"] = await self._averify_prompt(result["prompt"])
+        return result
+
     def generate(self, description: str,
                  equipment_type: str = None,
                  voltage_level: str = None,
@@ -430,6 +608,57 @@ VERIFICATION RESULT:"""
         Returns:
             包含 prompt, negative_prompt, analysis, confidence 的字典
         """
+        detected_domain, meta_prompt = self._prepare(
+            description, equipment_type, voltage_level, domain, style, additional_params
+        )
+
+        # 调用 LLM 生成提示词
+        response_text = self._llm_call(meta_prompt)
+
+        result, rounds_done = self._parse_response(detected_domain, response_text)
+        return self._verify_result(result, rounds_done)
+
+    async def agenerate(self, description: str,
+                        equipment_type: str = None,
+                        voltage_level: str = None,
+                        domain: IndustryDomain = None,
+                        style: RenderStyle = None,
+                        additional_params: dict = None) -> dict:
+        """异步生成提示词，参数与返回值同 generate"""
+        detected_domain, meta_prompt = self._prepare(
+            description, equipment_type, voltage_level, domain, style, additional_params
+        )
+
+        response_text = await self._allm_call(meta_prompt)
+
+        result, rounds_done = self._parse_response(detected_domain, response_text)
+        return await self._averify_result(result, rounds_done)
+
+    async def agenerate_many(self, descriptions: List[str], **kwargs) -> List[dict]:
+        """
+        并发生成多条描述的提示词，同时进行的请求数不超过 config.max_concurrency
+
+        每条描述的自我验证迭代依赖上一轮结果，仍按顺序执行；不同描述之间并发。
+
+        Args:
+            descriptions: 对象描述列表
+            **kwargs: 传给 agenerate 的其他参数（对所有描述相同）
+
+        Returns:
+            与 descriptions 顺序一致的结果列表
+        """
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def generate_one(description: str) -> dict:
+            async with semaphore:
+                return await self.agenerate(description, **kwargs)
+
+        return await asyncio.gather(*(generate_one(description) for description in descriptions))
+
+    def _prepare(self, description: str, equipment_type: str, voltage_level: str,
+                 domain: Optional[IndustryDomain], style: Optional[RenderStyle],
+                 additional_params: Optional[dict]):
+        """确定领域并构建元提示词，返回 (领域, 元提示词)"""
         # 自动检测或使用指定的领域
         detected_domain = domain or self._detect_domain(description)
 
@@ -439,9 +668,7 @@ VERIFICATION RESULT:"""
 
         # 处理电力设备特殊参数
         if voltage_level:
-            if additional_params is None:
-                additional_params = {}
-            additional_params["voltage_level"] = voltage_level
+            additional_params = {**(additional_params or {}), "voltage_level": voltage_level}
 
         # 构建元提示词
         meta_prompt = self._build_meta_prompt(
@@ -450,64 +677,135 @@ VERIFICATION RESULT:"""
             equipment_type=equipment_type,
             additional_params=additional_params
         )
+        return detected_domain, meta_prompt
+
+    def _parse_response(self, detected_domain: IndustryDomain, result_text: str) -> Tuple[dict, int]:
+        """解析单条生成的响应，返回 (结果, 已完成的验证轮数)"""
+        # 按段落标记一次切分，同名段落以第一次出现为准
+        sections: Dict[str, str] = {}
+        matches = list(_SECTION_RE.finditer(result_text))
+        for match, following in zip(matches, matches[1:] + [None]):
+            end = following.start() if following else len(result_text)
+            sections.setdefault(match.group(1), result_text[match.end():end].strip())
+
+        # FINAL_PROMPT 是模型在同一次调用中自检后的提示词，视为完成一轮验证
+        final_prompt = self._final_prompt(sections)
+        result = self._finalize_result(
+            detected_domain,
+            sections.get("ANALYSIS", ""),
+            sections.get("FOLDER_NAME", ""),
+            final_prompt or sections.get("PROMPT", result_text.strip()),
+            sections.get("NEGATIVE", self.DEFAULT_NEGATIVE_PROMPT),
+            sections.get("CONFIDENCE", "MEDIUM"),
+            result_text
+        )
+        return result, int(bool(final_prompt))
 
-        # 调用 LLM 生成提示词
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=meta_prompt
+    def _final_prompt(self, sections: Dict[str, str]) -> str:
+        """取出自检后的 FINAL_PROMPT，未启用内联验证时忽略"""
+        if not self._inline_verification():
+            return ""
+        # 去掉模型误把检查清单也写进来的部分
+        return sections.get("FINAL_PROMPT", "").split("VERIFICATION CHECKLIST:")[0].strip()
+
+    def generate_batch(self, descriptions: List[str],
+                       equipment_type: str = None,
+                       voltage_level: str = None,
+                       domain: IndustryDomain = None,
+                       style: RenderStyle = None,
+                       additional_params: dict = None,
+                       batch_size: int = 5) -> List[dict]:
+        """
+        批量生成提示词：同一领域的多条描述合并为一次 LLM 调用
+
+        按检测到的领域分组（每组只包含一次领域知识和示例），每 batch_size 条描述调用一次，
+        响应按 PROMPT[i] 等编号段落拆分。批量响应中缺失的描述单独调用 generate 补齐。
+
+        Args:
+            descriptions: 对象描述列表
+            batch_size: 每次调用包含的最大描述数
+            其余参数同 generate，对所有描述相同
+
+        Returns:
+            与 descriptions 顺序一致的结果列表，每项格式同 generate
+        """
+        if style:
+            self.config.style = style
+
+        if voltage_level:
+            additional_params = {**(additional_params or {}), "voltage_level": voltage_level}
+
+        # 按领域分组，记录原始位置
+        buckets: Dict[IndustryDomain, List[int]] = {}
+        for index, description in enumerate(descriptions):
+            buckets.setdefault(domain or self._detect_domain(description), []).append(index)
+
+        results: List[Optional[dict]] = [None] * len(descriptions)
+        for bucket_domain, indices in buckets.items():
+            for start in range(0, len(indices), batch_size):
+                chunk = indices[start:start + batch_size]
+                meta_prompt = self._build_batch_meta_prompt(
+                    [descriptions[i] for i in chunk], bucket_domain, equipment_type, additional_params
+                )
+                response_text = self._llm_call(meta_prompt)
+                sections = self._parse_batch_sections(response_text)
+                for number, index in enumerate(chunk, 1):
+                    item = sections.get(number, {})
+                    if not item.get("PROMPT"):
+                        continue
+                    final_prompt = self._final_prompt(item)
+                    results[index] = self._verify_result(self._finalize_result(
+                        bucket_domain,
+                        item.get("ANALYSIS", ""),
+                        item.get("FOLDER_NAME", ""),
+                        final_prompt or item["PROMPT"],
+                        item.get("NEGATIVE") or self.DEFAULT_NEGATIVE_PROMPT,
+                        item.get("CONFIDENCE") or "MEDIUM",
+                        response_text
+                    ), int(bool(final_prompt)))
+
+        # 批量响应中缺失的描述单独生成
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = self.generate(
+                    descriptions[index],
+                    equipment_type=equipment_type,
+                    domain=domain,
+                    additional_params=additional_params
+                )
+        return results
+
+    def _build_batch_meta_prompt(self, descriptions: List[str], domain: IndustryDomain,
+                                 equipment_type: str = None, additional_params: dict = None) -> str:
+        """构建批量元提示词"""
+        tail = self.META_PROMPT_BATCH_TEMPLATE.partition(self.QUERY_SEPARATOR)[2]
+        return self._meta_prompt_prefix(self.META_PROMPT_BATCH_TEMPLATE, self.SELF_VERIFY_BATCH_BLOCK, domain) + tail.format(
+            questions="\n".join(f"Q[{i}]: {description}" for i, description in enumerate(descriptions, 1)),
+            additional_context=self._build_additional_context(equipment_type, additional_params),
+            count=len(descriptions)
         )
 
-        result_text = response.text
-
-        # 解析响应
-        analysis = ""
-        prompt = ""
-        negative_prompt = "cartoon, anime, stylized, low quality, blurry, deformed, unrealistic proportions, bad anatomy"
-        confidence = "MEDIUM"
-        folder_name = ""
-
-        # 提取 FOLDER_NAME
-        if "FOLDER_NAME:" in result_text:
-            folder_parts = result_text.split("FOLDER_NAME:")
-            if len(folder_parts) > 1:
-                folder_line = folder_parts[1].split("\n")[0].strip()
-                # 清理可能的标点和空格
-                folder_name = folder_line.lower().replace(" ", "_").replace("-", "_")
-                # 移除非法字符
-                folder_name = ''.join(c for c in folder_name if c.isalnum() or c == '_')
-
-        # 提取各部分
-        if "ANALYSIS:" in result_text:
-            parts = result_text.split("PROMPT:")
-            analysis = parts[0].replace("ANALYSIS:", "").strip()
-            if len(parts) > 1:
-                remaining = parts[1]
-                if "NEGATIVE:" in remaining:
-                    prompt_neg = remaining.split("NEGATIVE:")
-                    prompt = prompt_neg[0].strip()
-                    neg_conf = prompt_neg[1]
-                    if "CONFIDENCE:" in neg_conf:
-                        neg_conf_parts = neg_conf.split("CONFIDENCE:")
-                        negative_prompt = neg_conf_parts[0].strip()
-                        confidence = neg_conf_parts[1].strip()
-                    else:
-                        negative_prompt = neg_conf.strip()
-                else:
-                    prompt = remaining.strip()
-        elif "PROMPT:" in result_text:
-            parts = result_text.split("PROMPT:")
-            prompt = parts[1].split("NEGATIVE:")[0].strip() if len(parts) > 1 else result_text
-        else:
-            prompt = result_text.strip()
+    @staticmethod
+    def _parse_batch_sections(result_text: str) -> Dict[int, Dict[str, str]]:
+        """按 SECTION[i]: 标记拆分批量响应，返回 {编号: {段落名: 内容}}"""
+        sections: Dict[int, Dict[str, str]] = {}
+        matches = list(_BATCH_SECTION_RE.finditer(result_text))
+        for match, following in zip(matches, matches[1:] + [None]):
+            end = following.start() if following else len(result_text)
+            sections.setdefault(int(match.group(2)), {})[match.group(1)] = result_text[match.end():end].strip()
+        return sections
+
+    def _finalize_result(self, detected_domain: IndustryDomain, analysis: str, folder_text: str,
+                         prompt: str, negative_prompt: str, confidence: str, raw_response: str) -> dict:
+        """清理解析出的各段落，组装结果"""
+        # 文件夹名取第一行非空内容（模型通常把名称写在标记的下一行），清理标点、空格和非法字符
+        folder_line = next((line.strip() for line in folder_text.splitlines() if line.strip()), "")
+        folder_name = folder_line.strip("[]`").lower().replace(" ", "_").replace("-", "_")
+        folder_name = ''.join(c for c in folder_name if c.isalnum() or c == '_')
 
         # 清理
-        prompt = prompt.replace("```", "").strip()
-        negative_prompt = negative_prompt.replace("```", "").strip()
-
-        # 自我验证和改进
-        if self.config.use_self_verification and self.config.optimize_iterations > 0:
-            for _ in range(self.config.optimize_iterations):
-                prompt = self._verify_prompt(prompt)
+        prompt = prompt.translate(_BACKTICKS).strip()
+        negative_prompt = negative_prompt.translate(_BACKTICKS).strip()
 
         return {
             "prompt": prompt,
@@ -517,7 +815,7 @@ VERIFICATION RESULT:"""
             "detected_domain": detected_domain.value,
             "style": self.config.style.value,
             "folder_name": folder_name,
-            "raw_response": result_text
+            "raw_response": raw_response
         }
 
     def optimize_prompt(self, prompt: str, feedback: str = None) -> dict:
@@ -3,8 +3,9 @@
 官方文档: https://platform.baichuan-ai.com/docs/api
 """
 
-from typing import Optional, List, Dict, Any, AsyncIterator
-import json
+from typing import Optional, List, Dict, Any, AsyncIterator, Union
+import contextlib
+import orjson
 from .base import (
     BaseProvider,
     ProviderType,
@@ -13,6 +14,7 @@ from .base import (
     ModelInfo,
     ChatMessage,
     ChatResponse,
+    aiter_sse_data,
 )
 
 
@@ -101,6 +103,21 @@ class BaichuanProvider(BaseProvider):
     def _get_base_url(self) -> str:
         return self.config.base_url or self.DEFAULT_BASE_URL
 
+    @staticmethod
+    def format_messages(messages: List[Union[ChatMessage, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        转换为百川接口的消息格式
+
+        同一组消息发给多个模型时可先调用本方法，再把结果传给 chat/achat/astream_chat，
+        已是 dict 的消息原样使用，不再重复转换。
+        """
+        if all(isinstance(msg, dict) for msg in messages):
+            return messages
+        return [
+            msg if isinstance(msg, dict) else {"role": msg.role, "content": msg.content}
+            for msg in messages
+        ]
+
     def chat(
         self,
         messages: List[ChatMessage],
@@ -113,10 +130,7 @@ class BaichuanProvider(BaseProvider):
         model = model or self.get_default_model()
         url = f"{self._get_base_url()}/chat/completions"
 
-        formatted_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        formatted_messages = self.format_messages(messages)
 
         body = {
             "model": model,
@@ -137,11 +151,11 @@ class BaichuanProvider(BaseProvider):
 
         response = self.client.post(
             url,
-            headers=self._build_headers(),
-            json=body
+            headers=self._request_headers(),
+            content=orjson.dumps(body)
         )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         return ChatResponse(
             content=data["choices"][0]["message"]["content"],
@@ -163,10 +177,7 @@ class BaichuanProvider(BaseProvider):
         model = model or self.get_default_model()
         url = f"{self._get_base_url()}/chat/completions"
 
-        formatted_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        formatted_messages = self.format_messages(messages)
 
         body = {
             "model": model,
@@ -179,11 +190,11 @@ class BaichuanProvider(BaseProvider):
 
         response = await self.async_client.post(
             url,
-            headers=self._build_headers(),
-            json=body
+            headers=self._request_headers(),
+            content=orjson.dumps(body)
         )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         return ChatResponse(
             content=data["choices"][0]["message"]["content"],
@@ -204,10 +215,7 @@ class BaichuanProvider(BaseProvider):
         model = model or self.get_default_model()
         url = f"{self._get_base_url()}/chat/completions"
 
-        formatted_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        formatted_messages = self.format_messages(messages)
 
         body = {
             "model": model,
@@ -221,18 +229,15 @@ class BaichuanProvider(BaseProvider):
         async with self.async_client.stream(
             "POST",
             url,
-            headers=self._build_headers(),
-            json=body
+            headers=self._request_headers(),
+            content=orjson.dumps(body)
         ) as response:
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    data_str = line[6:]
-                    if data_str.strip() == "[DONE]":
-                        break
+            async with contextlib.aclosing(aiter_sse_data(response)) as payloads:
+                async for payload in payloads:
                     try:
-                        data = json.loads(data_str)
-                        delta = data["choices"][0].get("delta", {})
-                        if "content" in delta:
-                            yield delta["content"]
-                    except json.JSONDecodeError:
+                        data = orjson.loads(payload)
+                    except orjson.JSONDecodeError:
                         continue
+                    content = data["choices"][0].get("delta", {}).get("content")
+                    if content:
+                        yield content
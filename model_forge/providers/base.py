@@ -6,8 +6,131 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Optional, Dict, Any, List, AsyncIterator
+import asyncio
+import contextlib
+import importlib.util
 import httpx
 
+# httpx 的 HTTP/2 支持依赖可选包 h2（pip install model-forge[http2]）
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 流式响应预读的最大块数
+SSE_PREFETCH_CHUNKS = 32
+
+
+class LoopAsyncClient:
+    """
+    按事件循环懒加载的 httpx.AsyncClient
+
+    httpx 的连接池绑定创建它的事件循环，事件循环变化时重新创建客户端。
+    session() 为使用范围计数，最后一个使用者退出时在所属事件循环上关闭客户端，
+    asyncio.run 结束后不会留下未关闭的连接池。
+    """
+
+    def __init__(self, **client_kwargs):
+        self._client_kwargs = client_kwargs
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._users = 0
+
+    def get(self) -> httpx.AsyncClient:
+        """获取当前事件循环的客户端"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client.is_closed:
+            self._release_stale()
+            self._client = httpx.AsyncClient(**self._client_kwargs)
+            self._loop = loop
+        return self._client
+
+    def _release_stale(self) -> None:
+        """旧客户端所属的事件循环仍在其他线程中运行时，交给该事件循环关闭"""
+        client, loop = self._client, self._loop
+        self._client = self._loop = None
+        if client is not None and not client.is_closed and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        """客户端的使用范围，可嵌套和并发进入，最后一个使用者退出时关闭客户端"""
+        self._users += 1
+        try:
+            yield self
+        finally:
+            self._users -= 1
+            if self._users == 0:
+                await self.aclose()
+
+    async def aclose(self) -> None:
+        """关闭客户端"""
+        if self._loop is not asyncio.get_running_loop():
+            self._release_stale()
+            return
+        client = self._client
+        self._client = self._loop = None
+        await client.aclose()
+
+
+async def aiter_prefetched(response: httpx.Response,
+                           max_chunks: int = SSE_PREFETCH_CHUNKS) -> AsyncIterator[bytes]:
+    """
+    在后台任务中持续读取响应字节，最多预读 max_chunks 块
+
+    按网络实际到达的块原样传递，不指定 chunk_size：指定后 httpx 会攒满整块才交出，
+    几百字节的 SSE 增量会被延迟到流结束。
+
+    消费方处理上一段数据（解析、推送给前端）时网络读取不会停顿；
+    读取出错时异常在消费方重新抛出，消费方提前结束时取消后台任务。
+    """
+    queue: asyncio.Queue = asyncio.Queue(max_chunks)
+
+    async def drain():
+        try:
+            async for chunk in response.aiter_bytes():
+                await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    task = asyncio.create_task(drain())
+    try:
+        while (item := await queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        task.cancel()
+        await asyncio.wait([task])
+
+
+async def aiter_sse_data(response: httpx.Response) -> AsyncIterator[bytes]:
+    """
+    逐条产出 SSE 流中 "data: " 行的负载（bytes，不解码），遇到 [DONE] 结束
+
+    按块预读原始字节并在缓冲区中按换行切分，只对数据行做处理，
+    避免 aiter_lines 对每一行都解码和切分。
+    """
+    buffer = bytearray()
+    # aclosing 保证提前结束（[DONE]、调用方 break）时立即取消预读任务，而不是等垃圾回收
+    async with contextlib.aclosing(aiter_prefetched(response)) as chunks:
+        async for chunk in chunks:
+            buffer.extend(chunk)
+            start = 0
+            while (end := buffer.find(b"\n", start)) != -1:
+                line = buffer[start:end]
+                start = end + 1
+                if line.startswith(b"data: "):
+                    payload = bytes(line[6:]).strip()
+                    if payload == b"[DONE]":
+                        return
+                    yield payload
+            del buffer[:start]
+    # 最后一行可能没有换行符
+    if buffer.startswith(b"data: "):
+        payload = bytes(buffer[6:]).strip()
+        if payload != b"[DONE]":
+            yield payload
+
 
 class ProviderType(str, Enum):
     """服务商类型"""
@@ -92,8 +215,20 @@ class BaseProvider(ABC):
 
     def __init__(self, config: ProviderConfig):
         self.config = config
-        self.client = httpx.Client(timeout=config.timeout)
-        self.async_client = httpx.AsyncClient(timeout=config.timeout)
+        # 安装了 h2（httpx[http2]）时启用 HTTP/2，同一服务商的并发请求复用一条连接
+        self.client = httpx.Client(timeout=config.timeout, http2=HTTP2_AVAILABLE)
+        self._async_client = LoopAsyncClient(timeout=config.timeout, http2=HTTP2_AVAILABLE)
+        # (api_key, 请求头)，API Key 变化时重新构建
+        self._headers_cache: Optional[tuple] = None
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """当前事件循环的异步客户端"""
+        return self._async_client.get()
+
+    def async_session(self):
+        """异步客户端的使用范围，退出时关闭客户端（见 LoopAsyncClient.session）"""
+        return self._async_client.session()
 
     @property
     @abstractmethod
@@ -152,10 +287,17 @@ class BaseProvider(ABC):
             "Authorization": f"Bearer {self.config.api_key}"
         }
 
+    def _request_headers(self) -> Dict[str, str]:
+        """获取请求头，按 API Key 缓存，避免每次请求重新构建"""
+        cached = self._headers_cache
+        if cached is None or cached[0] != self.config.api_key:
+            cached = self._headers_cache = (self.config.api_key, self._build_headers())
+        return cached[1]
+
     def close(self):
         """关闭客户端"""
         self.client.close()
 
     async def aclose(self):
         """异步关闭客户端"""
-        await self.async_client.aclose()
+        await self._async_client.aclose()
@@ -2,6 +2,7 @@
 服务商管理器 - 统一管理所有AI服务商
 """
 
+import contextlib
 from typing import Dict, List, Optional, Type, Any
 from dataclasses import dataclass
 from .base import (
@@ -155,6 +156,17 @@ class ProviderManager:
 
         return self._providers[provider_type]
 
+    def async_session(self, provider_type: ProviderType):
+        """
+        服务商异步客户端的使用范围，退出时关闭客户端；服务商未配置时为空上下文
+
+        Args:
+            provider_type: 服务商类型
+        """
+        if provider_type not in self._configs:
+            return contextlib.nullcontext()
+        return self.get_provider(provider_type).async_session()
+
     def chat(
         self,
         provider_type: ProviderType,
@@ -3,6 +3,9 @@ Model Forge Server - FastAPI 服务入口
 """
 
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -13,9 +16,32 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from .api.routes import router as api_router
+from .api.routes import router as api_router, get_pipeline
 from .api.routes_v2 import router as api_router_v2
+from .api.metrics import metrics_app
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """启动时预加载流水线，避免首个请求承担初始化开销"""
+    try:
+        pipeline = await asyncio.to_thread(get_pipeline)
+        await asyncio.to_thread(pipeline.preload)
+    except ValueError as e:
+        # 未配置 API Key 时仍允许启动（健康检查、服务商管理等不依赖流水线）
+        logger.warning("流水线未预加载: %s", e)
+    else:
+        # 可选：发送一次预热请求，提前建立到 LLM 服务的连接（会产生一次调用费用）
+        if os.environ.get("MF_WARMUP") == "1":
+            try:
+                await asyncio.to_thread(pipeline.prompt_generator.generate, description="warmup: a simple metal cube")
+            except Exception as e:
+                logger.warning("流水线预热失败: %s", e)
+    yield
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -35,7 +61,8 @@ app = FastAPI(
     """,
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS 配置
@@ -47,6 +74,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 响应压缩（任务列表、领域信息等 JSON 较大时显著减少传输量）
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # 挂载静态文件
 static_dir = Path(__file__).parent.parent / "static"
 static_dir.mkdir(exist_ok=True)
@@ -56,6 +86,11 @@ app.mount("/static", StaticFiles(directory=static_dir), name="static")
 app.include_router(api_router)      # /api/v1
 app.include_router(api_router_v2)   # /api/v2
 
+# Prometheus 指标（需安装 prometheus_client）
+_metrics_app = metrics_app()
+if _metrics_app is not None:
+    app.mount("/metrics", _metrics_app)
+
 
 # 主页 - 返回前端界面
 @app.get("/", response_class=HTMLResponse)
@@ -0,0 +1,43 @@
+"""
+Model Forge Tasks - 基于 Dramatiq + Redis 的后台任务队列
+
+API 进程只负责投递任务，流水线在独立的 worker 进程中执行，
+任务状态写入 Redis（见 api/job_store.py），任意 API worker 均可查询。
+
+启用方式：
+    MF_TASK_QUEUE=dramatiq
+    REDIS_URL=redis://localhost:6379/0
+
+启动 worker:
+    dramatiq model_forge.tasks
+"""
+
+import os
+import functools
+
+from dotenv import load_dotenv
+
+# 加载环境变量（worker 进程不经过 server.py）
+load_dotenv()
+
+import dramatiq
+from dramatiq.brokers.redis import RedisBroker
+
+from .api.job_store import DEFAULT_REDIS_URL, ProgressDebouncer, job_store
+
+REDIS_URL = os.environ.get("REDIS_URL", DEFAULT_REDIS_URL)
+
+redis_broker = RedisBroker(url=REDIS_URL)
+dramatiq.set_broker(redis_broker)
+
+
+@dramatiq.actor(max_retries=1, time_limit=1_800_000)
+def run_pipeline_actor(job_id: str, params: dict):
+    """在 worker 进程中运行流水线"""
+    from .api.routes import execute_pipeline
+
+    store_progress = ProgressDebouncer(functools.partial(job_store.set, job_id))
+    try:
+        execute_pipeline(job_id, params, store_progress)
+    finally:
+        store_progress.flush()
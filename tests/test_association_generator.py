@@ -0,0 +1,109 @@
+"""联想生成器解析与类别搜索测试"""
+
+import json
+import random
+
+import pytest
+
+from model_forge.core.association_generator import (
+    AssociationGenerator,
+    CategorySuggester,
+    _extract_json_array,
+    _find_json_array,
+)
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('[1, 2]', '[1, 2]'),
+    ('好的，结果如下：\n```json\n[{"a": [1]}]\n```\n说明 [见上]', '[{"a": [1]}]'),
+    ('[{"name": "括号]在字符串里"}] 尾部', '[{"name": "括号]在字符串里"}]'),
+    ('[{"name": "转义\\"引号]"}]', '[{"name": "转义\\"引号]"}]'),
+    ('[{"path": "C:\\\\"}, 2] x', '[{"path": "C:\\\\"}, 2]'),
+    ('没有数组', None),
+    ('[1, 2', None),
+])
+def test_find_json_array(content, expected):
+    assert _find_json_array(content) == expected
+
+
+def test_extract_json_array_falls_back_to_greedy_match():
+    # 括号扫描截取到第一个完整数组 [x]，不是合法 JSON，回退到贪婪匹配后仍然失败
+    assert _extract_json_array("前缀 [x] 中间 [1]") is None
+    assert _extract_json_array('说明：\n[{"name": "椅子"}]\n以上') == [{"name": "椅子"}]
+
+
+_FUZZ_CHARS = 'ab 变压器[]{}",:\\\n\t'
+
+
+def _random_string(rng: random.Random) -> str:
+    return "".join(rng.choice(_FUZZ_CHARS) for _ in range(rng.randint(0, 12)))
+
+
+def _random_value(rng: random.Random, depth: int = 0):
+    kind = rng.randint(0, 5 if depth < 3 else 2)
+    if kind == 0:
+        return _random_string(rng)
+    if kind == 1:
+        return rng.randint(-100, 100)
+    if kind == 2:
+        return rng.choice([None, True, False, 1.5])
+    if kind == 3:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {_random_string(rng): _random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+
+
+def test_find_json_array_fuzz_matches_json_loads():
+    """随机 JSON 数组夹在说明文字中，扫描结果与 json.loads 一致"""
+    rng = random.Random(20240611)
+    for _ in range(2000):
+        data = [_random_value(rng) for _ in range(rng.randint(0, 5))]
+        prefix = "".join(rng.choice('说明 ab"{}\n') for _ in range(rng.randint(0, 20)))
+        suffix = "".join(rng.choice('以上 ab"[]{}\n') for _ in range(rng.randint(0, 20)))
+        text = json.dumps(data, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+        found = _find_json_array(prefix + text + suffix)
+        assert found == text
+        assert json.loads(found) == data
+
+
+def test_parse_response_extracts_items_from_wrapped_json():
+    content = '以下是联想结果：\n```json\n[{"name": "木椅", "tags": ["实木"]}, {"name": "折叠椅"}]\n```'
+    items = AssociationGenerator._parse_response(None, content, "椅子")
+    assert [i.name for i in items] == ["木椅", "折叠椅"]
+    assert items[0].category == "椅子"
+    assert items[0].tags == ["实木"]
+
+
+def _linear_search(keyword: str):
+    """索引化之前的逐类别扫描实现，作为等价性参照"""
+    keyword = keyword.lower()
+    results = []
+    for industry, categories in CategorySuggester.CATEGORY_LIBRARY.items():
+        if keyword in industry.lower():
+            results.extend(categories)
+        else:
+            results.extend([c for c in categories if keyword in c.lower()])
+    return set(results)
+
+
+def _search_keywords():
+    names = [name for cats in CategorySuggester.CATEGORY_LIBRARY.values() for name in cats]
+    keywords = {"", "机", "设备", "电力", "ct", "CT机", "mri", "3d", "不存在", "xyz", "机床", "电视柜"}
+    for name in names + list(CategorySuggester.CATEGORY_LIBRARY):
+        keywords.update(name[i:j] for i in range(len(name)) for j in range(i + 1, len(name) + 1))
+    return sorted(keywords)
+
+
+def test_search_category_matches_linear_scan():
+    for keyword in _search_keywords():
+        assert set(CategorySuggester.search_category(keyword)) == _linear_search(keyword), keyword
+
+
+def test_search_category_is_deduplicated_in_library_order():
+    results = CategorySuggester.search_category("机")
+    assert len(results) == len(set(results))
+    names = [name for cats in CategorySuggester.CATEGORY_LIBRARY.values() for name in cats]
+    assert results == sorted(results, key=names.index)
+
+
+def test_search_category_industry_match_returns_all_categories():
+    assert CategorySuggester.search_category("家具") == CategorySuggester.CATEGORY_LIBRARY["家具"]
@@ -0,0 +1,177 @@
+"""响应缓存测试"""
+
+import os
+
+import pytest
+
+from model_forge.api import cache
+from model_forge.api.cache import (
+    PromptResponseCache,
+    RedisResponseCache,
+    SQLiteResponseCache,
+    create_response_cache,
+)
+from model_forge.core.association_generator import AssociationGenerator
+from model_forge.providers.base import ChatResponse
+
+
+def test_make_key_ignores_param_order():
+    a = PromptResponseCache.make_key("generate", {"a": 1, "b": "变压器"})
+    b = PromptResponseCache.make_key("generate", {"b": "变压器", "a": 1})
+    assert a == b
+    assert a != PromptResponseCache.make_key("optimize", {"a": 1, "b": "变压器"})
+
+
+def test_get_set_and_stats():
+    c = PromptResponseCache(maxsize=4, ttl=60)
+    assert c.get("k") is None
+    c.set("k", {"prompt": "p"})
+    assert c.get("k") == {"prompt": "p"}
+    assert c.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_lru_eviction():
+    c = PromptResponseCache(maxsize=2, ttl=60)
+    c.set("a", {"v": 1})
+    c.set("b", {"v": 2})
+    c.get("a")
+    c.set("c", {"v": 3})
+    assert c.get("b") is None
+    assert c.get("a") == {"v": 1}
+    assert c.get("c") == {"v": 3}
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    c = PromptResponseCache(maxsize=4, ttl=10)
+    c.set("k", {"v": 1})
+    now[0] += 9
+    assert c.get("k") == {"v": 1}
+    now[0] += 2
+    assert c.get("k") is None
+    assert c.stats()["size"] == 0
+
+
+def test_version_bump():
+    c = PromptResponseCache()
+    assert c.version() == 0
+    c.bump_version()
+    c.bump_version()
+    assert c.version() == 2
+
+
+def test_create_response_cache_selects_backend(monkeypatch, tmp_path):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.delenv("MF_CACHE_DIR", raising=False)
+    assert isinstance(create_response_cache(name="t", persistent=True), PromptResponseCache)
+
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")
+    assert isinstance(create_response_cache(name="t"), RedisResponseCache)
+
+
+def test_redis_cache_tolerates_unavailable_server():
+    pytest.importorskip("redis")
+    c = RedisResponseCache("redis://127.0.0.1:1/0", ttl=60, name="test")
+    c.set("k", {"v": 1})
+    c.bump_version()
+    assert c.get("k") is None
+    assert c.version() == 0
+    assert c.stats() == {"hits": 0, "misses": 1}
+
+
+@pytest.fixture
+def redis_url():
+    """本机 Redis 地址（REDIS_URL 或默认地址），不可用时跳过"""
+    redis = pytest.importorskip("redis")
+    url = os.environ.get("REDIS_URL", "redis://localhost:6379/15")
+    client = redis.Redis.from_url(url)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip("Redis 不可用")
+    yield url
+    for key in client.scan_iter(f"{RedisResponseCache.KEY_PREFIX}pytest:*"):
+        client.delete(key)
+
+
+def test_redis_cache_roundtrip(redis_url):
+    c = RedisResponseCache(redis_url, ttl=60, name="pytest")
+    c.set("k", {"prompt": "变压器"})
+    assert c.get("k") == {"prompt": "变压器"}
+    assert c.get("missing") is None
+
+
+def test_redis_version_is_shared_between_clients(redis_url):
+    a = RedisResponseCache(redis_url, name="pytest")
+    b = RedisResponseCache(redis_url, name="pytest")
+    before = b.version()
+    a.bump_version()
+    assert b.version() == before + 1
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = tmp_path / "association.sqlite3"
+    SQLiteResponseCache(str(path), ttl=60).set("k", {"content": "[]", "model": "m"})
+    c = SQLiteResponseCache(str(path), ttl=60)
+    assert c.get("k") == {"content": "[]", "model": "m"}
+    assert c.get("missing") is None
+    assert c.stats() == {"hits": 1, "misses": 1}
+
+
+def test_sqlite_cache_expiry_and_cleanup(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    c = SQLiteResponseCache(str(tmp_path / "c.sqlite3"), ttl=10)
+    c.set("old", {"v": 1})
+    now[0] += 11
+    assert c.get("old") is None
+    c.set("new", {"v": 2})
+    assert c._conn.execute("SELECT key FROM cache").fetchall() == [("new",)]
+
+
+def test_sqlite_version_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    a, b = SQLiteResponseCache(path), SQLiteResponseCache(path)
+    assert b.version() == 0
+    a.bump_version()
+    a.bump_version()
+    assert b.version() == 2
+
+
+def test_create_response_cache_uses_sqlite_when_persistent(monkeypatch, tmp_path):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.setenv("MF_CACHE_DIR", str(tmp_path))
+    c = create_response_cache(name="association", persistent=True)
+    assert isinstance(c, SQLiteResponseCache)
+    assert (tmp_path / "association.sqlite3").exists()
+    assert isinstance(create_response_cache(name="library"), PromptResponseCache)
+
+
+class _FakeManager:
+    """记录调用次数的服务商管理器"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, provider_type, messages, **kwargs):
+        self.calls += 1
+        return ChatResponse(content='[{"name": "木椅", "description": "实木餐椅"}]', model="m")
+
+
+def test_association_generator_reuses_persisted_response(tmp_path):
+    path = str(tmp_path / "association.sqlite3")
+    manager = _FakeManager()
+
+    def generator():
+        gen = AssociationGenerator(cache=SQLiteResponseCache(path, ttl=60))
+        gen.manager = manager
+        return gen
+
+    first = generator().generate("椅子", count=1)
+    second = generator().generate("椅子", count=1)
+    assert manager.calls == 1
+    assert [i.name for i in second.items] == [i.name for i in first.items] == ["木椅"]
+
+    generator().generate("椅子", count=1, no_cache=True)
+    assert manager.calls == 2
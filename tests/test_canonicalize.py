@@ -0,0 +1,53 @@
+"""请求参数规范化测试"""
+
+from model_forge.api.cache import PromptResponseCache
+from model_forge.api.canonicalize import canonicalize, canonicalize_text, request_params
+from model_forge.api.routes import GenerateRequest
+
+
+def test_canonicalize_text_collapses_whitespace_and_nfkc():
+    assert canonicalize_text("  一台　２２０ｋＶ\t变压器 \n") == "一台 220kV 变压器"
+    assert canonicalize_text(None) is None
+
+
+def test_canonicalize_text_multiline_keeps_newlines():
+    assert canonicalize_text("  第一行\n  第二行  ", multiline=True) == "第一行\n  第二行"
+
+
+def test_near_duplicate_requests_share_cache_key():
+    a = GenerateRequest(description="一台 220kV 油浸式变压器", voltage_level="220kV", equipment_type="变压器")
+    b = GenerateRequest(description="一台  220ｋＶ 油浸式变压器 ", voltage_level="220KV ", equipment_type=" 变压器")
+    assert canonicalize(a) == canonicalize(b)
+    assert PromptResponseCache.make_key("pipeline", canonicalize(a)) == \
+        PromptResponseCache.make_key("pipeline", canonicalize(b))
+
+
+def test_different_requests_have_different_cache_keys():
+    a = GenerateRequest(description="一台 220kV 油浸式变压器")
+    b = GenerateRequest(description="一台 110kV 油浸式变压器")
+    assert canonicalize(a) != canonicalize(b)
+
+
+def test_canonicalize_sorts_fields_and_converts_enums():
+    params = canonicalize(GenerateRequest(description="一台工业机器人", domain="robotics"))
+    assert list(params) == sorted(params)
+    assert params["domain"] == "robotics"
+    assert params["style"] == "photorealistic"
+
+
+def test_request_params_keep_original_case_and_newlines():
+    request = GenerateRequest(
+        description="一台 220kV 变压器",
+        voltage_level="220kV",
+        custom_prompt="Line one\n  Line two",
+        domain="power_grid",
+    )
+    params = request_params(request)
+    assert params["voltage_level"] == "220kV"
+    assert params["custom_prompt"] == "Line one\n  Line two"
+    assert params["domain"] == "power_grid"
+
+
+def test_request_params_only_nfkc_normalize():
+    params = request_params(GenerateRequest(description="一台  ２２０ｋＶ 变压器"))
+    assert params["description"] == "一台  220kV 变压器"
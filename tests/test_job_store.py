@@ -0,0 +1,86 @@
+"""任务状态存储测试"""
+
+import pytest
+
+from model_forge.api import job_store
+from model_forge.api.job_store import JobStore, ProgressDebouncer, create_job_store
+
+
+def test_set_and_get():
+    store = JobStore()
+    assert store.get("a") is None
+    store.set("a", {"stage": "init"})
+    store.set("a", {"stage": "image"})
+    assert store.get("a") == {"stage": "image"}
+
+
+def test_create_only_when_missing():
+    store = JobStore()
+    assert store.create("a", {"stage": "init"})
+    assert not store.create("a", {"stage": "other"})
+    assert store.get("a") == {"stage": "init"}
+
+
+async def test_aget_matches_get():
+    store = JobStore()
+    store.set("a", {"stage": "prompt"})
+    assert await store.aget("a") == {"stage": "prompt"}
+    assert await store.aget("missing") is None
+
+
+def test_create_job_store_defaults_to_memory(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.delenv("MF_TASK_QUEUE", raising=False)
+    assert type(create_job_store()) is JobStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 time.monotonic"""
+    now = [100.0]
+    monkeypatch.setattr(job_store.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_debouncer_writes_stage_changes_immediately(clock):
+    writes = []
+    debounce = ProgressDebouncer(writes.append, interval=1.0)
+    debounce({"stage": "prompt"})
+    debounce({"stage": "image"})
+    debounce({"stage": "model"})
+    assert [p["stage"] for p in writes] == ["prompt", "image", "model"]
+
+
+def test_debouncer_coalesces_updates_within_a_stage(clock):
+    writes = []
+    debounce = ProgressDebouncer(writes.append, interval=1.0)
+    debounce({"stage": "model", "n": 1})
+    debounce({"stage": "model", "n": 2})
+    debounce({"stage": "model", "n": 3})
+    assert writes == [{"stage": "model", "n": 1}]
+
+    clock[0] += 1.0
+    debounce({"stage": "model", "n": 4})
+    assert writes[-1] == {"stage": "model", "n": 4}
+    assert len(writes) == 2
+
+
+def test_debouncer_always_writes_terminal_stages(clock):
+    writes = []
+    debounce = ProgressDebouncer(writes.append, interval=1.0)
+    debounce({"stage": "completed", "n": 1})
+    debounce({"stage": "completed", "n": 2})
+    assert len(writes) == 2
+
+
+def test_debouncer_flush_writes_latest_pending(clock):
+    writes = []
+    debounce = ProgressDebouncer(writes.append, interval=1.0)
+    debounce({"stage": "model", "n": 1})
+    debounce({"stage": "model", "n": 2})
+    debounce({"stage": "model", "n": 3})
+    debounce.flush()
+    assert writes == [{"stage": "model", "n": 1}, {"stage": "model", "n": 3}]
+
+    debounce.flush()
+    assert len(writes) == 2
@@ -0,0 +1,108 @@
+"""3D 模型生成器任务轮询与异步客户端测试"""
+
+import asyncio
+
+import pytest
+
+from model_forge.core import model_generator
+from model_forge.core.model_generator import ModelGenerator
+from model_forge.core.pipeline import ModelForgePipeline, PipelineConfig
+
+
+def _generator(statuses) -> ModelGenerator:
+    gen = ModelGenerator("test-key")
+    gen.POLL_JITTER = 0
+    statuses = list(statuses)
+    gen.get_task_status = lambda task_id: {"status": statuses.pop(0)}
+
+    async def aget_task_status(task_id):
+        return {"status": statuses.pop(0)}
+
+    gen.aget_task_status = aget_task_status
+    return gen
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录轮询等待时长，不真正等待"""
+    recorded = []
+    monkeypatch.setattr(model_generator.time, "sleep", recorded.append)
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(model_generator.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def test_wait_for_task_backs_off_while_status_unchanged(sleeps):
+    gen = _generator(["queued", "running", "running", "running", "succeeded"])
+    assert gen.wait_for_task("t", initial_interval=2.0, max_interval=4.0) == {"status": "succeeded"}
+    assert sleeps == [2.0, 2.0, 3.0, 4.0]
+
+
+def test_wait_for_task_accepts_baseline_positional_call(sleeps):
+    """旧版调用方式 wait_for_task(task_id, timeout, interval, progress_callback)"""
+    gen = _generator(["running", "succeeded"])
+    progress = []
+    with pytest.warns(DeprecationWarning):
+        result = gen.wait_for_task("t", 60, 15, progress.append)
+    assert result == {"status": "succeeded"}
+    assert sleeps == [15]
+    assert [p["status"] for p in progress] == ["running", "succeeded"]
+
+
+async def test_await_for_task_accepts_baseline_positional_call(sleeps):
+    gen = _generator(["running", "succeeded"])
+    progress = []
+    with pytest.warns(DeprecationWarning):
+        result = await gen.await_for_task("t", 60, 15, progress.append)
+    assert result == {"status": "succeeded"}
+    assert sleeps == [15]
+    assert [p["status"] for p in progress] == ["running", "succeeded"]
+
+
+def test_poll_intervals_are_keyword_only():
+    with pytest.raises(TypeError):
+        _generator([]).wait_for_task("t", 60, None, None, 2.0)
+
+
+def test_session_closes_client_at_end_of_each_event_loop():
+    gen = ModelGenerator("test-key")
+
+    async def use():
+        async with gen.async_session():
+            return gen._get_async_client()
+
+    first = asyncio.run(use())
+    second = asyncio.run(use())
+    assert first is not second
+    assert first.is_closed and second.is_closed
+
+
+async def test_nested_sessions_share_one_client():
+    gen = ModelGenerator("test-key")
+    async with gen.async_session():
+        outer = gen._get_async_client()
+        async with gen.async_session():
+            assert gen._get_async_client() is outer
+        assert not outer.is_closed
+    assert outer.is_closed
+    # 关闭后再次使用时重新创建
+    assert not gen._get_async_client().is_closed
+    await gen.aclose()
+
+
+def test_run_batch_uses_one_client_and_closes_it(tmp_path):
+    pipeline = ModelForgePipeline(PipelineConfig("g", "a", output_base_dir=tmp_path))
+    clients = []
+
+    async def fake_run_async(description, *args):
+        clients.append(pipeline.model_generator._get_async_client())
+        await asyncio.sleep(0)
+        return description
+
+    pipeline._run_async = fake_run_async
+    assert asyncio.run(pipeline.run_batch(["a", "b", "c"], concurrency=1)) == ["a", "b", "c"]
+    assert len(set(map(id, clients))) == 1
+    assert clients[0].is_closed
@@ -0,0 +1,181 @@
+"""提示词生成器解析与领域检测测试"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from model_forge.core.prompt_generator import IndustryDomain, PromptConfig, PromptGenerator
+
+
+class _FakeModels:
+    """按顺序返回预设响应并记录提示词的 generate_content"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def generate_content(self, model, contents):
+        self.calls.append(contents)
+        return SimpleNamespace(text=self.responses.pop(0))
+
+
+def _generator(responses=(), **config) -> PromptGenerator:
+    gen = PromptGenerator("test-key", PromptConfig(**config))
+    gen.client = SimpleNamespace(models=_FakeModels(responses))
+    return gen
+
+
+@pytest.fixture
+def gen():
+    return _generator(use_self_verification=False)
+
+
+BATCH_RESPONSE = """\
+**ANALYSIS[1]:** 油浸式变压器
+**FOLDER_NAME[1]:**
+oil-immersed transformer
+**PROMPT[1]:** `A 220kV oil-immersed power transformer`
+**NEGATIVE[1]:** blurry
+**CONFIDENCE[1]:** HIGH
+
+## ANALYSIS[2]: 断路器
+FOLDER_NAME[2]: circuit_breaker
+PROMPT[2]: An SF6 circuit breaker
+CONFIDENCE[2]: LOW
+"""
+
+
+def test_parse_batch_sections_splits_numbered_sections():
+    sections = PromptGenerator._parse_batch_sections(BATCH_RESPONSE)
+    assert set(sections) == {1, 2}
+    assert sections[1]["PROMPT"] == "`A 220kV oil-immersed power transformer`"
+    assert sections[1]["FOLDER_NAME"] == "oil-immersed transformer"
+    assert sections[1]["CONFIDENCE"] == "HIGH"
+    assert sections[2]["ANALYSIS"] == "断路器"
+    assert "NEGATIVE" not in sections[2]
+
+
+def test_generate_batch_maps_sections_back_to_descriptions(gen):
+    gen.client.models.responses = [BATCH_RESPONSE]
+    results = gen.generate_batch(["一台220kV变压器", "一台SF6断路器"], domain=IndustryDomain.POWER_GRID)
+
+    assert len(gen.client.models.calls) == 1
+    assert "Q[1]: 一台220kV变压器" in gen.client.models.calls[0]
+    assert results[0]["prompt"] == "A 220kV oil-immersed power transformer"
+    assert results[0]["folder_name"] == "oil_immersed_transformer"
+    assert results[0]["negative_prompt"] == "blurry"
+    assert results[1]["prompt"] == "An SF6 circuit breaker"
+    assert results[1]["negative_prompt"] == PromptGenerator.DEFAULT_NEGATIVE_PROMPT
+    assert results[1]["confidence"] == "LOW"
+
+
+def test_generate_batch_falls_back_for_missing_items(gen):
+    gen.client.models.responses = [
+        "PROMPT[1]: first prompt\n",
+        "ANALYSIS: 单独生成\nFOLDER_NAME: second\nPROMPT: second prompt\n",
+    ]
+    results = gen.generate_batch(["第一个物体描述", "第二个物体描述"], domain=IndustryDomain.GENERAL)
+
+    assert len(gen.client.models.calls) == 2
+    assert [r["prompt"] for r in results] == ["first prompt", "second prompt"]
+    assert results[1]["folder_name"] == "second"
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("一台220kV油浸式变压器", IndustryDomain.POWER_GRID),
+    ("500KV outdoor switchgear bay", IndustryDomain.POWER_GRID),
+    ("35kv 电网配电柜", IndustryDomain.POWER_GRID),
+    ("A portable MRI scanner", IndustryDomain.MEDICAL),
+    ("a compact mri unit for clinics", IndustryDomain.MEDICAL),
+    ("5-axis CNC machine with a glass enclosure", IndustryDomain.MANUFACTURING),
+    ("cnc machine tool", IndustryDomain.MANUFACTURING),
+    ("数控机床", IndustryDomain.MANUFACTURING),
+    ("六轴机械臂", IndustryDomain.ROBOTICS),
+    ("A wooden dining chair", IndustryDomain.FURNITURE),
+    ("a plain cube", IndustryDomain.GENERAL),
+])
+def test_detect_domain(gen, description, expected):
+    assert gen._detect_domain(description) == expected
+
+
+def test_detect_domain_ties_follow_domain_knowledge_order(gen):
+    # sensor 同时属于 ROBOTICS 和 ELECTRONICS，同分时取 DOMAIN_KNOWLEDGE 中靠前的领域
+    order = list(PromptGenerator.DOMAIN_KNOWLEDGE)
+    assert order.index(IndustryDomain.ROBOTICS) < order.index(IndustryDomain.ELECTRONICS)
+    assert gen._detect_domain("a sensor") == IndustryDomain.ROBOTICS
+
+
+def test_domain_keyword_table_is_lowercase():
+    table = PromptGenerator._domain_keyword_table()
+    keywords = [kw for kw, _ in table]
+    assert keywords == [kw.lower() for kw in keywords]
+    assert len(keywords) == len(set(keywords))
+    assert {"mri", "cnc machine", "kv"} <= set(keywords)
+
+
+SINGLE_RESPONSE = """\
+**ANALYSIS:**
+A dry-type transformer, indoor use.
+
+**FOLDER_NAME:** dry_type_transformer
+## PROMPT:
+A dry-type transformer with epoxy coils. Note: PROMPT: inside a line is kept.
+NEGATIVE: cartoon, blurry
+CONFIDENCE: HIGH
+PROMPT: a second PROMPT section is ignored
+"""
+
+
+def test_parse_response_splits_marked_sections(gen):
+    result, rounds_done = gen._parse_response(IndustryDomain.POWER_GRID, SINGLE_RESPONSE)
+    assert result["analysis"] == "A dry-type transformer, indoor use."
+    assert result["folder_name"] == "dry_type_transformer"
+    assert result["prompt"] == "A dry-type transformer with epoxy coils. Note: PROMPT: inside a line is kept."
+    assert result["negative_prompt"] == "cartoon, blurry"
+    assert result["confidence"] == "HIGH"
+    assert result["detected_domain"] == "power_grid"
+    assert rounds_done == 0
+
+
+def test_parse_response_without_markers_uses_whole_text(gen):
+    result, _ = gen._parse_response(IndustryDomain.GENERAL, "  just a prompt  \n")
+    assert result["prompt"] == "just a prompt"
+    assert result["negative_prompt"] == PromptGenerator.DEFAULT_NEGATIVE_PROMPT
+    assert result["confidence"] == "MEDIUM"
+
+
+FINAL_RESPONSE = SINGLE_RESPONSE + """\
+**FINAL_PROMPT:**
+A refined dry-type transformer prompt.
+VERIFICATION CHECKLIST:
+- [x] camera angle
+"""
+
+
+def test_parse_response_uses_final_prompt_with_inline_verification():
+    gen = _generator(use_self_verification=True, optimize_iterations=1)
+    result, rounds_done = gen._parse_response(IndustryDomain.POWER_GRID, FINAL_RESPONSE)
+    assert result["prompt"] == "A refined dry-type transformer prompt."
+    assert rounds_done == 1
+
+
+def test_parse_response_ignores_final_prompt_without_verification(gen):
+    result, rounds_done = gen._parse_response(IndustryDomain.POWER_GRID, FINAL_RESPONSE)
+    assert result["prompt"].startswith("A dry-type transformer with epoxy coils.")
+    assert rounds_done == 0
+
+
+def test_generate_counts_inline_verification_as_one_round():
+    gen = _generator([FINAL_RESPONSE], use_self_verification=True, optimize_iterations=1)
+    result = gen.generate("一台干式变压器")
+    assert len(gen.client.models.calls) == 1
+    assert result["prompt"] == "A refined dry-type transformer prompt."
+
+
+@pytest.mark.parametrize("response, improved", [
+    ("VERIFIED: PASS\noriginal", "original prompt"),
+    ("ISSUES: lighting\nIMPROVED PROMPT:\nbetter prompt\n", "better prompt"),
+    ("no usable verdict", "original prompt"),
+])
+def test_apply_verification(response, improved):
+    assert PromptGenerator._apply_verification("original prompt", response) == improved
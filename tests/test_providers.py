@@ -0,0 +1,47 @@
+"""服务商异步客户端生命周期测试"""
+
+import asyncio
+
+from model_forge.providers import ProviderConfig, ProviderManager, ProviderType
+from model_forge.providers.deepseek import DeepSeekProvider
+
+
+def _provider() -> DeepSeekProvider:
+    return DeepSeekProvider(ProviderConfig(provider_type=ProviderType.DEEPSEEK, api_key="test-key"))
+
+
+def test_async_client_is_recreated_per_event_loop_and_closed_by_session():
+    provider = _provider()
+
+    async def use():
+        async with provider.async_session():
+            client = provider.async_client
+            assert provider.async_client is client
+            return client
+
+    first = asyncio.run(use())
+    second = asyncio.run(use())
+    assert first is not second
+    assert first.is_closed and second.is_closed
+
+
+async def test_aclose_closes_current_client():
+    provider = _provider()
+    client = provider.async_client
+    await provider.aclose()
+    assert client.is_closed
+
+
+async def test_manager_session_for_unconfigured_provider_is_noop():
+    manager = ProviderManager()
+    async with manager.async_session(ProviderType.DEEPSEEK):
+        pass
+    assert ProviderType.DEEPSEEK not in manager._providers
+
+
+async def test_manager_session_closes_provider_client():
+    manager = ProviderManager()
+    manager.configure(ProviderType.DEEPSEEK, "test-key")
+    async with manager.async_session(ProviderType.DEEPSEEK):
+        client = manager.get_provider(ProviderType.DEEPSEEK).async_client
+    assert client.is_closed
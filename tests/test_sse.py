@@ -0,0 +1,112 @@
+"""SSE 字节流解析测试"""
+
+import asyncio
+import contextlib
+import random
+
+import httpx
+import pytest
+
+from model_forge.providers.base import aiter_sse_data
+
+
+class _ChunkStream(httpx.AsyncByteStream):
+    """按给定分块产出字节；gate 不为 None 时，产出第一块后等待 gate 再继续"""
+
+    def __init__(self, chunks, gate: asyncio.Event = None):
+        self.chunks = chunks
+        self.gate = gate
+
+    async def __aiter__(self):
+        for i, chunk in enumerate(self.chunks):
+            if i == 1 and self.gate is not None:
+                await self.gate.wait()
+            yield chunk
+
+
+async def _collect(chunks):
+    response = httpx.Response(200, stream=_ChunkStream(chunks))
+    return [payload async for payload in aiter_sse_data(response)]
+
+
+async def test_yields_data_payloads_and_stops_at_done():
+    body = b'event: x\ndata: {"a": 1}\n\n: comment\ndata: {"a": 2}\r\ndata: [DONE]\ndata: {"a": 3}\n'
+    assert await _collect([body]) == [b'{"a": 1}', b'{"a": 2}']
+
+
+async def test_trailing_line_without_newline():
+    assert await _collect([b"data: 1\ndata: 2"]) == [b"1", b"2"]
+    assert await _collect([b"data: 1\ndata: [DONE]"]) == [b"1"]
+
+
+async def test_payload_split_across_chunks():
+    assert await _collect([b"da", b"ta: {\"t\": \"\xe5\x8f", b"\x98\"}\n"]) == ['{"t": "变"}'.encode()]
+
+
+def _sse_body(rng: random.Random) -> bytes:
+    lines = []
+    for i in range(rng.randint(0, 30)):
+        kind = rng.random()
+        if kind < 0.7:
+            lines.append(f'data: {{"i": {i}, "text": "增量{"x" * rng.randint(0, 40)}"}}'.encode())
+        elif kind < 0.8:
+            lines.append(b": keep-alive")
+        elif kind < 0.9:
+            lines.append(b"event: message")
+        else:
+            lines.append(b"")
+    if rng.random() < 0.5:
+        lines.append(b"data: [DONE]")
+    sep = b"\r\n" if rng.random() < 0.3 else b"\n"
+    return sep.join(lines) + (sep if rng.random() < 0.7 else b"")
+
+
+async def test_fuzz_chunk_boundaries_do_not_change_payloads():
+    """任意切分字节流（包括切断多字节字符和换行符）得到的负载与整体解析一致"""
+    rng = random.Random(4090)
+    for _ in range(300):
+        body = _sse_body(rng)
+        cuts = sorted(rng.sample(range(len(body) + 1), min(len(body) + 1, rng.randint(0, 12))))
+        chunks = [body[a:b] for a, b in zip([0] + cuts, cuts + [len(body)])]
+        assert await _collect(chunks) == await _collect([body])
+
+
+async def test_chunks_are_passed_through_as_they_arrive():
+    """第一块到达后立即产出，不等待后续数据攒满缓冲区"""
+    gate = asyncio.Event()
+    response = httpx.Response(200, stream=_ChunkStream([b"data: first\n", b"data: second\n"], gate))
+    payloads = aiter_sse_data(response)
+    assert await asyncio.wait_for(payloads.__anext__(), timeout=1) == b"first"
+    gate.set()
+    assert await payloads.__anext__() == b"second"
+    with pytest.raises(StopAsyncIteration):
+        await payloads.__anext__()
+
+
+async def test_read_errors_propagate_to_consumer():
+    class _Broken(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b"data: ok\n"
+            raise httpx.ReadError("connection reset")
+
+    payloads = []
+    with pytest.raises(httpx.ReadError):
+        async for payload in aiter_sse_data(httpx.Response(200, stream=_Broken())):
+            payloads.append(payload)
+    assert payloads == [b"ok"]
+
+
+async def test_early_exit_cancels_prefetch_task():
+    """[DONE] 之后或调用方提前结束（配合 aclosing）时，后台预读任务立即结束"""
+    gate = asyncio.Event()
+    before = asyncio.all_tasks()
+
+    response = httpx.Response(200, stream=_ChunkStream([b"data: 1\ndata: [DONE]\n", b"data: never\n"], gate))
+    assert [payload async for payload in aiter_sse_data(response)] == [b"1"]
+    assert asyncio.all_tasks() == before
+
+    response = httpx.Response(200, stream=_ChunkStream([b"data: a\n", b"data: b\n"], gate))
+    async with contextlib.aclosing(aiter_sse_data(response)) as payloads:
+        async for payload in payloads:
+            break
+    assert asyncio.all_tasks() == before